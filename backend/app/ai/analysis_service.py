@@ -23,6 +23,8 @@ class AnalysisService:
         self._ai_queue: asyncio.Queue[Alert] = asyncio.Queue()
         self._worker_task: asyncio.Task[None] | None = None
         self._proximity_task: asyncio.Task[None] | None = None
+        # Cleared on replicas that don't hold the analysis lock (set by app.services.fanout_bus)
+        self.leader = True
 
     async def start(self) -> None:
         if settings.ai_enabled:
@@ -48,6 +50,9 @@ class AnalysisService:
 
     async def on_telemetry(self, robot: RobotState) -> None:
         """Called on each telemetry update. Runs heuristic checks."""
+        # With clustered ingest each replica only sees the robots it owns
+        if not self.leader and not settings.cluster_enabled:
+            return
         alerts = heuristic_analyzer.analyze(robot)
         for alert in alerts:
             await self._process_alert(alert)
@@ -75,8 +80,10 @@ class AnalysisService:
         """Periodically check proximity between robots."""
         while True:
             await asyncio.sleep(30)
+            if not self.leader:
+                continue
             try:
-                alerts = heuristic_analyzer.check_proximity(state_manager.robots)
+                alerts = heuristic_analyzer.check_proximity(state_manager.robots, columns=state_manager.columns)
                 for alert in alerts:
                     await self._process_alert(alert)
             except Exception:
@@ -265,6 +272,7 @@ class AnalysisService:
         suggestion.status = "approved"
         robot.last_command_source = "ai"
         robot.last_command_at = time.time()
+        state_manager.touch()
 
         cmd = command_service.create_command(
             robot_id=robot_id,
@@ -3,10 +3,13 @@ from __future__ import annotations
 import logging
 import time
 from dataclasses import dataclass
-from typing import Any
+from typing import TYPE_CHECKING, Any
 
 from app.services.state_manager import RobotState
 
+if TYPE_CHECKING:
+    from app.services.columns import FleetColumns
+
 logger = logging.getLogger(__name__)
 
 
@@ -91,11 +94,44 @@ class HeuristicAnalyzer:
 
         return alerts
 
-    def check_proximity(self, robots: dict[str, RobotState], threshold_m: float = 15.0) -> list[Alert]:
-        """Check for robots that are dangerously close to each other."""
+    def check_proximity(
+        self,
+        robots: dict[str, RobotState],
+        threshold_m: float = 15.0,
+        columns: FleetColumns | None = None,
+    ) -> list[Alert]:
+        """Check for robots that are dangerously close to each other.
+
+        With `columns` (the columnar mirror of `robots`) candidate pairs are
+        found vectorized instead of comparing every pair.
+        """
+        alerts: list[Alert] = []
+        for id_a, id_b, dist in self._close_pairs(robots, threshold_m, columns):
+            ra, rb = robots[id_a], robots[id_b]
+            if self._should_fire(id_a, f"proximity_{id_b}"):
+                alerts.append(Alert(
+                    robot_id=id_a,
+                    alert_type="proximity",
+                    severity="warning",
+                    title="Proximity Alert",
+                    description=f"{ra.name} and {rb.name} are {dist:.0f}m apart.",
+                    reasoning=f"Distance ({dist:.0f}m) below {threshold_m:.0f}m safety threshold.",
+                    requires_ai=True,
+                ))
+
+        return alerts
+
+    @staticmethod
+    def _close_pairs(
+        robots: dict[str, RobotState], threshold_m: float, columns: FleetColumns | None
+    ) -> list[tuple[str, str, float]]:
+        if columns is not None:
+            pairs = columns.close_pairs(threshold_m, ~columns.status_in("offline"))
+            return [(columns.ids[a], columns.ids[b], dist) for a, b, dist in pairs]
+
         import math
 
-        alerts: list[Alert] = []
+        pairs: list[tuple[str, str, float]] = []
         ids = list(robots.keys())
         for i, id_a in enumerate(ids):
             for id_b in ids[i + 1:]:
@@ -109,19 +145,9 @@ class HeuristicAnalyzer:
                     math.cos(math.radians(ra.latitude)) * math.cos(math.radians(rb.latitude)) * \
                     math.sin(dlon / 2) ** 2
                 dist = 6_371_000 * 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
-
-                if dist < threshold_m and self._should_fire(id_a, f"proximity_{id_b}"):
-                    alerts.append(Alert(
-                        robot_id=id_a,
-                        alert_type="proximity",
-                        severity="warning",
-                        title="Proximity Alert",
-                        description=f"{ra.name} and {rb.name} are {dist:.0f}m apart.",
-                        reasoning=f"Distance ({dist:.0f}m) below {threshold_m:.0f}m safety threshold.",
-                        requires_ai=True,
-                    ))
-
-        return alerts
+                if dist < threshold_m:
+                    pairs.append((id_a, id_b, dist))
+        return pairs
 
 
 heuristic_analyzer = HeuristicAnalyzer()
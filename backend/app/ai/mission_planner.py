@@ -48,11 +48,7 @@ class MissionPlanner:
 
     def _build_context(self, intent: MissionIntent) -> str:
         # Gather available robots
-        robots = state_manager.robots
-        if intent.selected_robots:
-            available = {rid: r for rid, r in robots.items() if rid in intent.selected_robots}
-        else:
-            available = {rid: r for rid, r in robots.items() if r.status not in ("offline", "error")}
+        available = state_manager.available(intent.selected_robots)
 
         robot_summaries = []
         for rid, r in available.items():
@@ -6,7 +6,7 @@ from dataclasses import dataclass, field
 from typing import Any
 
 
-@dataclass
+@dataclass(slots=True)
 class Suggestion:
     id: str
     robot_id: str
@@ -37,6 +37,23 @@ class Suggestion:
             "expiresAt": self.expires_at,
         }
 
+    @classmethod
+    def from_dict(cls, s: dict[str, Any]) -> Suggestion:
+        return cls(
+            id=s["id"],
+            robot_id=s["robotId"],
+            title=s["title"],
+            description=s["description"],
+            reasoning=s["reasoning"],
+            severity=s["severity"],
+            proposed_action=s["proposedAction"],
+            confidence=s["confidence"],
+            status=s["status"],
+            source=s["source"],
+            created_at=s["createdAt"],
+            expires_at=s["expiresAt"],
+        )
+
     @property
     def is_expired(self) -> bool:
         return self.expires_at > 0 and time.time() > self.expires_at
@@ -148,5 +165,14 @@ class SuggestionService:
         items = sorted(self.suggestions.values(), key=lambda s: s.created_at, reverse=True)
         return items[:limit]
 
+    def apply_snapshot(self, suggestions: list[dict[str, Any]]) -> None:
+        """Replace every suggestion with the given to_dict forms (warm restart)."""
+        self.suggestions = {s["id"]: Suggestion.from_dict(s) for s in suggestions}
+
+    def apply(self, suggestion: dict[str, Any]) -> None:
+        """Add or overwrite one suggestion from its to_dict form (relayed by another replica)."""
+        self.suggestions[suggestion["id"]] = Suggestion.from_dict(suggestion)
+        self._cleanup()
+
 
 suggestion_service = SuggestionService()
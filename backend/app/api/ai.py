@@ -53,6 +53,7 @@ async def approve_suggestion(suggestion_id: str) -> dict[str, Any]:
 
             robot.last_command_source = "ai"
             robot.last_command_at = time.time()
+            state_manager.touch()
 
             cmd = command_service.create_command(
                 robot_id=robot_id,
@@ -108,11 +109,7 @@ async def execute_ai_command(body: dict[str, Any]) -> dict[str, Any]:
         return {"error": "objective is required"}
 
     # Build fleet context
-    robots = state_manager.robots
-    if selected_robots:
-        available = {rid: r for rid, r in robots.items() if rid in selected_robots}
-    else:
-        available = {rid: r for rid, r in robots.items() if r.status not in ("offline", "error")}
+    available = state_manager.available(selected_robots)
 
     robot_lines = []
     for rid, r in available.items():
@@ -161,6 +158,7 @@ async def execute_ai_command(body: dict[str, Any]) -> dict[str, Any]:
 
             robot.last_command_source = source
             robot.last_command_at = time.time()
+            state_manager.touch()
 
             cmd = command_service.create_command(
                 robot_id=robot_id,
@@ -255,6 +253,7 @@ async def approve_mission_plan(body: dict[str, Any]) -> dict[str, Any]:
 
         robot.last_command_source = "ai"
         robot.last_command_at = time.time()
+        state_manager.touch()
 
         cmd = command_service.create_command(
             robot_id=robot_id,
@@ -11,6 +11,7 @@ from pydantic import BaseModel
 from app.db.repositories.command_repo import command_repo
 from app.middleware.api_key_auth import require_api_key
 from app.mqtt.client import mqtt_client
+from app.mqtt.outbound import OutboundQueueFull
 from app.services.command_service import command_service
 from app.services.state_manager import state_manager
 from app.ws.manager import ws_manager
@@ -54,6 +55,7 @@ async def execute_command(
     # Track command source on robot
     robot.last_command_source = body.source
     robot.last_command_at = time.time()
+    state_manager.touch()
 
     cmd = command_service.create_command(
         robot_id=body.robot_id,
@@ -61,14 +63,18 @@ async def execute_command(
         parameters=body.parameters,
         source=body.source,
     )
-    await mqtt_client.publish(
-        f"argus/{body.robot_id}/command/execute",
-        {
-            "command_id": cmd.id,
-            "command_type": body.command_type,
-            "parameters": body.parameters,
-        },
-    )
+    try:
+        await mqtt_client.publish(
+            f"argus/{body.robot_id}/command/execute",
+            {
+                "command_id": cmd.id,
+                "command_type": body.command_type,
+                "parameters": body.parameters,
+            },
+        )
+    except OutboundQueueFull as e:
+        command_service.update_status(cmd.id, "failed")
+        return {"error": str(e), "status": "failed", "command_id": cmd.id}
     command_service.update_status(cmd.id, "sent")
 
     await ws_manager.broadcast({
@@ -101,7 +107,7 @@ async def fleet_status(
             },
             "autonomyTier": r.autonomy_tier,
         })
-    return {"robots": robots}
+    return {"robots": robots, "summary": state_manager.fleet_summary()}
 
 
 # ── Existing endpoints ───────────────────────────────────────────────────
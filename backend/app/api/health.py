@@ -1,8 +1,15 @@
 from fastapi import APIRouter
 
+from app import loop_monitor
 from app.db.connection import db
 from app.mqtt.client import mqtt_client
+from app.services.fanout_bus import fanout_bus
+from app.services.liveness import liveness_tracker
+from app.services.state_journal import state_journal
+from app.services.mission_service import mission_service
 from app.services.state_manager import state_manager
+from app.services.telemetry_rate import telemetry_rate_controller
+from app.ws.feed import gateway_feed
 from app.ws.manager import ws_manager
 
 router = APIRouter(tags=["health"])
@@ -40,5 +47,24 @@ async def readiness_check() -> dict:
         "status": "ok" if all_ok else "degraded",
         "checks": checks,
         "robots_count": len(state_manager.robots),
-        "ws_clients": len(ws_manager.active_connections),
+        "ws_clients": len(ws_manager.clients),
+    }
+
+
+@router.get("/health/metrics")
+async def metrics() -> dict:
+    """Pipeline counters for load monitoring (queue depths, drops)."""
+    return {
+        "mqtt": mqtt_client.stats(),
+        "ingest": mqtt_client.ingest.stats(),
+        "outbound": mqtt_client.outbound.stats(),
+        "cluster": mqtt_client.cluster.stats(),
+        "ws": ws_manager.stats(),
+        "wsBus": fanout_bus.stats(),
+        "wsGatewayFeed": gateway_feed.stats(),
+        "liveness": liveness_tracker.stats(),
+        "stateJournal": state_journal.stats(),
+        "telemetryRate": telemetry_rate_controller.stats(),
+        "snapshots": {"robots": state_manager.listing.stats(), "missions": mission_service.listing.stats()},
+        "loops": {name: m.stats() for name, m in loop_monitor.monitors.items()},
     }
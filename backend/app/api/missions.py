@@ -3,8 +3,9 @@ from __future__ import annotations
 from datetime import datetime, timezone
 from typing import Any
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Request, Response
 
+from app.api.responses import cached_json
 from app.services.mission_service import mission_service
 from app.ws.manager import ws_manager
 
@@ -12,9 +13,8 @@ router = APIRouter(prefix="/missions", tags=["missions"])
 
 
 @router.get("")
-async def list_missions() -> dict[str, Any]:
-    missions = mission_service.list_missions()
-    return {"missions": [m.to_dict() for m in missions]}
+async def list_missions(request: Request) -> Response:
+    return cached_json(request, *mission_service.listing.get())
 
 
 @router.post("")
@@ -0,0 +1,24 @@
+from __future__ import annotations
+
+from typing import Any
+
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+
+from app import codec
+
+
+class CodecJSONResponse(JSONResponse):
+    """JSON response rendered with the shared orjson codec."""
+
+    def render(self, content: Any) -> bytes:
+        return codec.dumps(content)
+
+
+def cached_json(request: Request, etag: str, body: bytes) -> Response:
+    """Serve pre-encoded JSON with an ETag, or 304 if the client already has it."""
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    client_tags = {t.strip().removeprefix("W/") for t in request.headers.get("if-none-match", "").split(",")}
+    if etag in client_tags or "*" in client_tags:
+        return Response(status_code=304, headers=headers)
+    return Response(body, media_type="application/json", headers=headers)
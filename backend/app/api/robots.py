@@ -3,20 +3,21 @@ from __future__ import annotations
 import asyncio
 from typing import Any
 
-from fastapi import APIRouter
+from fastapi import APIRouter, Request, Response
 
+from app.api.responses import cached_json
 from app.db.connection import db
 from app.db.repositories.telemetry_repo import telemetry_repo
+from app.mqtt.client import mqtt_client
+from app.services.liveness import liveness_tracker
 from app.services.state_manager import state_manager
 
 router = APIRouter(prefix="/robots", tags=["robots"])
 
 
 @router.get("")
-async def list_robots() -> dict[str, Any]:
-    return {
-        "robots": [r.to_dict() for r in state_manager.robots.values()]
-    }
+async def list_robots(request: Request) -> Response:
+    return cached_json(request, *state_manager.listing.get())
 
 
 @router.post("")
@@ -24,7 +25,11 @@ async def register_robot(body: dict[str, Any]) -> dict[str, Any]:
     robot_id = body.get("id", "")
     if not robot_id:
         return {"error": "id is required"}
+    if not mqtt_client.cluster.is_local(robot_id):
+        # Clustered ingest: the owning instance registers it from its status message
+        return {"id": robot_id, "owner": mqtt_client.cluster.owner(robot_id)}
     robot = state_manager.register_robot(robot_id, body)
+    liveness_tracker.watch(robot)
 
     # Persist to database (upsert)
     asyncio.create_task(_upsert_robot_db(robot_id, body))
@@ -6,6 +6,7 @@ from app.api.commands import router as commands_router
 from app.api.health import router as health_router
 from app.api.missions import router as missions_router
 from app.api.robots import router as robots_router
+from app.api.telemetry import router as telemetry_router
 
 api_router = APIRouter(prefix="/api")
 api_router.include_router(health_router)
@@ -14,3 +15,4 @@ api_router.include_router(commands_router)
 api_router.include_router(missions_router)
 api_router.include_router(ai_router)
 api_router.include_router(autonomy_router)
+api_router.include_router(telemetry_router)
@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+from typing import Any
+
+from fastapi import APIRouter, HTTPException, Request
+
+from app.db.connection import db
+from app.mqtt import wire
+from app.services.backfill import BackfillResult, backfill_service, bin1_records, ndjson_records
+
+router = APIRouter(prefix="/telemetry", tags=["telemetry"])
+
+NDJSON_CONTENT_TYPES = ("application/x-ndjson", "application/jsonl", "application/json", "text/plain", "")
+
+
+@router.post("/backfill")
+async def backfill(request: Request, robot_id: str = "") -> dict[str, Any]:
+    """Bulk-load buffered telemetry with source timestamps (NDJSON or bin1 batch).
+
+    The body is streamed straight into a COPY; nothing is broadcast or analysed.
+    """
+    if db.pool is None:
+        raise HTTPException(status_code=503, detail="Database unavailable")
+
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    result = BackfillResult()
+    if content_type == wire.BATCH_CONTENT_TYPE:
+        if not robot_id:
+            raise HTTPException(status_code=400, detail="robot_id query parameter is required for bin1 batches")
+        records = bin1_records(request.stream(), robot_id)
+    elif content_type in NDJSON_CONTENT_TYPES:
+        records = ndjson_records(request.stream(), robot_id, result)
+    else:
+        raise HTTPException(status_code=415, detail=f"Unsupported content type: {content_type}")
+
+    try:
+        await backfill_service.ingest(records, result)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return result.to_dict()
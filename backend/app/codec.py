@@ -0,0 +1,84 @@
+"""Shared JSON codec for MQTT, WebSocket, REST and JSONB paths.
+
+orjson handles generic encode/decode. When msgspec is installed, inbound
+MQTT payloads with a known shape are decoded straight into typed dicts in
+one validated pass; otherwise they fall back to orjson.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Callable, TypedDict
+
+import orjson
+
+try:
+    import msgspec
+except ImportError:  # optional: pip install argus-backend[fast]
+    msgspec = None
+
+# orjson.JSONDecodeError and msgspec.DecodeError both subclass ValueError
+DECODE_ERRORS: tuple[type[Exception], ...] = (ValueError, TypeError)
+
+Decoder = Callable[[bytes], Any]
+
+
+# ── Inbound MQTT payload shapes ──────────────────────────────────────────
+
+
+class PositionTelemetry(TypedDict, total=False):
+    latitude: float
+    longitude: float
+    altitude: float
+    heading: float
+    speed: float
+
+
+class HealthTelemetry(TypedDict, total=False):
+    battery_percent: float
+    signal_strength: float
+
+
+class StatusMessage(TypedDict, total=False):
+    status: str
+    name: str
+    robot_type: str
+    telemetry_format: str  # "json" | "bin1", see app.mqtt.wire
+
+
+class CommandAck(TypedDict, total=False):
+    command_id: str
+    status: str
+
+
+class CommandRequest(TypedDict, total=False):
+    """An operator command forwarded to the robot's owning instance (see app.mqtt.cluster)."""
+
+    command_type: str
+    parameters: dict[str, Any]
+
+
+# ── Encode / decode ──────────────────────────────────────────────────────
+
+
+def dumps(obj: Any) -> bytes:
+    """Encode to UTF-8 JSON bytes."""
+    return orjson.dumps(obj)
+
+
+def dumps_str(obj: Any) -> str:
+    """Encode to a JSON str (WebSocket text frames, JSONB parameters, logs)."""
+    return orjson.dumps(obj).decode()
+
+
+def loads(data: bytes | bytearray | memoryview | str) -> Any:
+    return orjson.loads(data)
+
+
+def typed_decoder(schema: type | None) -> Decoder:
+    """Return a decoder that validates against `schema` when msgspec is available.
+
+    Unknown fields are ignored, so robots may send extra keys.
+    """
+    if schema is None or msgspec is None:
+        return loads
+    return msgspec.json.Decoder(schema).decode
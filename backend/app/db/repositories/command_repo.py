@@ -1,9 +1,9 @@
 from __future__ import annotations
 
-import json
 import logging
 from typing import Any
 
+from app import codec
 from app.db.connection import db
 
 logger = logging.getLogger(__name__)
@@ -26,7 +26,7 @@ class CommandRepository:
                 cmd_id,
                 robot_id,
                 command_type,
-                json.dumps(parameters),
+                codec.dumps_str(parameters),
                 source,
                 status,
             )
@@ -61,7 +61,7 @@ class CommandRepository:
                 "id": r["id"],
                 "robotId": r["robot_id"],
                 "commandType": r["command_type"],
-                "parameters": json.loads(r["parameters"]) if isinstance(r["parameters"], str) else r["parameters"],
+                "parameters": codec.loads(r["parameters"]) if isinstance(r["parameters"], str) else r["parameters"],
                 "source": r["source"],
                 "status": r["status"],
                 "createdAt": r["created_at"].timestamp(),
@@ -1,9 +1,9 @@
 from __future__ import annotations
 
-import json
 import logging
 from typing import Any
 
+from app import codec
 from app.db.connection import db
 
 logger = logging.getLogger(__name__)
@@ -62,7 +62,7 @@ class MissionRepository:
                             wp["longitude"],
                             wp.get("altitude", 0.0),
                             wp.get("action", "navigate"),
-                            json.dumps(wp.get("parameters", {})),
+                            codec.dumps_str(wp.get("parameters", {})),
                         )
                         for wp in waypoints
                     ],
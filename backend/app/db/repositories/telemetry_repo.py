@@ -3,13 +3,18 @@ from __future__ import annotations
 import asyncio
 import logging
 from collections import deque
-from datetime import datetime, timezone
-from typing import Any
+from datetime import datetime, timedelta, timezone
+from typing import Any, AsyncIterable
 
 from app.db.connection import db
 
 logger = logging.getLogger(__name__)
 
+COLUMNS = (
+    "time", "robot_id", "latitude", "longitude", "altitude",
+    "heading", "speed", "battery_percent", "signal_strength",
+)
+
 
 class TelemetryRepository:
     """Async batch-flush telemetry writer. Accumulates rows in memory
@@ -74,6 +79,27 @@ class TelemetryRepository:
             self._buffer.extendleft(reversed(batch))
             logger.exception("Telemetry flush failed, re-enqueued %d rows", len(batch))
 
+    async def copy_rows(self, rows: AsyncIterable[tuple]) -> int:
+        """Stream rows (in COLUMNS order) into telemetry with a single COPY."""
+        async with db.pool.acquire() as conn:
+            status = await conn.copy_records_to_table("telemetry", records=rows, columns=COLUMNS)
+        return int(status.split()[-1])
+
+    def refresh_rollup_soon(self, start: datetime, end: datetime) -> None:
+        """Recompute telemetry_1m for a backfilled range in the background."""
+
+        async def refresh() -> None:
+            try:
+                await db.execute(
+                    "CALL refresh_continuous_aggregate('telemetry_1m', $1, $2)",
+                    start - timedelta(minutes=1),
+                    end + timedelta(minutes=1),
+                )
+            except Exception:
+                logger.exception("telemetry_1m refresh failed for %s..%s", start, end)
+
+        asyncio.create_task(refresh())
+
     async def get_trail(
         self, robot_id: str, minutes: int = 10, limit: int = 500
     ) -> list[dict[str, Any]]:
@@ -0,0 +1,182 @@
+"""argus-ws-gateway: serves `/ws` from the backend's state-delta feed.
+
+Run the backend with `WS_GATEWAY_SOCKET=/run/argus/ws.sock`, then one or
+more gateways with the same setting. Each gateway mirrors robot and
+mission state from the feed (see app/ws/feed.py) into its own
+`state_manager` / `mission_service` and runs the regular `ws_manager`
+against it, so subscriptions, viewports, delta encoding, tick batching,
+resume, MessagePack and compression all happen here, off the backend's
+event loop. Commands and other operator actions are passed up the feed.
+
+Run from backend/:  python -m app.gateway [--host 0.0.0.0] [--port 8100]
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import Any, AsyncGenerator
+
+from fastapi import FastAPI, WebSocket
+from fastapi.middleware.cors import CORSMiddleware
+
+from app import codec, loop_monitor
+from app.config import settings
+from app.services.mission_service import mission_service
+from app.services.state_manager import state_manager
+from app.ws.feed import read_frame, write_frame
+from app.ws.manager import ws_manager
+from app.ws.session import serve
+
+logger = logging.getLogger(__name__)
+
+
+class FeedClient:
+    """The gateway's end of the feed: applies ticks, passes client messages up."""
+
+    def __init__(self) -> None:
+        self.path = settings.ws_gateway_socket
+        self._writer: asyncio.StreamWriter | None = None
+        self._task: asyncio.Task[None] | None = None
+        self.ticks = 0
+        self.syncs = 0
+        self.upstream = 0
+        self.unsent = 0
+
+    async def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def _run(self) -> None:
+        """Stay connected to the backend, reconnecting (and re-syncing) when it goes away."""
+        while True:
+            try:
+                reader, writer = await asyncio.open_unix_connection(self.path)
+            except OSError as e:
+                logger.warning("WS gateway feed %s unavailable (%s); retrying", self.path, e)
+                await asyncio.sleep(1.0)
+                continue
+            self._writer = writer
+            logger.info("WS gateway connected to feed %s", self.path)
+            try:
+                while True:
+                    await self._apply(await read_frame(reader))
+            except (asyncio.IncompleteReadError, ConnectionError):
+                logger.warning("WS gateway lost the feed; reconnecting")
+            finally:
+                self._writer = None
+                writer.close()
+            await asyncio.sleep(1.0)
+
+    async def _apply(self, frame: dict[str, Any]) -> None:
+        if "missions" in frame:
+            mission_service.apply_snapshot(frame["missions"])
+        for message in frame["events"]:
+            await ws_manager.broadcast(message)
+        robots = [state_manager.apply_snapshot(patch) for patch in frame["robots"]]
+        if frame.get("sync"):
+            # Clients that stayed connected while the backend was away catch up in one frame
+            self.syncs += 1
+            if robots:
+                await ws_manager.broadcast_robots(robots)
+            return
+        self.ticks += 1
+        for robot in robots:
+            await ws_manager.broadcast_robot(robot)
+
+    def _send(self, frame: dict[str, Any]) -> None:
+        if self._writer is None:
+            self.unsent += 1
+            logger.warning("WS gateway feed down; dropped client message")
+            return
+        write_frame(self._writer, codec.dumps(frame))
+
+    async def forward(self, websocket: WebSocket, data: dict[str, Any]) -> None:
+        self.upstream += 1
+        self._send({"client": id(websocket), "message": data})
+
+    def closed(self, websocket: WebSocket) -> None:
+        self._send({"closed": id(websocket)})
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "path": self.path,
+            "connected": self._writer is not None,
+            "ticks": self.ticks,
+            "syncs": self.syncs,
+            "upstream": self.upstream,
+            "unsent": self.unsent,
+        }
+
+
+feed_client = FeedClient()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncGenerator[None]:
+    logger.info("Starting Argus WS gateway")
+    loop_monitor.monitor_current_loop("serving")
+    await ws_manager.start()
+    await feed_client.start()
+    yield
+    logger.info("Shutting down Argus WS gateway")
+    await feed_client.stop()
+    await ws_manager.stop()
+    await loop_monitor.stop_all()
+
+
+def create_app() -> FastAPI:
+    app = FastAPI(title="Argus WS Gateway", version="0.3.0", lifespan=lifespan)
+
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=settings.cors_origins,
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+
+    @app.get("/health")
+    async def health() -> dict[str, Any]:
+        return {
+            "status": "ok" if feed_client.stats()["connected"] else "degraded",
+            "feed": feed_client.stats(),
+            "ws": ws_manager.stats(),
+        }
+
+    @app.websocket("/ws")
+    async def websocket_endpoint(websocket: WebSocket) -> None:
+        await serve(websocket, feed_client.forward, feed_client.closed)
+
+    return app
+
+
+app = create_app()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8100)
+    args = parser.parse_args()
+    if not settings.ws_gateway_socket:
+        raise SystemExit("WS_GATEWAY_SOCKET must name the backend's feed socket")
+    logging.basicConfig(level=logging.DEBUG if settings.debug else logging.INFO)
+    import uvicorn
+
+    from app.ws.deflate import TunedDeflateWebSocketProtocol
+
+    uvicorn.run("app.gateway:app", host=args.host, port=args.port, ws=TunedDeflateWebSocketProtocol)
+
+
+if __name__ == "__main__":
+    main()
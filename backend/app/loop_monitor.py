@@ -0,0 +1,78 @@
+"""Event-loop lag monitoring.
+
+A monitor task sleeps for a fixed interval and records how late it wakes
+up; that overshoot is the time the loop spent blocked on other callbacks.
+One monitor runs per event loop (serving, and ingest when it has its own
+thread) and is exposed on /api/health/metrics.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import deque
+from typing import Any
+
+
+class LoopLagMonitor:
+    def __init__(self, name: str, interval: float = 0.25) -> None:
+        self.name = name
+        self.interval = interval
+        self._samples: deque[float] = deque(maxlen=240)
+        self._task: asyncio.Task[None] | None = None
+        self.max_lag = 0.0
+
+    def start(self) -> None:
+        """Start sampling the currently running loop."""
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            start = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, time.perf_counter() - start - self.interval)
+            self._samples.append(lag)
+            if lag > self.max_lag:
+                self.max_lag = lag
+
+    def stats(self) -> dict[str, Any]:
+        samples = sorted(self._samples)
+        if not samples:
+            return {"samples": 0}
+
+        def ms(value: float) -> float:
+            return round(value * 1000, 2)
+
+        return {
+            "samples": len(samples),
+            "p50Ms": ms(samples[len(samples) // 2]),
+            "p99Ms": ms(samples[min(len(samples) - 1, int(len(samples) * 0.99))]),
+            "windowMaxMs": ms(samples[-1]),
+            "maxMs": ms(self.max_lag),
+        }
+
+
+monitors: dict[str, LoopLagMonitor] = {}
+
+
+def monitor_current_loop(name: str) -> LoopLagMonitor:
+    """Create, register and start a lag monitor on the running loop."""
+    monitor = LoopLagMonitor(name)
+    monitors[name] = monitor
+    monitor.start()
+    return monitor
+
+
+async def stop_all() -> None:
+    for monitor in list(monitors.values()):
+        await monitor.stop()
+    monitors.clear()
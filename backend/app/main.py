@@ -1,28 +1,33 @@
 from __future__ import annotations
 
 import asyncio
-import json as _json
 import logging
 from contextlib import asynccontextmanager
 from datetime import datetime, timezone
-from typing import Any, AsyncGenerator
+from typing import Any, AsyncGenerator, Hashable
 
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect
+from fastapi import FastAPI, WebSocket
 from fastapi.middleware.cors import CORSMiddleware
 
+from app import codec, loop_monitor
 from app.ai.analysis_service import analysis_service
+from app.api.responses import CodecJSONResponse
 from app.api.router import api_router
 from app.config import settings
 from app.middleware.rate_limit import RateLimitMiddleware
 from app.db.connection import db
-from app.db.repositories.command_repo import command_repo
 from app.db.repositories.telemetry_repo import telemetry_repo
 from app.mqtt.client import mqtt_client
-from app.mqtt.handlers import handle_command_ack, handle_status, handle_telemetry
+from app.mqtt.handlers import register_routes, send_operator_command
 from app.services.autonomy_service import autonomy_service
-from app.services.command_service import command_service
-from app.services.state_manager import AUTONOMY_TIERS, state_manager
+from app.services.fanout_bus import fanout_bus
+from app.services.liveness import liveness_tracker
+from app.services.state_journal import state_journal
+from app.services.state_manager import AUTONOMY_TIERS
+from app.services.telemetry_rate import telemetry_rate_controller
+from app.ws.feed import gateway_feed
 from app.ws.manager import ws_manager
+from app.ws.session import serve
 
 
 class _JSONFormatter(logging.Formatter):
@@ -37,7 +42,7 @@ class _JSONFormatter(logging.Formatter):
         }
         if record.exc_info and record.exc_info[1]:
             log_entry["exc"] = self.formatException(record.exc_info)
-        return _json.dumps(log_entry)
+        return codec.dumps_str(log_entry)
 
 
 def _setup_logging() -> None:
@@ -59,24 +64,40 @@ logger = logging.getLogger(__name__)
 async def lifespan(app: FastAPI) -> AsyncGenerator[None]:
     # Startup
     logger.info("Starting Argus Ground Station")
+    loop_monitor.monitor_current_loop("serving")
+    # Before ingest, so live telemetry lands on top of the restored state
+    await state_journal.start()
     await db.connect()
     await telemetry_repo.start()
-    mqtt_client.on("telemetry", handle_telemetry)
-    mqtt_client.on("status", handle_status)
-    mqtt_client.on("command", handle_command_ack)
+    register_routes(mqtt_client)
     await mqtt_client.start()
     await analysis_service.start()
+    await telemetry_rate_controller.start()
+    await liveness_tracker.start()
+    await ws_manager.start()
+    await fanout_bus.start()
+    await gateway_feed.start(handle_ws_message, telemetry_rate_controller.release)
     yield
     # Shutdown
     logger.info("Shutting down Argus Ground Station")
+    await gateway_feed.stop()
+    await fanout_bus.stop()
+    await ws_manager.stop()
+    await liveness_tracker.stop()
+    await telemetry_rate_controller.stop()
     await analysis_service.stop()
     await mqtt_client.stop()
+    await state_journal.stop()
     await telemetry_repo.stop()
     await db.disconnect()
+    await loop_monitor.stop_all()
 
 
-async def handle_ws_message(websocket: WebSocket, data: dict[str, Any]) -> None:
-    """Process incoming WebSocket messages from the frontend."""
+async def handle_ws_message(client: Hashable, data: dict[str, Any]) -> None:
+    """Process operator messages from the frontend (session messages are handled in app.ws.session).
+
+    `client` is the WebSocket, or a (gateway, client id) key for clients of argus-ws-gateway.
+    """
     msg_type = data.get("type", "")
     payload = data.get("payload", {})
 
@@ -88,55 +109,15 @@ async def handle_ws_message(websocket: WebSocket, data: dict[str, Any]) -> None:
         if not robot_id or not command_type:
             return
 
-        # Check robot exists
-        robot = state_manager.robots.get(robot_id)
-        if robot is None:
-            return
-
-        # Create command record
-        cmd = command_service.create_command(
-            robot_id=robot_id,
-            command_type=command_type,
-            parameters=parameters,
-            source="operator",
-        )
-
-        # Publish to MQTT for the robot
-        await mqtt_client.publish(
-            f"argus/{robot_id}/command/execute",
-            {
-                "command_id": cmd.id,
-                "command_type": command_type,
-                "parameters": parameters,
-            },
-        )
-
-        # Track operator authority
-        import time as _time
-
-        robot.last_command_source = "operator"
-        robot.last_command_at = _time.time()
-
-        # Update command status to sent
-        command_service.update_status(cmd.id, "sent")
-
-        # Persist command to database (fire-and-forget)
-        asyncio.create_task(
-            command_repo.insert(
-                cmd.id, robot_id, command_type, parameters, "operator", "sent"
+        if not mqtt_client.cluster.is_local(robot_id):
+            # The robot's acks arrive at its owner, so the command record must live there
+            await mqtt_client.forward(
+                f"argus/{robot_id}/command/send",
+                {"command_type": command_type, "parameters": parameters},
             )
-        )
-
-        # Broadcast command status to all clients
-        await ws_manager.broadcast(
-            {
-                "type": "command.status",
-                "payload": cmd.to_dict(),
-                "timestamp": datetime.now(timezone.utc).isoformat(),
-            }
-        )
+            return
 
-        logger.info("Command dispatched: %s -> %s (%s)", command_type, robot_id, cmd.id)
+        await send_operator_command(robot_id, command_type, parameters)
 
     elif msg_type == "autonomy.set_tier":
         robot_id = payload.get("robotId", "")
@@ -158,9 +139,19 @@ async def handle_ws_message(websocket: WebSocket, data: dict[str, Any]) -> None:
             })
             logger.info("Autonomy tier changed: %s -> %s", entry.robot_id, entry.new_tier)
 
+    elif msg_type == "robot.select":
+        robot_ids = payload.get("robotIds", [])
+        if isinstance(robot_ids, list):
+            await telemetry_rate_controller.select(client, [str(rid) for rid in robot_ids])
+
 
 def create_app() -> FastAPI:
-    app = FastAPI(title="Argus Ground Station", version="0.3.0", lifespan=lifespan)
+    app = FastAPI(
+        title="Argus Ground Station",
+        version="0.3.0",
+        lifespan=lifespan,
+        default_response_class=CodecJSONResponse,
+    )
 
     app.add_middleware(
         CORSMiddleware,
@@ -177,23 +168,11 @@ def create_app() -> FastAPI:
 
     @app.websocket("/ws")
     async def websocket_endpoint(websocket: WebSocket) -> None:
-        await ws_manager.connect(websocket)
-        # Send full state snapshot on connect
-        await ws_manager.send_to(
-            websocket,
-            {
-                "type": "state.sync",
-                "payload": state_manager.get_full_state(),
-                "timestamp": datetime.now(timezone.utc).isoformat(),
-            },
-        )
-        try:
-            while True:
-                data = await websocket.receive_json()
-                logger.debug("WS message from client: %s", data.get("type"))
-                await handle_ws_message(websocket, data)
-        except WebSocketDisconnect:
-            ws_manager.disconnect(websocket)
+        if gateway_feed.enabled:
+            # argus-ws-gateway owns client sockets; this process only feeds it
+            await websocket.close(code=1013)
+            return
+        await serve(websocket, handle_ws_message, telemetry_rate_controller.release)
 
     return app
 
@@ -1,33 +1,136 @@
 from __future__ import annotations
 
 import asyncio
-import json
 import logging
-from typing import Any, Callable, Coroutine
+from typing import Any, Callable, Coroutine, NamedTuple
 
 import aiomqtt
 
+from app import codec, loop_monitor
 from app.config import settings
+from app.mqtt.cluster import ClusterRouter
+from app.mqtt.ingest import IngestPipeline, robot_id_from_topic
+from app.mqtt.io_thread import IOThread, LoopHandoff
+from app.mqtt.outbound import PRIORITY_FORWARD, OutboundQueue, command_priority
+from app.mqtt.topics import TopicTrie
 
 logger = logging.getLogger(__name__)
 
 # Type for message handler callbacks
 MessageHandler = Callable[[str, dict[str, Any]], Coroutine[Any, Any, None]]
+# Synchronous hook run in the read loop for every message, before conflation
+MessageTap = Callable[[str, dict[str, Any]], None]
+
+
+class _Route(NamedTuple):
+    handler: MessageHandler
+    decode: codec.Decoder
+    conflate: bool
+    tap: MessageTap | None
+    shared: bool
+    inbox: bool
+    everywhere: bool
 
 
 class MQTTClient:
     def __init__(self) -> None:
         self._client: aiomqtt.Client | None = None
-        self._handlers: dict[str, MessageHandler] = {}
+        self._routes: TopicTrie[_Route] = TopicTrie()
+        self._shared_filters: set[str] = set()
+        self._inbox_filters: set[str] = set()
+        self.cluster = ClusterRouter()
         self._task: asyncio.Task[None] | None = None
+        self._sender_task: asyncio.Task[None] | None = None
+        self._connected = asyncio.Event()
+        self.outbound = OutboundQueue(
+            batch_size=settings.mqtt_publish_batch_size,
+            max_lane_size=settings.mqtt_outbound_queue_size,
+        )
+        self.ingest = IngestPipeline(
+            self._dispatch,
+            workers=settings.ingest_workers,
+            queue_size=settings.ingest_queue_size,
+        )
+        # Set when MQTT I/O runs on its own thread (settings.ingest_thread)
+        self._io: IOThread | None = None
+        self._handoff: LoopHandoff[tuple[str, Any, bool]] | None = None
+
+    def on(
+        self,
+        topic_filter: str,
+        handler: MessageHandler,
+        schema: type | None = None,
+        decoder: codec.Decoder | None = None,
+        conflate: bool = False,
+        tap: MessageTap | None = None,
+        shared: bool = False,
+        inbox: bool = False,
+        everywhere: bool = False,
+    ) -> None:
+        """Register a handler for an MQTT topic filter (e.g. "argus/+/telemetry/+").
+
+        Only registered filters are subscribed to, so topics without a handler
+        (like our own command/execute publishes) never reach the decoder.
+        `schema` is a TypedDict from app.codec used to decode and validate
+        the payload in one pass; `decoder` overrides it entirely (e.g. for
+        the binary telemetry format in app.mqtt.wire).
 
-    def on(self, topic_pattern: str, handler: MessageHandler) -> None:
-        """Register a handler for a topic pattern."""
-        self._handlers[topic_pattern] = handler
+        With `conflate`, a backlog keeps only the newest unprocessed sample
+        per topic (see IngestPipeline). `tap` still sees every sample, so it
+        is where lossless side effects such as persistence belong.
+
+        `shared` routes are load-balanced across backend instances via a
+        `$share` subscription when clustering is enabled (see app.mqtt.cluster).
+        `inbox` routes are never subscribed on the broker: they only receive
+        what other instances `forward` here. `everywhere` routes are handled
+        by every instance, not only the robot's owner.
+        """
+        decode = decoder or codec.typed_decoder(schema)
+        conflate = conflate and settings.ingest_conflate
+        self._routes.add(
+            topic_filter, _Route(handler, decode, conflate, tap, shared, inbox, everywhere)
+        )
+        if shared:
+            self._shared_filters.add(topic_filter)
+        if inbox:
+            self._inbox_filters.add(topic_filter)
 
     async def start(self) -> None:
-        """Connect to MQTT broker and start listening."""
+        """Connect to MQTT broker and start listening.
+
+        Ingest workers always run on the calling (serving) loop. Broker I/O
+        runs there too, or on a dedicated thread with INGEST_THREAD=true.
+        """
+        self.ingest.start()
+        if settings.ingest_thread:
+            serving_loop = asyncio.get_running_loop()
+            self._handoff = LoopHandoff(serving_loop, self._submit_local)
+            self._io = IOThread("mqtt-ingest")
+            self._io.start()
+            await self._io.run(self._start_io(monitor=True))
+            logger.info("MQTT I/O running on dedicated ingest thread")
+        else:
+            await self._start_io()
+
+    async def _start_io(self, monitor: bool = False) -> None:
         self._task = asyncio.create_task(self._run())
+        self._sender_task = asyncio.create_task(self._sender())
+        if monitor:
+            loop_monitor.monitor_current_loop("ingest")
+
+    async def _stop_io(self) -> None:
+        for task in (self._sender_task, self._task):
+            if task is not None:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        if monitor := loop_monitor.monitors.pop("ingest", None):
+            await monitor.stop()
+
+    def _submit_local(self, item: tuple[str, Any, bool]) -> None:
+        self.ingest.submit(*item)
 
     async def _run(self) -> None:
         while True:
@@ -41,56 +144,158 @@ class MQTTClient:
                     kwargs["password"] = settings.mqtt_password
                 async with aiomqtt.Client(**kwargs) as client:
                     self._client = client
+                    self._connected.set()
                     logger.info(
                         "Connected to MQTT broker at %s:%d",
                         settings.mqtt_broker,
                         settings.mqtt_port,
                     )
-                    await client.subscribe("argus/#")
-                    async for message in client.messages:
-                        topic = str(message.topic)
-                        try:
-                            payload = json.loads(message.payload)
-                        except (json.JSONDecodeError, TypeError):
-                            logger.warning("Invalid JSON on topic %s", topic)
+                    for topic_filter in self._routes.subscriptions():
+                        if topic_filter in self._inbox_filters:
                             continue
-                        await self._dispatch(topic, payload)
+                        shared = topic_filter in self._shared_filters
+                        await client.subscribe(self.cluster.subscription(topic_filter, shared))
+                    if self.cluster.enabled:
+                        # QoS1 so forwarded commands keep their delivery guarantee
+                        await client.subscribe(self.cluster.inbox_filter(), qos=1)
+                    async for message in client.messages:
+                        await self.feed(str(message.topic), message.payload)
             except aiomqtt.MqttError as e:
                 logger.warning("MQTT connection lost: %s. Reconnecting in 3s...", e)
+                self._client = None
+                self._connected.clear()
                 await asyncio.sleep(3)
 
-    async def _dispatch(self, topic: str, payload: dict[str, Any]) -> None:
-        """Route messages to registered handlers based on topic patterns."""
-        parts = topic.split("/")
-        # argus/{robot_id}/telemetry/position -> category = "telemetry"
-        # argus/{robot_id}/command/ack -> category = "command", subcategory = "ack"
-        if len(parts) >= 3:
-            category = parts[2]
-            subcategory = parts[3] if len(parts) >= 4 else ""
-
-            # Skip our own outgoing command/execute messages
-            if category == "command" and subcategory == "execute":
+    async def _sender(self) -> None:
+        """Drain the outbound queue whenever a broker connection is up."""
+        while True:
+            await self._connected.wait()
+            client = self._client
+            if client is None:
+                self._connected.clear()
+                continue
+
+            async def publish(topic: str, data: bytes, qos: int) -> None:
+                await client.publish(
+                    topic, data, qos=qos, timeout=settings.mqtt_publish_timeout
+                )
+
+            try:
+                await self.outbound.drain(publish)
+            except Exception as e:
+                logger.warning(
+                    "MQTT publish failed: %s. %d message(s) queued for retry",
+                    e,
+                    len(self.outbound),
+                )
+                await asyncio.sleep(1)
+
+    async def feed(self, topic: str, raw: bytes) -> None:
+        """Route, decode and hand off one inbound message (read-loop hot path).
+
+        Also the in-memory transport for replays and load tests: feeding a
+        captured message here is equivalent to receiving it from the broker.
+        """
+        forwarded = False
+        if self.cluster.enabled:
+            original = self.cluster.unwrap(topic)
+            if original is not None:
+                topic, forwarded = original, True
+
+        routes = self._routes.match(topic)
+        if not routes:
+            return
+        route = routes[0]
+        if route.inbox and not forwarded:
+            return
+
+        if self.cluster.enabled and not forwarded and not route.everywhere:
+            owner = self.cluster.owner(robot_id_from_topic(topic))
+            if owner != self.cluster.instance_id:
+                if route.shared:
+                    # Landed here via $share; pass the raw bytes on to the owner
+                    await self._publish_raw(self.cluster.forward_topic(owner, topic), raw)
+                else:
+                    self.cluster.ignored += 1
                 return
 
-            for pattern, handler in self._handlers.items():
-                if category == pattern or pattern == "*":
-                    try:
-                        await handler(topic, payload)
-                    except Exception:
-                        logger.exception("Error in handler for %s", topic)
+        try:
+            payload = route.decode(raw)
+        except codec.DECODE_ERRORS:
+            logger.warning("Invalid payload on topic %s", topic)
+            return
+        if route.tap is not None:
+            route.tap(topic, payload)
+        # Hand off to the sharded workers; the read loop only waits once a shard is full
+        if self._handoff is not None:
+            self._handoff.put((topic, payload, route.conflate))
+            await self.ingest.wait_for_room(topic)
+        elif not self.ingest.submit(topic, payload, route.conflate):
+            await self.ingest.wait_for_room(topic)
+
+    async def _dispatch(self, topic: str, payload: dict[str, Any]) -> None:
+        """Route a decoded message to every handler whose filter matches."""
+        for route in self._routes.match(topic):
+            try:
+                await route.handler(topic, payload)
+            except Exception:
+                logger.exception("Error in handler for %s", topic)
+
+    async def publish(
+        self,
+        topic: str,
+        payload: dict[str, Any],
+        qos: int = 1,
+        priority: int | None = None,
+    ) -> None:
+        """Queue a message for the broker; returns without waiting for the wire.
+
+        Commands default to QoS1 and are retried across reconnects. Priority
+        is derived from `command_type` (stop/return_home first, waypoint
+        uploads last) unless given explicitly. Raises OutboundQueueFull if
+        the command's lane is at capacity rather than dropping anything.
+        """
+        if priority is None:
+            priority = command_priority(payload)
+        self.outbound.check(qos, priority)
+        data = codec.dumps(payload)
+        if self._io is not None:
+            # The outbound queue belongs to the I/O loop
+            self._io.loop.call_soon_threadsafe(self.outbound.put, topic, data, qos, priority)
+        else:
+            self.outbound.put(topic, data, qos, priority)
+
+    async def forward(self, topic: str, payload: dict[str, Any]) -> None:
+        """Queue a message for the inbox of the instance owning `topic`'s robot.
 
-    async def publish(self, topic: str, payload: dict[str, Any]) -> None:
-        """Publish a message to the MQTT broker."""
-        if self._client is not None:
-            await self._client.publish(topic, json.dumps(payload).encode())
+        It arrives there as if received on `topic` itself, so it is handled
+        by that instance's `inbox` route for the topic, in order with the
+        robot's other messages.
+        """
+        owner = self.cluster.owner(robot_id_from_topic(topic))
+        await self.publish(self.cluster.forward_topic(owner, topic), payload)
+
+    async def _publish_raw(self, topic: str, data: bytes) -> None:
+        # Cluster forwarding of telemetry: QoS0 on the lowest lane, never retried
+        self.outbound.put(topic, data, qos=0, priority=PRIORITY_FORWARD)
 
     async def stop(self) -> None:
-        if self._task is not None:
-            self._task.cancel()
-            try:
-                await self._task
-            except asyncio.CancelledError:
-                pass
+        if self._io is not None:
+            await self._io.run(self._stop_io())
+            await self._io.stop()
+            self._io = None
+            self._handoff = None
+        else:
+            await self._stop_io()
+        if len(self.outbound):
+            logger.warning("Discarding %d unsent MQTT message(s)", len(self.outbound))
+        await self.ingest.stop()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "thread": self._io is not None,
+            "handoff": self._handoff.stats() if self._handoff is not None else None,
+        }
 
 
 mqtt_client = MQTTClient()
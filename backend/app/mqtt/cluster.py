@@ -0,0 +1,108 @@
+"""Clustered ingest: N backend instances share one MQTT fleet.
+
+Telemetry is consumed through `$share/<group>/...` shared subscriptions, so
+the broker load-balances it across instances. Each robot is owned by exactly
+one instance, chosen by consistent hashing over the configured members; a
+shared-subscription message that lands on a non-owner is forwarded, still
+undecoded, to the owner's inbox topic `argus-cluster/<owner>/<original topic>`.
+Status messages use ordinary subscriptions and are simply ignored by
+instances that don't own the robot.
+
+Operator commands are created on the owner too: a non-owner forwards a
+WebSocket `command.send` to `argus-cluster/<owner>/argus/<robot>/command/send`,
+where an inbox-only route handles it. Acks also use an ordinary subscription
+but reach every instance's handler, so a command issued anywhere else (REST,
+AI approvals) is still updated where its record lives.
+"""
+
+from __future__ import annotations
+
+import bisect
+import hashlib
+import socket
+from typing import Any
+
+from app.config import settings
+
+INBOX_ROOT = "argus-cluster"
+
+
+def _hash(key: str) -> int:
+    return int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest(), "big")
+
+
+class HashRing:
+    """Consistent-hash ring with virtual nodes."""
+
+    def __init__(self, members: list[str], vnodes: int = 160) -> None:
+        self._points: list[int] = []
+        self._owners: list[str] = []
+        ring = sorted(
+            (_hash(f"{member}#{i}"), member)
+            for member in set(members)
+            for i in range(vnodes)
+        )
+        for point, member in ring:
+            self._points.append(point)
+            self._owners.append(member)
+
+    def owner(self, key: str) -> str:
+        if not self._points:
+            return ""
+        idx = bisect.bisect(self._points, _hash(key)) % len(self._points)
+        return self._owners[idx]
+
+
+class ClusterRouter:
+    def __init__(self) -> None:
+        self.enabled = settings.cluster_enabled
+        self.instance_id = settings.cluster_instance_id or socket.gethostname()
+        members = list(settings.cluster_members) or [self.instance_id]
+        if self.instance_id not in members:
+            members.append(self.instance_id)
+        self.members = members
+        self.ring = HashRing(members)
+        self.inbox_prefix = f"{INBOX_ROOT}/{self.instance_id}/"
+        self._owner_cache: dict[str, str] = {}
+        self.forwarded = 0
+        self.received_forwarded = 0
+        self.ignored = 0
+
+    def owner(self, robot_id: str) -> str:
+        owner = self._owner_cache.get(robot_id)
+        if owner is None:
+            owner = self.ring.owner(robot_id)
+            self._owner_cache[robot_id] = owner
+        return owner
+
+    def is_local(self, robot_id: str) -> bool:
+        return not self.enabled or self.owner(robot_id) == self.instance_id
+
+    def subscription(self, topic_filter: str, shared: bool) -> str:
+        if self.enabled and shared:
+            return f"$share/{settings.cluster_share_group}/{topic_filter}"
+        return topic_filter
+
+    def inbox_filter(self) -> str:
+        return f"{self.inbox_prefix}#"
+
+    def unwrap(self, topic: str) -> str | None:
+        """Original topic if `topic` was forwarded to this instance, else None."""
+        if self.enabled and topic.startswith(self.inbox_prefix):
+            self.received_forwarded += 1
+            return topic[len(self.inbox_prefix):]
+        return None
+
+    def forward_topic(self, owner: str, topic: str) -> str:
+        self.forwarded += 1
+        return f"{INBOX_ROOT}/{owner}/{topic}"
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "instanceId": self.instance_id,
+            "members": self.members,
+            "forwarded": self.forwarded,
+            "receivedForwarded": self.received_forwarded,
+            "ignored": self.ignored,
+        }
@@ -2,19 +2,65 @@ from __future__ import annotations
 
 import asyncio
 import logging
+import time
 from datetime import datetime, timezone
 from typing import Any
 
+from app import codec
 from app.ai.analysis_service import analysis_service
+from app.config import settings
 from app.db.repositories.command_repo import command_repo
 from app.db.repositories.telemetry_repo import telemetry_repo
+from app.mqtt import wire
+from app.mqtt.client import MQTTClient, mqtt_client
+from app.mqtt.outbound import OutboundQueueFull
 from app.services.command_service import command_service
+from app.services.liveness import liveness_tracker
 from app.services.state_manager import state_manager
+from app.services.telemetry_rate import telemetry_rate_controller
 from app.ws.manager import ws_manager
 
 logger = logging.getLogger(__name__)
 
 
+def register_routes(client: MQTTClient) -> None:
+    """Wire the robot-facing topics to their handlers."""
+    telemetry_tap = persist_telemetry if settings.telemetry_persist_all else None
+    client.on(
+        "argus/+/telemetry/position",
+        handle_telemetry,
+        decoder=wire.telemetry_decoder(wire.KIND_POSITION, codec.PositionTelemetry),
+        conflate=True,
+        tap=telemetry_tap,
+        shared=True,
+    )
+    client.on(
+        "argus/+/telemetry/health",
+        handle_telemetry,
+        decoder=wire.telemetry_decoder(wire.KIND_HEALTH, codec.HealthTelemetry),
+        conflate=True,
+        tap=telemetry_tap,
+        shared=True,
+    )
+    client.on("argus/+/status", handle_status, codec.StatusMessage)
+    # Acks are handled wherever the command was issued (robot state only changes on the owner)
+    client.on("argus/+/command/ack", handle_command_ack, codec.CommandAck, everywhere=True)
+    client.on("argus/+/command/send", handle_command_send, codec.CommandRequest, inbox=True)
+
+
+def persist_telemetry(topic: str, payload: dict[str, Any]) -> None:
+    """Read-loop tap: enqueue every telemetry sample for the database,
+    including ones later conflated away before reaching handle_telemetry."""
+    parts = topic.split("/")
+    if len(parts) < 4:
+        return
+
+    if parts[3] == "position":
+        telemetry_repo.enqueue(parts[1], position=payload)
+    elif parts[3] == "health":
+        telemetry_repo.enqueue(parts[1], health=payload)
+
+
 async def handle_telemetry(topic: str, payload: dict[str, Any]) -> None:
     """Handle telemetry messages from robots."""
     parts = topic.split("/")
@@ -26,22 +72,18 @@ async def handle_telemetry(topic: str, payload: dict[str, Any]) -> None:
 
     if subcategory == "position":
         robot = state_manager.update_position(robot_id, payload)
-        # Enqueue for database persistence
-        telemetry_repo.enqueue(robot_id, position=payload)
     elif subcategory == "health":
         robot = state_manager.update_health(robot_id, payload)
-        telemetry_repo.enqueue(robot_id, health=payload)
     else:
         return
 
+    if not settings.telemetry_persist_all:
+        # Only samples that survived conflation are persisted
+        persist_telemetry(topic, payload)
+
     if robot is not None:
-        await ws_manager.broadcast(
-            {
-                "type": "robot.updated",
-                "payload": robot.to_dict(),
-                "timestamp": datetime.now(timezone.utc).isoformat(),
-            }
-        )
+        liveness_tracker.watch(robot)
+        await ws_manager.broadcast_robot(robot)
         # Run heuristic analysis on telemetry updates
         asyncio.create_task(analysis_service.on_telemetry(robot))
 
@@ -53,16 +95,89 @@ async def handle_status(topic: str, payload: dict[str, Any]) -> None:
         return
 
     robot_id = parts[1]
+    telemetry_format = payload.get("telemetry_format")
+    if telemetry_format and telemetry_format not in wire.SUPPORTED_FORMATS:
+        logger.warning("Robot %s announced unsupported telemetry format %r", robot_id, telemetry_format)
     robot = state_manager.update_status(robot_id, payload)
+    # A status message means the robot (re)started at its default rate
+    telemetry_rate_controller.forget(robot_id)
 
     if robot is not None:
+        liveness_tracker.watch(robot)
+        await ws_manager.broadcast_robot(robot)
+
+
+async def send_operator_command(
+    robot_id: str, command_type: str, parameters: dict[str, Any]
+) -> None:
+    """Create, publish and announce an operator command on the robot's owning instance."""
+    robot = state_manager.robots.get(robot_id)
+    if robot is None:
+        return
+
+    # Create command record
+    cmd = command_service.create_command(
+        robot_id=robot_id,
+        command_type=command_type,
+        parameters=parameters,
+        source="operator",
+    )
+
+    # Publish to MQTT for the robot
+    try:
+        await mqtt_client.publish(
+            f"argus/{robot_id}/command/execute",
+            {
+                "command_id": cmd.id,
+                "command_type": command_type,
+                "parameters": parameters,
+            },
+        )
+    except OutboundQueueFull as e:
+        logger.warning("Command %s -> %s rejected: %s", command_type, robot_id, e)
+        command_service.update_status(cmd.id, "failed")
         await ws_manager.broadcast(
             {
-                "type": "robot.updated",
-                "payload": robot.to_dict(),
+                "type": "command.status",
+                "payload": cmd.to_dict(),
                 "timestamp": datetime.now(timezone.utc).isoformat(),
             }
         )
+        return
+
+    # Track operator authority
+    robot.last_command_source = "operator"
+    robot.last_command_at = time.time()
+    state_manager.touch()
+
+    # Update command status to sent
+    command_service.update_status(cmd.id, "sent")
+
+    # Persist command to database (fire-and-forget)
+    asyncio.create_task(
+        command_repo.insert(
+            cmd.id, robot_id, command_type, parameters, "operator", "sent"
+        )
+    )
+
+    # Broadcast command status to all clients
+    await ws_manager.broadcast(
+        {
+            "type": "command.status",
+            "payload": cmd.to_dict(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+        }
+    )
+
+    logger.info("Command dispatched: %s -> %s (%s)", command_type, robot_id, cmd.id)
+
+
+async def handle_command_send(topic: str, payload: dict[str, Any]) -> None:
+    """Handle an operator command forwarded by the instance the operator is connected to."""
+    parts = topic.split("/")
+    if len(parts) < 4 or not payload.get("command_type"):
+        return
+    await send_operator_command(parts[1], payload["command_type"], payload.get("parameters", {}))
 
 
 async def handle_command_ack(topic: str, payload: dict[str, Any]) -> None:
@@ -77,7 +192,8 @@ async def handle_command_ack(topic: str, payload: dict[str, Any]) -> None:
 
     logger.info("Command ACK from %s: cmd=%s status=%s", robot_id, command_id, status)
 
-    cmd = command_service.update_status(command_id, status)
+    # A command mirrored from the replica that issued it is updated there and relayed back
+    cmd = None if command_id in command_service.remote else command_service.update_status(command_id, status)
     if cmd is not None:
         # Persist status update to database (fire-and-forget)
         asyncio.create_task(command_repo.update_status(command_id, status))
@@ -91,14 +207,9 @@ async def handle_command_ack(topic: str, payload: dict[str, Any]) -> None:
         )
 
     # Update robot status based on command status
-    if status == "completed":
+    if status == "completed" and mqtt_client.cluster.is_local(robot_id):
         robot = state_manager.robots.get(robot_id)
         if robot and robot.status not in ("error", "offline"):
             robot.status = "active"
-            await ws_manager.broadcast(
-                {
-                    "type": "robot.updated",
-                    "payload": robot.to_dict(),
-                    "timestamp": datetime.now(timezone.utc).isoformat(),
-                }
-            )
+            state_manager.touch(robot)
+            await ws_manager.broadcast_robot(robot)
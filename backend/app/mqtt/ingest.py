@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import zlib
+from collections import deque
+from typing import Any, Callable, Coroutine
+
+logger = logging.getLogger(__name__)
+
+# Callback that processes one decoded message (topic, payload)
+Dispatcher = Callable[[str, Any], Coroutine[Any, Any, None]]
+
+# Queue placeholder: the payload lives in _Shard.latest until the worker gets to it
+_CONFLATED = object()
+
+
+def robot_id_from_topic(topic: str) -> str:
+    """argus/{robot_id}/... -> robot_id ("" if the topic has no robot segment)."""
+    parts = topic.split("/", 2)
+    return parts[1] if len(parts) >= 2 else ""
+
+
+class _Shard:
+    """One FIFO drained by a single worker task.
+
+    Nothing is ever dropped from it. Conflatable telemetry is bounded by
+    replacing the queued sample for the same (robot_id, subtopic); every
+    other message (status, command acks, unconflated telemetry) counts
+    towards `maxsize`, past which the read loop is held back instead.
+    """
+
+    def __init__(self, index: int, maxsize: int) -> None:
+        self.index = index
+        self.maxsize = maxsize
+        self.queue: deque[tuple[str, Any]] = deque()
+        # Latest unprocessed payload per conflatable topic (robot_id, subtopic)
+        self.latest: dict[str, Any] = {}
+        self.wakeup = asyncio.Event()
+        self.task: asyncio.Task[None] | None = None
+        self.processed = 0
+        self.conflated = 0
+        self.high_water = 0
+
+    @property
+    def full(self) -> bool:
+        # Queued conflatable entries are at most one per topic, so only the rest count
+        return len(self.queue) - len(self.latest) >= self.maxsize
+
+    def put(self, topic: str, payload: Any, conflate: bool = False) -> None:
+        if conflate:
+            if topic in self.latest:
+                # Latest value wins: replace the stale sample still waiting in line
+                self.latest[topic] = payload
+                self.conflated += 1
+                return
+            self.latest[topic] = payload
+            payload = _CONFLATED
+
+        self.queue.append((topic, payload))
+        if len(self.queue) > self.high_water:
+            self.high_water = len(self.queue)
+        self.wakeup.set()
+
+    def get(self) -> tuple[str, Any]:
+        topic, payload = self.queue.popleft()
+        if payload is _CONFLATED:
+            payload = self.latest.pop(topic)
+        return topic, payload
+
+
+class IngestPipeline:
+    """Shards inbound MQTT messages onto N bounded worker queues by robot_id.
+
+    All messages for one robot hash to the same shard, so per-robot ordering
+    holds while a slow downstream handler only stalls its own shard. `submit`
+    never awaits, so the MQTT read loop keeps draining the broker.
+
+    Messages submitted with `conflate=True` are keyed by topic: if a sample
+    for the same robot and subtopic is still waiting, it is replaced in place
+    rather than queued behind it, so a backlog only ever applies the newest
+    state. Other messages are never dropped: once a shard holds `queue_size`
+    of them, `submit` reports it full and the read loop waits in
+    `wait_for_room`, leaving the backlog with the broker.
+    """
+
+    def __init__(self, dispatch: Dispatcher, workers: int = 8, queue_size: int = 1000) -> None:
+        self._dispatch = dispatch
+        self._shards = [_Shard(i, queue_size) for i in range(max(1, workers))]
+        self.backpressure_waits = 0
+
+    def start(self) -> None:
+        for shard in self._shards:
+            if shard.task is None:
+                shard.task = asyncio.create_task(self._worker(shard))
+        logger.info("Ingest pipeline started (%d workers)", len(self._shards))
+
+    async def stop(self) -> None:
+        for shard in self._shards:
+            if shard.task is not None:
+                shard.task.cancel()
+                try:
+                    await shard.task
+                except asyncio.CancelledError:
+                    pass
+                shard.task = None
+
+    def shard_for(self, robot_id: str) -> int:
+        return zlib.crc32(robot_id.encode()) % len(self._shards)
+
+    def submit(self, topic: str, payload: Any, conflate: bool = False) -> bool:
+        """Enqueue a decoded message. Returns False if its shard is now full."""
+        shard = self._shards[self.shard_for(robot_id_from_topic(topic))]
+        shard.put(topic, payload, conflate)
+        return not shard.full
+
+    async def wait_for_room(self, topic: str) -> None:
+        """Hold the caller until the shard for `topic` is below its limit.
+
+        Polls rather than waiting on an event so the read loop may run on
+        another thread's event loop (INGEST_THREAD=true).
+        """
+        shard = self._shards[self.shard_for(robot_id_from_topic(topic))]
+        if not shard.full:
+            return
+        self.backpressure_waits += 1
+        while shard.full:
+            await asyncio.sleep(0.005)
+
+    async def _worker(self, shard: _Shard) -> None:
+        while True:
+            if not shard.queue:
+                shard.wakeup.clear()
+                await shard.wakeup.wait()
+                continue
+            topic, payload = shard.get()
+            try:
+                await self._dispatch(topic, payload)
+            except Exception:
+                logger.exception("Ingest worker %d failed on %s", shard.index, topic)
+            shard.processed += 1
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "workers": len(self._shards),
+            "queueDepth": sum(len(s.queue) for s in self._shards),
+            "processed": sum(s.processed for s in self._shards),
+            "conflated": sum(s.conflated for s in self._shards),
+            "backpressureWaits": self.backpressure_waits,
+            "shards": [
+                {
+                    "depth": len(s.queue),
+                    "highWater": s.high_water,
+                    "processed": s.processed,
+                    "conflated": s.conflated,
+                }
+                for s in self._shards
+            ],
+        }
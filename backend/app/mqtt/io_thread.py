@@ -0,0 +1,89 @@
+"""Dedicated event loop for MQTT I/O, isolated from HTTP/WebSocket serving.
+
+With INGEST_THREAD=true the broker connection, read loop, decode/routing
+and outbound publishing run on their own loop in a daemon thread. Decoded
+messages cross back to the serving loop through a LoopHandoff, where the
+ingest workers apply them to state and fan them out.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures
+import logging
+import threading
+from collections import deque
+from typing import Any, Callable, Coroutine, Generic, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class IOThread:
+    """Runs an event loop forever in a daemon thread."""
+
+    def __init__(self, name: str) -> None:
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._main, name=name, daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def _main(self) -> None:
+        asyncio.set_event_loop(self.loop)
+        try:
+            self.loop.run_forever()
+        finally:
+            self.loop.close()
+
+    def submit(self, coro: Coroutine[Any, Any, T]) -> concurrent.futures.Future[T]:
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    async def run(self, coro: Coroutine[Any, Any, T]) -> T:
+        """Run `coro` on the I/O loop and await its result from another loop."""
+        return await asyncio.wrap_future(self.submit(coro))
+
+    async def stop(self, timeout: float = 5.0) -> None:
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        await asyncio.to_thread(self._thread.join, timeout)
+        if self._thread.is_alive():
+            logger.warning("I/O thread %s did not stop within %.0fs", self._thread.name, timeout)
+
+
+class LoopHandoff(Generic[T]):
+    """Lock-free hand-off of items from any thread to a target event loop.
+
+    Producers append to a deque (atomic under the GIL) and schedule at most
+    one pending drain callback on the target loop, so a burst of messages
+    costs one cross-thread wakeup rather than one per message.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, consume: Callable[[T], None]) -> None:
+        self._loop = loop
+        self._consume = consume
+        self._items: deque[T] = deque()
+        self._scheduled = False
+        self.handed_off = 0
+        self.wakeups = 0
+
+    def put(self, item: T) -> None:
+        self._items.append(item)
+        if not self._scheduled:
+            self._scheduled = True
+            self._loop.call_soon_threadsafe(self._drain)
+
+    def _drain(self) -> None:
+        self._scheduled = False
+        self.wakeups += 1
+        items = self._items
+        while items:
+            self._consume(items.popleft())
+            self.handed_off += 1
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "pending": len(self._items),
+            "handedOff": self.handed_off,
+            "wakeups": self.wakeups,
+        }
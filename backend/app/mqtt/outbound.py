@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable
+
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 1
+PRIORITY_BULK = 2
+PRIORITY_FORWARD = 3  # QoS0 traffic such as cluster forwarding: best effort, never retried
+_LANE_NAMES = ("high", "normal", "bulk", "forward")
+
+# Safety commands jump ahead of everything else
+HIGH_PRIORITY_COMMANDS = {"stop", "return_home", "hold_position", "land", "surface"}
+# Large payloads that can wait behind interactive traffic
+BULK_COMMANDS = {"follow_waypoints"}
+
+# Publishes one message; raises on failure (e.g. aiomqtt.MqttError)
+PublishFn = Callable[[str, bytes, int], Awaitable[None]]
+
+
+class OutboundQueueFull(Exception):
+    """A command lane is at capacity; the message was rejected, not queued."""
+
+
+def command_priority(payload: dict[str, Any]) -> int:
+    command_type = payload.get("command_type", "")
+    if command_type in HIGH_PRIORITY_COMMANDS:
+        return PRIORITY_HIGH
+    if command_type in BULK_COMMANDS:
+        return PRIORITY_BULK
+    return PRIORITY_NORMAL
+
+
+class _Message:
+    __slots__ = ("topic", "data", "qos", "enqueued_at", "attempts")
+
+    def __init__(self, topic: str, data: bytes, qos: int) -> None:
+        self.topic = topic
+        self.data = data
+        self.qos = qos
+        self.enqueued_at = time.monotonic()
+        self.attempts = 0
+
+
+class OutboundQueue:
+    """Priority-laned publish queue drained in batches by one sender task.
+
+    `put` never blocks. The sender waits while the broker is unreachable and
+    re-queues failed publishes at the head of their lane, so commands issued
+    during a reconnect go out once the connection is back instead of being
+    dropped. Lanes are strict priority: high drains before normal before bulk.
+
+    Command lanes never drop anything: once one is full, `put` raises
+    OutboundQueueFull. QoS0 messages go to the forward lane, which is only
+    drained when no command is waiting, is never batched with commands, and
+    sheds its oldest message when full or when a publish fails.
+    """
+
+    def __init__(self, batch_size: int = 32, max_lane_size: int = 10_000) -> None:
+        self._lanes: tuple[deque[_Message], ...] = (deque(), deque(), deque(), deque())
+        self._batch_size = batch_size
+        self._max_lane_size = max_lane_size
+        self._wakeup = asyncio.Event()
+        self._latencies: deque[float] = deque(maxlen=1024)
+        self.sent = 0
+        self.retried = 0
+        self.dropped = 0
+        self.rejected = 0
+
+    def check(self, qos: int, priority: int) -> None:
+        """Raise OutboundQueueFull if a message with this qos/priority would be rejected."""
+        if qos > 0 and len(self._lanes[priority]) >= self._max_lane_size:
+            self.rejected += 1
+            raise OutboundQueueFull(
+                f"{_LANE_NAMES[priority]} publish lane is full ({self._max_lane_size} queued)"
+            )
+
+    def put(self, topic: str, data: bytes, qos: int = 1, priority: int = PRIORITY_NORMAL) -> None:
+        if qos == 0:
+            priority = PRIORITY_FORWARD
+        lane = self._lanes[priority]
+        if priority == PRIORITY_FORWARD:
+            if len(lane) >= self._max_lane_size:
+                lane.popleft()
+                self.dropped += 1
+        else:
+            self.check(qos, priority)
+        lane.append(_Message(topic, data, qos))
+        self._wakeup.set()
+
+    def __len__(self) -> int:
+        return sum(len(lane) for lane in self._lanes)
+
+    def _take_batch(self) -> list[tuple[int, _Message]]:
+        batch: list[tuple[int, _Message]] = []
+        for priority, lane in enumerate(self._lanes[:PRIORITY_FORWARD]):
+            while lane and len(batch) < self._batch_size:
+                batch.append((priority, lane.popleft()))
+            if len(batch) >= self._batch_size:
+                break
+        if not batch:
+            # Forwards only go out in batches of their own, once no command waits
+            lane = self._lanes[PRIORITY_FORWARD]
+            while lane and len(batch) < self._batch_size:
+                batch.append((PRIORITY_FORWARD, lane.popleft()))
+        return batch
+
+    async def drain(self, publish: PublishFn) -> None:
+        """Publish until `publish` fails; the failed commands of that batch are re-queued."""
+        while True:
+            if not len(self):
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            batch = self._take_batch()
+            results = await asyncio.gather(
+                *(publish(m.topic, m.data, m.qos) for _, m in batch),
+                return_exceptions=True,
+            )
+            now = time.monotonic()
+            failed: list[tuple[int, _Message]] = []
+            errors: list[BaseException] = []
+            for (priority, msg), result in zip(batch, results):
+                if isinstance(result, BaseException):
+                    errors.append(result)
+                    if priority == PRIORITY_FORWARD:
+                        self.dropped += 1
+                        continue
+                    msg.attempts += 1
+                    failed.append((priority, msg))
+                else:
+                    self.sent += 1
+                    self._latencies.append(now - msg.enqueued_at)
+            if failed:
+                # Put them back in their original order ahead of newer traffic
+                for priority, msg in reversed(failed):
+                    self._lanes[priority].appendleft(msg)
+                self.retried += len(failed)
+            if errors:
+                raise errors[0]
+
+    def stats(self) -> dict[str, Any]:
+        latencies = sorted(self._latencies)
+
+        def pct(p: float) -> float:
+            if not latencies:
+                return 0.0
+            return round(latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000, 2)
+
+        return {
+            "depth": {name: len(lane) for name, lane in zip(_LANE_NAMES, self._lanes)},
+            "sent": self.sent,
+            "retried": self.retried,
+            "dropped": self.dropped,
+            "rejected": self.rejected,
+            "latencyMs": {"p50": pct(0.5), "p95": pct(0.95), "p99": pct(0.99), "max": pct(1.0)},
+        }
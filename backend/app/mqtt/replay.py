@@ -0,0 +1,231 @@
+"""MQTT traffic recorder and time-scaled replayer for load testing.
+
+Capture file format (append-only):
+    header  b"ARGREC1\\n"
+    record  <d H I>  recv time (epoch s), topic length, payload length
+            followed by the topic (UTF-8) and the raw payload bytes
+
+Usage (from backend/):
+    python -m app.mqtt.replay record fleet.argusrec
+    python -m app.mqtt.replay replay fleet.argusrec --speed 10 --multiply 20
+    python -m app.mqtt.replay bench fleet.argusrec --speed 0 --multiply 200
+
+`replay` re-publishes through the configured broker; `bench` feeds the
+backend's own MQTTClient in-process (no broker, no database) and reports
+ingest throughput and pipeline counters.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import logging
+import struct
+import time
+from pathlib import Path
+from typing import Any, Awaitable, BinaryIO, Callable, Iterator
+
+import aiomqtt
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"ARGREC1\n"
+_RECORD = struct.Struct("<dHI")
+
+# Receives one (topic, payload) pair during replay
+Sink = Callable[[str, bytes], Awaitable[None]]
+
+
+def _broker_kwargs() -> dict[str, Any]:
+    kwargs: dict[str, Any] = {
+        "hostname": settings.mqtt_broker,
+        "port": settings.mqtt_port,
+    }
+    if settings.mqtt_user:
+        kwargs["username"] = settings.mqtt_user
+        kwargs["password"] = settings.mqtt_password
+    return kwargs
+
+
+class Recorder:
+    """Appends every message on `topic_filter` to a capture file."""
+
+    def __init__(self, path: Path, topic_filter: str = "argus/#") -> None:
+        self.path = path
+        self.topic_filter = topic_filter
+        self.count = 0
+
+    def _open(self) -> BinaryIO:
+        new = not self.path.exists() or self.path.stat().st_size == 0
+        f = self.path.open("ab")
+        if new:
+            f.write(MAGIC)
+        return f
+
+    def write(self, f: BinaryIO, ts: float, topic: str, payload: bytes) -> None:
+        encoded = topic.encode()
+        f.write(_RECORD.pack(ts, len(encoded), len(payload)))
+        f.write(encoded)
+        f.write(payload)
+        self.count += 1
+
+    async def run(self, duration: float | None = None) -> None:
+        deadline = time.monotonic() + duration if duration else None
+        with self._open() as f:
+            async with aiomqtt.Client(**_broker_kwargs()) as client:
+                await client.subscribe(self.topic_filter)
+                logger.info("Recording %s to %s", self.topic_filter, self.path)
+                messages = aiter(client.messages)
+                while deadline is None or time.monotonic() < deadline:
+                    timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+                    try:
+                        message = await asyncio.wait_for(anext(messages), timeout)
+                    except asyncio.TimeoutError:
+                        break
+                    payload = message.payload
+                    if isinstance(payload, str):
+                        payload = payload.encode()
+                    elif not isinstance(payload, (bytes, bytearray)):
+                        payload = str(payload).encode()
+                    self.write(f, time.time(), str(message.topic), bytes(payload))
+                    if self.count % 1000 == 0:
+                        f.flush()
+        logger.info("Recorded %d messages", self.count)
+
+
+def read_records(path: Path) -> Iterator[tuple[float, str, bytes]]:
+    with path.open("rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not an Argus capture file")
+        while True:
+            header = f.read(_RECORD.size)
+            if len(header) < _RECORD.size:
+                return  # EOF (or a torn final record from an interrupted capture)
+            ts, topic_len, payload_len = _RECORD.unpack(header)
+            topic = f.read(topic_len)
+            payload = f.read(payload_len)
+            if len(topic) < topic_len or len(payload) < payload_len:
+                return
+            yield ts, topic.decode(), payload
+
+
+def clone_topic(topic: str, copy: int) -> str:
+    """argus/{robot_id}/... -> argus/{robot_id}-x{copy}/... (copy 0 is unchanged)."""
+    if copy == 0:
+        return topic
+    parts = topic.split("/", 2)
+    if len(parts) < 3 or parts[0] != "argus":
+        return topic
+    return f"argus/{parts[1]}-x{copy}/{parts[2]}"
+
+
+class Replayer:
+    """Re-emits a capture into a sink at `speed`x, optionally cloning robots.
+
+    `speed=0` replays as fast as the sink accepts. With `multiply=N`, every
+    `argus/{id}/...` message is emitted N times under ids `{id}`, `{id}-x1`,
+    ... so a 5-robot capture can stand in for a 5*N-robot fleet.
+    """
+
+    def __init__(self, path: Path, speed: float = 1.0, multiply: int = 1) -> None:
+        self.path = path
+        self.speed = speed
+        self.multiply = max(1, multiply)
+        self.count = 0
+
+    async def run(self, sink: Sink) -> None:
+        start = time.monotonic()
+        first_ts: float | None = None
+        for ts, topic, payload in read_records(self.path):
+            if first_ts is None:
+                first_ts = ts
+            if self.speed > 0:
+                delay = start + (ts - first_ts) / self.speed - time.monotonic()
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            else:
+                # Yield like a socket read would, so workers interleave with the feed
+                await asyncio.sleep(0)
+            for copy in range(self.multiply):
+                await sink(clone_topic(topic, copy), payload)
+                self.count += 1
+
+
+async def replay_to_broker(replayer: Replayer) -> None:
+    async with aiomqtt.Client(**_broker_kwargs()) as client:
+
+        async def sink(topic: str, payload: bytes) -> None:
+            await client.publish(topic, payload)
+
+        await replayer.run(sink)
+
+
+async def bench_in_memory(replayer: Replayer) -> dict[str, Any]:
+    """Feed a capture straight into the backend's MQTTClient and time ingest."""
+    from app.mqtt.client import MQTTClient
+    from app.mqtt.handlers import register_routes
+
+    client = MQTTClient()
+    register_routes(client)
+    client.ingest.start()
+    try:
+        start = time.perf_counter()
+        await replayer.run(client.feed)
+        fed = time.perf_counter() - start
+        while client.ingest.stats()["queueDepth"]:
+            await asyncio.sleep(0.01)
+        total = time.perf_counter() - start
+    finally:
+        await client.ingest.stop()
+    stats = client.ingest.stats()
+    return {
+        "messages": replayer.count,
+        "feedSeconds": round(fed, 3),
+        "totalSeconds": round(total, 3),
+        "messagesPerSecond": round(replayer.count / total) if total else 0,
+        "processed": stats["processed"],
+        "conflated": stats["conflated"],
+        "backpressureWaits": stats["backpressureWaits"],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Record and replay Argus MQTT traffic")
+    sub = parser.add_subparsers(dest="mode", required=True)
+
+    rec = sub.add_parser("record", help="capture broker traffic to a file")
+    rec.add_argument("path", type=Path)
+    rec.add_argument("--filter", default="argus/#")
+    rec.add_argument("--duration", type=float, default=None, help="seconds (default: until Ctrl-C)")
+
+    for name, help_text in (
+        ("replay", "re-publish a capture to the broker"),
+        ("bench", "feed a capture into an in-process MQTTClient and time ingest"),
+    ):
+        p = sub.add_parser(name, help=help_text)
+        p.add_argument("path", type=Path)
+        p.add_argument("--speed", type=float, default=1.0, help="1, 10, 100... (0 = unthrottled)")
+        p.add_argument("--multiply", type=int, default=1, help="clone each robot N times")
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    if args.mode == "record":
+        try:
+            asyncio.run(Recorder(args.path, args.filter).run(args.duration))
+        except KeyboardInterrupt:
+            pass
+    elif args.mode == "replay":
+        replayer = Replayer(args.path, args.speed, args.multiply)
+        asyncio.run(replay_to_broker(replayer))
+        logger.info("Replayed %d messages", replayer.count)
+    else:
+        result = asyncio.run(bench_in_memory(Replayer(args.path, args.speed, args.multiply)))
+        for key, value in result.items():
+            print(f"{key:>18}: {value}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+from __future__ import annotations
+
+from typing import Generic, TypeVar
+
+T = TypeVar("T")
+
+# Matched topics are memoised; the key space is robots x subtopics, so this
+# stays small, but cap it so a misbehaving publisher can't grow it forever.
+_MATCH_CACHE_MAX = 8192
+
+
+def validate_filter(topic_filter: str) -> list[str]:
+    """Split an MQTT topic filter into levels, rejecting malformed wildcards."""
+    levels = topic_filter.split("/")
+    for i, level in enumerate(levels):
+        if "#" in level and (level != "#" or i != len(levels) - 1):
+            raise ValueError(f"'#' must be the last level on its own: {topic_filter!r}")
+        if "+" in level and level != "+":
+            raise ValueError(f"'+' must occupy a whole level: {topic_filter!r}")
+    return levels
+
+
+def filter_covers(outer: str, inner: str) -> bool:
+    """True if every topic matched by `inner` is also matched by `outer`."""
+    a, b = outer.split("/"), inner.split("/")
+    for i, level in enumerate(a):
+        if level == "#":
+            return True
+        if i >= len(b):
+            return False
+        if b[i] == "#":
+            return False
+        if level != "+" and level != b[i]:
+            return False
+    return len(a) == len(b)
+
+
+class _Node(Generic[T]):
+    __slots__ = ("children", "plus", "hash_values", "values")
+
+    def __init__(self) -> None:
+        self.children: dict[str, _Node[T]] = {}
+        self.plus: _Node[T] | None = None
+        self.hash_values: list[T] = []  # values registered at "<prefix>/#"
+        self.values: list[T] = []  # values registered exactly at this level
+
+
+class TopicTrie(Generic[T]):
+    """Routing trie for MQTT topic filters with '+' and '#' wildcards.
+
+    Filters are compiled once at registration; `match` walks at most one
+    exact and one '+' branch per level instead of scanning every filter.
+    """
+
+    def __init__(self) -> None:
+        self._root: _Node[T] = _Node()
+        self._filters: list[str] = []
+        self._cache: dict[str, list[T]] = {}
+
+    def add(self, topic_filter: str, value: T) -> None:
+        node = self._root
+        levels = validate_filter(topic_filter)
+        for level in levels:
+            if level == "#":
+                node.hash_values.append(value)
+                break
+            if level == "+":
+                if node.plus is None:
+                    node.plus = _Node()
+                node = node.plus
+            else:
+                node = node.children.setdefault(level, _Node())
+        else:
+            node.values.append(value)
+        if topic_filter not in self._filters:
+            self._filters.append(topic_filter)
+        self._cache.clear()
+
+    def filters(self) -> list[str]:
+        return list(self._filters)
+
+    def subscriptions(self) -> list[str]:
+        """Registered filters minus any already covered by a broader one."""
+        result: list[str] = []
+        for f in self._filters:
+            if any(other != f and filter_covers(other, f) for other in self._filters):
+                continue
+            result.append(f)
+        return result
+
+    def match(self, topic: str) -> list[T]:
+        cached = self._cache.get(topic)
+        if cached is not None:
+            return cached
+
+        levels = topic.split("/")
+        matched: list[T] = []
+        # Per MQTT spec, wildcards at the first level don't match $SYS-style topics
+        system = topic.startswith("$")
+        stack: list[tuple[_Node[T], int]] = [(self._root, 0)]
+        while stack:
+            node, depth = stack.pop()
+            wildcard_ok = not (system and depth == 0)
+            if wildcard_ok:
+                matched.extend(node.hash_values)
+            if depth == len(levels):
+                matched.extend(node.values)
+                continue
+            child = node.children.get(levels[depth])
+            if child is not None:
+                stack.append((child, depth + 1))
+            if node.plus is not None and wildcard_ok:
+                stack.append((node.plus, depth + 1))
+
+        if len(self._cache) >= _MATCH_CACHE_MAX:
+            self._cache.clear()
+        self._cache[topic] = matched
+        return matched
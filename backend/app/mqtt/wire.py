@@ -0,0 +1,106 @@
+"""Compact binary telemetry wire format ("bin1").
+
+Robots announce `"telemetry_format": "bin1"` in their status message and
+then publish fixed-size packed structs instead of JSON on
+argus/{id}/telemetry/position and argus/{id}/telemetry/health. Payloads
+start with a magic byte that can never begin a JSON document, so the
+decoder sniffs per message and mixed fleets (or a robot switching format
+mid-session) decode correctly.
+
+Layout (little-endian):
+    position: magic u8, kind u8, lat i32 (1e-6 deg), lon i32 (1e-6 deg),
+              alt i32 (cm), heading u16 (0.01 deg), speed u16 (cm/s)  = 18 B
+    health:   magic u8, kind u8, battery u16 (0.1 %), signal u16 (0.1 %) = 6 B
+
+Backfill batches (POST /api/telemetry/backfill, BATCH_CONTENT_TYPE) are
+a plain concatenation of records: source time f64 (epoch seconds), then
+one position or health frame.
+
+Keep in sync with simulator/simulator/wire.py.
+"""
+
+from __future__ import annotations
+
+import struct
+from typing import Any
+
+from app import codec
+
+FORMAT_JSON = "json"
+FORMAT_BIN1 = "bin1"
+SUPPORTED_FORMATS = (FORMAT_JSON, FORMAT_BIN1)
+
+MAGIC = 0xA7
+KIND_POSITION = 0x01
+KIND_HEALTH = 0x02
+
+_POSITION = struct.Struct("<BBiiiHH")
+_HEALTH = struct.Struct("<BBHH")
+FRAME_SIZES = {KIND_POSITION: _POSITION.size, KIND_HEALTH: _HEALTH.size}
+
+BATCH_CONTENT_TYPE = "application/x-argus-bin1"
+BATCH_TIME = struct.Struct("<d")
+
+
+def is_binary(raw: bytes | bytearray) -> bool:
+    return len(raw) >= 2 and raw[0] == MAGIC
+
+
+def decode_position(raw: bytes | bytearray) -> dict[str, Any]:
+    magic, kind, lat, lon, alt, heading, speed = _POSITION.unpack(raw)
+    if kind != KIND_POSITION:
+        raise ValueError(f"expected position frame, got kind {kind:#x}")
+    return {
+        "latitude": lat / 1e6,
+        "longitude": lon / 1e6,
+        "altitude": alt / 100,
+        "heading": heading / 100,
+        "speed": speed / 100,
+    }
+
+
+def decode_health(raw: bytes | bytearray) -> dict[str, Any]:
+    magic, kind, battery, signal = _HEALTH.unpack(raw)
+    if kind != KIND_HEALTH:
+        raise ValueError(f"expected health frame, got kind {kind:#x}")
+    return {
+        "battery_percent": battery / 10,
+        "signal_strength": signal / 10,
+    }
+
+
+def encode_position(data: dict[str, Any]) -> bytes:
+    return _POSITION.pack(
+        MAGIC,
+        KIND_POSITION,
+        round(data.get("latitude", 0.0) * 1e6),
+        round(data.get("longitude", 0.0) * 1e6),
+        round(data.get("altitude", 0.0) * 100),
+        round(data.get("heading", 0.0) % 360 * 100) % 36000,
+        min(0xFFFF, max(0, round(data.get("speed", 0.0) * 100))),
+    )
+
+
+def encode_health(data: dict[str, Any]) -> bytes:
+    return _HEALTH.pack(
+        MAGIC,
+        KIND_HEALTH,
+        min(1000, max(0, round(data.get("battery_percent", 0.0) * 10))),
+        min(1000, max(0, round(data.get("signal_strength", 0.0) * 10))),
+    )
+
+
+def telemetry_decoder(kind: int, schema: type | None = None) -> codec.Decoder:
+    """Decoder that accepts either a bin1 frame of `kind` or JSON."""
+    json_decode = codec.typed_decoder(schema)
+    binary_decode = decode_position if kind == KIND_POSITION else decode_health
+
+    def decode(raw: bytes) -> Any:
+        if is_binary(raw):
+            try:
+                return binary_decode(raw)
+            except struct.error as e:
+                raise ValueError(str(e)) from e
+        return json_decode(raw)
+
+    return decode
@@ -0,0 +1,24 @@
+"""Run the backend under uvicorn with the tuned WebSocket compression.
+
+Run from backend/:  python -m app.serve [--host 0.0.0.0] [--port 8000]
+"""
+
+from __future__ import annotations
+
+import argparse
+
+import uvicorn
+
+from app.ws.deflate import TunedDeflateWebSocketProtocol
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args()
+    uvicorn.run("app.main:app", host=args.host, port=args.port, ws=TunedDeflateWebSocketProtocol)
+
+
+if __name__ == "__main__":
+    main()
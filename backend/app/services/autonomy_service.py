@@ -32,6 +32,17 @@ class AutonomyChangeEntry:
             "timestamp": self.timestamp,
         }
 
+    @classmethod
+    def from_dict(cls, e: dict[str, Any]) -> AutonomyChangeEntry:
+        return cls(
+            id=e["id"],
+            robot_id=e["robotId"],
+            old_tier=e["oldTier"],
+            new_tier=e["newTier"],
+            changed_by=e["changedBy"],
+            timestamp=e["timestamp"],
+        )
+
 
 def is_high_risk(command_type: str) -> bool:
     return command_type in HIGH_RISK_COMMANDS
@@ -54,6 +65,7 @@ class AutonomyService:
         if old_tier == tier:
             return None
         robot.autonomy_tier = tier
+        state_manager.touch(robot)
         entry = AutonomyChangeEntry(
             id=str(uuid.uuid4())[:8],
             robot_id=robot_id,
@@ -120,7 +132,25 @@ class AutonomyService:
         return {
             "fleetDefault": self.fleet_default,
             "robots": robot_tiers,
+            "counts": state_manager.fleet_summary()["byTier"],
         }
 
+    def apply_snapshot(self, data: dict[str, Any]) -> None:
+        """Restore the fleet default and change log (warm restart)."""
+        self.fleet_default = data["fleetDefault"]
+        self.change_log = [AutonomyChangeEntry.from_dict(e) for e in data["changeLog"]]
+
+    def apply_change(self, change: dict[str, Any]) -> None:
+        """Replay a tier change made on another replica."""
+        entry = AutonomyChangeEntry.from_dict(change)
+        if entry.robot_id == "__fleet__":
+            self.fleet_default = entry.new_tier
+        else:
+            robot = state_manager.robots.get(entry.robot_id)
+            if robot is not None and robot.autonomy_tier != entry.new_tier:
+                robot.autonomy_tier = entry.new_tier
+                state_manager.touch(robot)
+        self.change_log.append(entry)
+
 
 autonomy_service = AutonomyService()
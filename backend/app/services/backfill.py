@@ -0,0 +1,227 @@
+"""Bulk telemetry backfill from robots that buffered data while offline.
+
+Bodies are parsed incrementally as they stream in and rows go straight to
+the `telemetry` hypertable through one COPY, keeping their source
+timestamps. Backfilled samples never touch live state, WebSocket clients or
+heuristic analysis.
+
+NDJSON: one object per line with `time` (ISO-8601 or epoch seconds/ms),
+optional `robot_id` (defaults to the query parameter), `latitude`,
+`longitude` and optional `altitude`, `heading`, `speed`,
+`battery_percent`, `signal_strength`.
+
+bin1 batch: see app.mqtt.wire.
+
+Health values carry forward onto the robot's following position rows. A
+health-only sample (NDJSON line or bin1 health frame) gets a row of its own
+at the robot's last position earlier in the upload; one that comes before
+any position has nowhere to be placed and is counted as rejected.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, AsyncIterable, AsyncIterator
+
+from app import codec
+from app.db.connection import db
+from app.db.repositories.telemetry_repo import telemetry_repo
+from app.mqtt import wire
+
+logger = logging.getLogger(__name__)
+
+# (robot_id, time, position fields, health fields)
+Record = tuple[str, datetime, dict[str, Any] | None, dict[str, Any] | None]
+
+# telemetry_1m's refresh policy only looks back this far; older backfills
+# refresh the aggregate explicitly
+_ROLLUP_LOOKBACK = timedelta(hours=2)
+
+
+@dataclass
+class BackfillResult:
+    inserted: int = 0
+    rejected: int = 0
+    unknown_robots: set[str] = field(default_factory=set)
+    first_time: datetime | None = None
+    last_time: datetime | None = None
+    elapsed: float = 0.0
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "inserted": self.inserted,
+            "rejected": self.rejected,
+            "unknownRobots": sorted(self.unknown_robots),
+            "firstTime": self.first_time.isoformat() if self.first_time else None,
+            "lastTime": self.last_time.isoformat() if self.last_time else None,
+            "elapsedMs": round(self.elapsed * 1000, 1),
+        }
+
+
+def parse_time(value: Any) -> datetime:
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        # Accept epoch milliseconds as well as seconds
+        seconds = value / 1000 if value > 1e11 else value
+        return datetime.fromtimestamp(seconds, timezone.utc)
+    if isinstance(value, str):
+        parsed = datetime.fromisoformat(value)
+        return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+    raise ValueError(f"unsupported time value: {value!r}")
+
+
+# ── Body parsers ─────────────────────────────────────────────────────────
+
+
+async def _lines(chunks: AsyncIterable[bytes]) -> AsyncIterator[bytes]:
+    tail = b""
+    async for chunk in chunks:
+        if not chunk:
+            continue
+        lines = (tail + chunk).split(b"\n")
+        tail = lines.pop()
+        for line in lines:
+            yield line
+    if tail:
+        yield tail
+
+
+async def ndjson_records(
+    chunks: AsyncIterable[bytes], default_robot_id: str, result: BackfillResult
+) -> AsyncIterator[Record]:
+    """Records from an NDJSON body; malformed lines are counted and skipped."""
+    async for line in _lines(chunks):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            obj = codec.loads(line)
+            robot_id = str(obj.get("robot_id") or default_robot_id)
+            ts = parse_time(obj["time"])
+            position = None
+            if "latitude" in obj and "longitude" in obj:
+                position = {
+                    "latitude": float(obj["latitude"]),
+                    "longitude": float(obj["longitude"]),
+                    "altitude": float(obj.get("altitude", 0.0)),
+                    "heading": float(obj.get("heading", 0.0)),
+                    "speed": float(obj.get("speed", 0.0)),
+                }
+            health = None
+            if "battery_percent" in obj or "signal_strength" in obj:
+                health = {
+                    key: float(obj[key]) if obj.get(key) is not None else None
+                    for key in ("battery_percent", "signal_strength")
+                }
+        except (*codec.DECODE_ERRORS, KeyError, AttributeError, OverflowError, OSError):
+            result.rejected += 1
+            continue
+        if not robot_id or (position is None and health is None):
+            result.rejected += 1
+            continue
+        yield robot_id, ts, position, health
+
+
+async def bin1_records(chunks: AsyncIterable[bytes], robot_id: str) -> AsyncIterator[Record]:
+    """Records from a bin1 batch body. Raises ValueError on a corrupt stream,
+    since there is no way to resynchronise on a fixed-size framing."""
+    header = wire.BATCH_TIME.size + 2
+    buf = bytearray()
+    consumed = 0
+    async for chunk in chunks:
+        buf += chunk
+        pos = 0
+        while len(buf) - pos >= header:
+            magic, kind = buf[pos + header - 2], buf[pos + header - 1]
+            size = wire.FRAME_SIZES.get(kind)
+            if magic != wire.MAGIC or size is None:
+                raise ValueError(f"corrupt bin1 batch at byte {consumed + pos}")
+            end = pos + wire.BATCH_TIME.size + size
+            if end > len(buf):
+                break
+            (seconds,) = wire.BATCH_TIME.unpack_from(buf, pos)
+            frame = bytes(buf[pos + wire.BATCH_TIME.size:end])
+            try:
+                ts = datetime.fromtimestamp(seconds, timezone.utc)
+            except (OverflowError, OSError) as e:
+                raise ValueError(f"bad timestamp at byte {consumed + pos}: {seconds!r}") from e
+            if kind == wire.KIND_POSITION:
+                yield robot_id, ts, wire.decode_position(frame), None
+            else:
+                yield robot_id, ts, None, wire.decode_health(frame)
+            pos = end
+        del buf[:pos]
+        consumed += pos
+    if buf:
+        raise ValueError(f"truncated bin1 batch ({len(buf)} trailing bytes)")
+
+
+# ── Ingest ───────────────────────────────────────────────────────────────
+
+
+class BackfillService:
+    def __init__(self) -> None:
+        self.rows_total = 0
+
+    async def _robot_exists(self, robot_id: str) -> bool:
+        return bool(await db.fetchval("SELECT 1 FROM robots WHERE id = $1", robot_id))
+
+    async def _rows(self, records: AsyncIterable[Record], result: BackfillResult) -> AsyncIterator[tuple]:
+        known: dict[str, bool] = {}
+        last_health: dict[str, dict[str, Any]] = {}
+        last_position: dict[str, dict[str, Any]] = {}
+        async for robot_id, ts, position, health in records:
+            if robot_id not in known:
+                # telemetry.robot_id references robots(id); one bad row would abort the COPY
+                known[robot_id] = await self._robot_exists(robot_id)
+            if not known[robot_id]:
+                result.unknown_robots.add(robot_id)
+                result.rejected += 1
+                continue
+            if health is not None:
+                merged = last_health.setdefault(robot_id, {})
+                merged.update({k: v for k, v in health.items() if v is not None})
+            if position is None:
+                position = last_position.get(robot_id)
+                if position is None:
+                    result.rejected += 1
+                    continue
+            else:
+                last_position[robot_id] = position
+            hlth = last_health.get(robot_id, {})
+            if result.first_time is None or ts < result.first_time:
+                result.first_time = ts
+            if result.last_time is None or ts > result.last_time:
+                result.last_time = ts
+            yield (
+                ts,
+                robot_id,
+                position["latitude"],
+                position["longitude"],
+                position["altitude"],
+                position["heading"],
+                position["speed"],
+                hlth.get("battery_percent"),
+                hlth.get("signal_strength"),
+            )
+
+    async def ingest(self, records: AsyncIterable[Record], result: BackfillResult) -> BackfillResult:
+        """COPY all records in one transaction: a failed upload inserts nothing
+        and can simply be retried."""
+        started = time.perf_counter()
+        result.inserted = await telemetry_repo.copy_rows(self._rows(records, result))
+        result.elapsed = time.perf_counter() - started
+        self.rows_total += result.inserted
+
+        if result.first_time and result.first_time < datetime.now(timezone.utc) - _ROLLUP_LOOKBACK:
+            telemetry_repo.refresh_rollup_soon(result.first_time, result.last_time)
+        logger.info(
+            "Backfilled %d telemetry rows (%d rejected) in %.2fs",
+            result.inserted, result.rejected, result.elapsed,
+        )
+        return result
+
+
+backfill_service = BackfillService()
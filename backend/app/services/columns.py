@@ -0,0 +1,173 @@
+"""Columnar mirror of fleet state for vectorized fleet-wide queries.
+
+`RobotState` objects stay the source of truth; `StateManager` writes each
+robot's numeric fields, status and autonomy tier into one row of NumPy
+columns whenever it changes them (and on `touch(robot)` after a direct
+edit). Reads go through attributes named after the `RobotState` fields,
+each a live view of the filled rows:
+
+    cols = state_manager.columns
+    low = cols.ids_where(cols.battery_percent < 30)
+
+Rows follow registration order, which is also the order of
+`state_manager.robots`. Status and tier strings are interned to small
+integer codes. Needs NumPy (`pip install argus-backend[columnar]`);
+without it `state_manager.columns` is None and callers use plain loops.
+"""
+
+from __future__ import annotations
+
+import math
+from typing import TYPE_CHECKING, Any
+
+try:
+    import numpy as np
+except ImportError:  # optional: pip install argus-backend[columnar]
+    np = None
+
+if TYPE_CHECKING:
+    from app.services.state_manager import RobotState
+
+EARTH_RADIUS_M = 6_371_000
+
+# RobotState attributes held as float64 columns
+FLOAT_FIELDS = (
+    "latitude",
+    "longitude",
+    "altitude",
+    "heading",
+    "speed",
+    "battery_percent",
+    "signal_strength",
+    "last_seen",
+)
+
+
+class Codes:
+    """Interned strings <-> small integer codes for a categorical column."""
+
+    def __init__(self) -> None:
+        self.names: list[str] = []
+        self._codes: dict[str, int] = {}
+
+    def code(self, name: str) -> int:
+        code = self._codes.get(name)
+        if code is None:
+            code = self._codes[name] = len(self.names)
+            self.names.append(name)
+        return code
+
+    def lookup(self, names: tuple[str, ...]) -> list[int]:
+        """Codes of the names seen so far (unseen names can't match any row)."""
+        return [self._codes[n] for n in names if n in self._codes]
+
+
+class FleetColumns:
+    def __init__(self, capacity: int = 1024) -> None:
+        self.ids: list[str] = []
+        self.index: dict[str, int] = {}
+        self.size = 0
+        self._floats = {name: np.zeros(capacity) for name in FLOAT_FIELDS}
+        self._status = np.zeros(capacity, dtype=np.int16)
+        self._tier = np.zeros(capacity, dtype=np.int16)
+        self.statuses = Codes()
+        self.tiers = Codes()
+
+    def __getattr__(self, name: str) -> Any:
+        floats = self.__dict__.get("_floats")
+        if floats is not None and name in floats:
+            return floats[name][:self.size]
+        raise AttributeError(name)
+
+    @property
+    def status_code(self) -> Any:
+        return self._status[:self.size]
+
+    @property
+    def tier_code(self) -> Any:
+        return self._tier[:self.size]
+
+    def _grow(self) -> None:
+        capacity = len(self._status) * 2
+        for name, column in self._floats.items():
+            self._floats[name] = np.resize(column, capacity)
+        self._status = np.resize(self._status, capacity)
+        self._tier = np.resize(self._tier, capacity)
+
+    def _row(self, robot_id: str) -> int:
+        row = self.index.get(robot_id)
+        if row is None:
+            if self.size == len(self._status):
+                self._grow()
+            row = self.index[robot_id] = self.size
+            self.ids.append(robot_id)
+            self.size += 1
+        return row
+
+    def sync(self, robot: RobotState) -> None:
+        """Copy a robot's columnar fields into its row (adding the row if new)."""
+        row = self._row(robot.id)
+        for name, column in self._floats.items():
+            column[row] = getattr(robot, name)
+        self._status[row] = self.statuses.code(robot.status)
+        self._tier[row] = self.tiers.code(robot.autonomy_tier)
+
+    # ── Queries ──────────────────────────────────────────────────────
+
+    def status_in(self, *statuses: str) -> Any:
+        """Boolean mask of rows whose status is one of `statuses`."""
+        return np.isin(self.status_code, self.statuses.lookup(statuses))
+
+    def ids_where(self, mask: Any) -> list[str]:
+        return [self.ids[row] for row in np.flatnonzero(mask)]
+
+    def status_counts(self) -> dict[str, int]:
+        counts = np.bincount(self.status_code, minlength=len(self.statuses.names))
+        return {name: int(n) for name, n in zip(self.statuses.names, counts) if n}
+
+    def tier_counts(self) -> dict[str, int]:
+        counts = np.bincount(self.tier_code, minlength=len(self.tiers.names))
+        return {name: int(n) for name, n in zip(self.tiers.names, counts) if n}
+
+    def close_pairs(self, threshold_m: float, mask: Any) -> list[tuple[int, int, float]]:
+        """(row_a, row_b, metres) for masked rows closer than `threshold_m`, row_a < row_b.
+
+        Rows are sorted by latitude and only pairs within the threshold's
+        latitude span are measured, so a spread-out fleet costs O(n log n)
+        rather than comparing every pair.
+        """
+        rows = np.flatnonzero(mask)
+        if len(rows) < 2:
+            return []
+        lat = self.latitude[rows]
+        order = np.argsort(lat, kind="stable")
+        rows, lat = rows[order], lat[order]
+        # First sorted index past each row's latitude window
+        span = math.degrees(threshold_m / EARTH_RADIUS_M)
+        end = np.searchsorted(lat, lat + span, side="right")
+        counts = end - np.arange(1, len(rows) + 1)
+        total = int(counts.sum())
+        if total == 0:
+            return []
+        first = np.repeat(np.arange(len(rows)), counts)
+        # Offset of each candidate within its row's run: 1, 2, ... counts[i]
+        offset = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts) + 1
+        a, b = rows[first], rows[first + offset]
+        lat_a, lat_b = self.latitude[a], self.latitude[b]
+        dlat = np.radians(lat_b - lat_a)
+        dlon = np.radians(self.longitude[b] - self.longitude[a])
+        h = np.sin(dlat / 2) ** 2 + np.cos(np.radians(lat_a)) * np.cos(np.radians(lat_b)) * np.sin(dlon / 2) ** 2
+        dist = EARTH_RADIUS_M * 2 * np.arctan2(np.sqrt(h), np.sqrt(1 - h))
+        close = dist < threshold_m
+        a, b, dist = a[close], b[close], dist[close]
+        lo, hi = np.minimum(a, b), np.maximum(a, b)
+        # Same pair order as a nested loop over registration order
+        order = np.lexsort((hi, lo))
+        return list(zip(lo[order].tolist(), hi[order].tolist(), dist[order].tolist()))
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "rows": self.size,
+            "capacity": len(self._status),
+            "bytes": sum(c.nbytes for c in self._floats.values()) + self._status.nbytes + self._tier.nbytes,
+        }
@@ -6,7 +6,7 @@ from dataclasses import dataclass, field
 from typing import Any
 
 
-@dataclass
+@dataclass(slots=True)
 class Command:
     id: str
     robot_id: str
@@ -34,6 +34,10 @@ class CommandService:
     def __init__(self) -> None:
         self.commands: dict[str, Command] = {}
         self.robot_commands: dict[str, list[str]] = {}  # robot_id -> [command_ids]
+        # Bumped on every command mutation
+        self.version = 0
+        # Commands issued on another replica and mirrored here; their acks are handled there
+        self.remote: set[str] = set()
 
     def create_command(
         self,
@@ -54,6 +58,7 @@ class CommandService:
         )
         self.commands[cmd.id] = cmd
         self.robot_commands.setdefault(robot_id, []).append(cmd.id)
+        self.version += 1
         return cmd
 
     def update_status(self, command_id: str, status: str) -> Command | None:
@@ -62,6 +67,7 @@ class CommandService:
             return None
         cmd.status = status
         cmd.updated_at = time.time()
+        self.version += 1
         return cmd
 
     def get_robot_commands(self, robot_id: str, limit: int = 20) -> list[Command]:
@@ -77,5 +83,27 @@ class CommandService:
                 return cmd
         return None
 
+    def apply_snapshot(self, commands: list[dict[str, Any]]) -> None:
+        """Add or overwrite commands from their to_dict forms (warm restart)."""
+        for c in commands:
+            if c["id"] not in self.commands:
+                self.robot_commands.setdefault(c["robotId"], []).append(c["id"])
+            self.commands[c["id"]] = Command(
+                id=c["id"],
+                robot_id=c["robotId"],
+                command_type=c["commandType"],
+                parameters=c["parameters"],
+                source=c["source"],
+                status=c["status"],
+                created_at=c["createdAt"],
+                updated_at=c["updatedAt"],
+            )
+        self.version += 1
+
+    def apply_remote(self, command: dict[str, Any]) -> None:
+        """Mirror a command issued on another replica (see app.services.fanout_bus)."""
+        self.remote.add(command["id"])
+        self.apply_snapshot([command])
+
 
 command_service = CommandService()
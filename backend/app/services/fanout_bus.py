@@ -0,0 +1,315 @@
+"""Cross-replica WebSocket fanout over Postgres LISTEN/NOTIFY.
+
+With several backend replicas behind one load balancer, each replica's
+`ws_manager` only reaches its own sockets. The bus relays every event a
+replica broadcasts (command status, missions, suggestions, autonomy, ...)
+to the others through `NOTIFY <ws_bus_channel>`, and re-broadcasts what
+it hears from them to its local clients. Mission, suggestion, command and
+autonomy events are also applied to the receiving replica's services, so
+REST reads and warm-restart snapshots agree across replicas.
+
+Heuristic analysis runs on one replica only: whichever holds the
+`<ws_bus_channel>:leader` advisory lock on its LISTEN connection. Without
+clustered ingest every replica sees every robot, so the others would raise
+the same suggestions; the lock is released with the connection, and
+another replica takes over on its next attempt.
+
+Robot state is not relayed by default: without clustered ingest every
+replica already consumes all telemetry and encodes its own delta stream.
+With clustered ingest (`CLUSTER_ENABLED`) each replica publishes the state
+of the robots it owns, and the others apply it to their `StateManager` and
+broadcast it through their own delta encoders, so robot seqs stay
+per-replica and consistent.
+
+Events are collected for `ws_bus_flush_interval` and packed into as few
+NOTIFY payloads as fit under Postgres' 8000-byte limit; a single event too
+large for one payload is split into fragments that are reassembled on
+receipt. Every event carries `<origin>:<n>` as its id; receivers skip
+their own origin and ids they have already applied, so retried publishes
+never double-deliver.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import base64
+import logging
+import uuid
+from collections import OrderedDict
+from typing import Any
+
+import asyncpg
+
+from app import codec
+from app.ai.analysis_service import analysis_service
+from app.ai.suggestions import suggestion_service
+from app.config import settings
+from app.db.connection import db
+from app.mqtt.client import mqtt_client
+from app.services.autonomy_service import autonomy_service
+from app.services.command_service import command_service
+from app.services.mission_service import mission_service
+from app.services.state_manager import RobotState, state_manager
+from app.ws.manager import ws_manager
+
+logger = logging.getLogger(__name__)
+
+# Postgres rejects NOTIFY payloads of 8000 bytes or more; leave room for the envelope
+MAX_PAYLOAD = 7800
+_SEEN_MAX = 10000
+_OUTBOX_MAX = 10000  # events kept while Postgres is unreachable
+_PARTIAL_MAX = 100  # incomplete fragmented events held for reassembly
+_LEADER_RETRY = 5.0  # seconds between attempts to take the analysis lock
+
+
+def pack(origin: str, events: list[tuple[str, str]], limit: int = MAX_PAYLOAD) -> list[str]:
+    """Pack (event id, encoded event) pairs into NOTIFY payloads of at most `limit` bytes."""
+    payloads: list[str] = []
+    batch: list[str] = []
+    size = 0
+    head = f'{{"o":"{origin}","e":['
+
+    def close_batch() -> None:
+        nonlocal batch, size
+        if batch:
+            payloads.append(head + ",".join(batch) + "]}")
+            batch, size = [], 0
+
+    for event_id, encoded in events:
+        item = f'["{event_id}",{encoded}]'
+        item_size = len(item.encode())
+        if len(head) + item_size + 2 > limit:
+            close_batch()
+            payloads.extend(_fragments(origin, event_id, encoded, limit))
+            continue
+        if len(head) + size + item_size + len(batch) + 2 > limit:
+            close_batch()
+        batch.append(item)
+        size += item_size
+    close_batch()
+    return payloads
+
+
+def _fragments(origin: str, event_id: str, encoded: str, limit: int) -> list[str]:
+    # Base64 slices of the UTF-8 bytes: size is predictable and nothing needs escaping
+    data = encoded.encode()
+    step = (limit - 200) * 3 // 4
+    parts = [data[i:i + step] for i in range(0, len(data), step)]
+    return [
+        codec.dumps_str({"o": origin, "f": [event_id, i, len(parts)], "d": base64.b64encode(part).decode()})
+        for i, part in enumerate(parts)
+    ]
+
+
+class FanoutBus:
+    def __init__(self) -> None:
+        self.enabled = settings.ws_bus_enabled
+        self.channel = settings.ws_bus_channel
+        self.origin = uuid.uuid4().hex[:12]
+        self._counter = 0
+        self._outbox: list[tuple[str, str]] = []
+        self._robots: dict[str, RobotState] = {}
+        self._seen: OrderedDict[str, None] = OrderedDict()
+        self._fragments: dict[str, list[bytes | None]] = {}
+        self._conn: asyncpg.Connection | None = None
+        self._lost = asyncio.Event()
+        self._listen_task: asyncio.Task[None] | None = None
+        self._flush_task: asyncio.Task[None] | None = None
+        self.leader = False
+        self.published = 0
+        self.notifies = 0
+        self.received = 0
+        self.duplicates = 0
+        self.errors = 0
+
+    async def start(self) -> None:
+        if not self.enabled:
+            return
+        ws_manager.relay = self.publish
+        # Until this replica takes the lock, another one runs analysis
+        analysis_service.leader = False
+        if mqtt_client.cluster.enabled:
+            ws_manager.relay_robot = self.publish_robot
+        self._listen_task = asyncio.create_task(self._listen())
+        self._flush_task = asyncio.create_task(self._flush_loop())
+        logger.info("WS fanout bus started on channel %s (origin %s)", self.channel, self.origin)
+
+    async def stop(self) -> None:
+        ws_manager.relay = None
+        ws_manager.relay_robot = None
+        analysis_service.leader = True
+        for task in (self._flush_task, self._listen_task):
+            if task:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        if self._outbox or self._robots:
+            await self.flush()
+
+    # ── Publishing ───────────────────────────────────────────────────
+
+    def _next_id(self) -> str:
+        self._counter += 1
+        return f"{self.origin}:{self._counter}"
+
+    def publish(self, message: dict[str, Any]) -> None:
+        """Queue a locally broadcast event for the other replicas."""
+        self._outbox.append((self._next_id(), codec.dumps_str(message)))
+
+    def publish_robot(self, robot: RobotState) -> None:
+        """Queue the state of a robot this replica owns (clustered ingest only)."""
+        if mqtt_client.cluster.is_local(robot.id):
+            self._robots[robot.id] = robot
+
+    async def _flush_loop(self) -> None:
+        while True:
+            await asyncio.sleep(settings.ws_bus_flush_interval)
+            try:
+                await self.flush()
+            except Exception:
+                self.errors += 1
+                logger.exception("WS fanout bus publish failed")
+
+    async def flush(self) -> None:
+        robots, self._robots = self._robots, {}
+        for robot in robots.values():
+            # Latest state only: a robot that changed many times this tick goes out once
+            self._outbox.append((self._next_id(), codec.dumps_str({"type": "bus.robot", "payload": robot.to_dict()})))
+        if len(self._outbox) > _OUTBOX_MAX:
+            dropped = len(self._outbox) - _OUTBOX_MAX
+            del self._outbox[:dropped]
+            logger.warning("WS fanout bus backlog full; dropped %d event(s)", dropped)
+        if not self._outbox or db.pool is None:
+            return
+        # On failure the events stay queued for the next tick; receivers drop any that got through
+        events = list(self._outbox)
+        payloads = pack(self.origin, events)
+        async with db.pool.acquire() as conn:
+            # One statement, one transaction: payloads are delivered together and in order
+            await conn.execute("SELECT pg_notify($1, p) FROM unnest($2::text[]) AS p", self.channel, payloads)
+        del self._outbox[:len(events)]
+        self.published += len(events)
+        self.notifies += len(payloads)
+
+    # ── Receiving ────────────────────────────────────────────────────
+
+    async def _listen(self) -> None:
+        """Hold one pooled connection in LISTEN, re-acquiring it if it drops."""
+        while True:
+            if db.pool is None:
+                await asyncio.sleep(1.0)
+                continue
+            self._lost.clear()
+            try:
+                conn = await db.pool.acquire()
+            except Exception:
+                logger.warning("WS fanout bus could not get a connection; retrying")
+                await asyncio.sleep(2.0)
+                continue
+            try:
+                conn.add_termination_listener(lambda _conn: self._lost.set())
+                await conn.add_listener(self.channel, self._on_notify)
+                self._conn = conn
+                while not self._lost.is_set():
+                    if not self.leader:
+                        key = f"{self.channel}:leader"
+                        self._set_leader(await conn.fetchval("SELECT pg_try_advisory_lock(hashtext($1))", key))
+                    try:
+                        await asyncio.wait_for(self._lost.wait(), _LEADER_RETRY)
+                    except asyncio.TimeoutError:
+                        pass
+                logger.warning("WS fanout bus LISTEN connection lost; reconnecting")
+            finally:
+                self._conn = None
+                # Releasing the connection to the pool drops its advisory locks
+                self._set_leader(False)
+                try:
+                    await conn.remove_listener(self.channel, self._on_notify)
+                except Exception:
+                    pass
+                await db.pool.release(conn)
+            await asyncio.sleep(1.0)
+
+    def _set_leader(self, leader: bool) -> None:
+        if leader != self.leader:
+            logger.info("WS fanout bus: %s analysis leader", "became" if leader else "no longer")
+        self.leader = analysis_service.leader = leader
+
+    def _on_notify(self, _conn: Any, _pid: int, _channel: str, payload: str) -> None:
+        try:
+            envelope = codec.loads(payload)
+        except codec.DECODE_ERRORS:
+            logger.warning("WS fanout bus: undecodable payload dropped")
+            return
+        if envelope.get("o") == self.origin:
+            return
+        if "f" in envelope:
+            self._on_fragment(envelope)
+            return
+        for event_id, message in envelope.get("e", []):
+            self._deliver(event_id, message)
+
+    def _on_fragment(self, envelope: dict[str, Any]) -> None:
+        event_id, index, total = envelope["f"]
+        parts = self._fragments.get(event_id)
+        if parts is None:
+            if len(self._fragments) >= _PARTIAL_MAX:
+                # A fragment went missing somewhere; give up on the oldest partial event
+                del self._fragments[next(iter(self._fragments))]
+            parts = self._fragments[event_id] = [None] * total
+        parts[index] = base64.b64decode(envelope["d"])
+        if any(part is None for part in parts):
+            return
+        del self._fragments[event_id]
+        self._deliver(event_id, codec.loads(b"".join(parts)))
+
+    def _deliver(self, event_id: str, message: dict[str, Any]) -> None:
+        if event_id in self._seen:
+            self.duplicates += 1
+            return
+        self._seen[event_id] = None
+        if len(self._seen) > _SEEN_MAX:
+            self._seen.popitem(last=False)
+        self.received += 1
+        asyncio.create_task(self._apply(message))
+
+    async def _apply(self, message: dict[str, Any]) -> None:
+        try:
+            if message.get("type") == "bus.robot":
+                robot = state_manager.apply_snapshot(message["payload"])
+                await ws_manager.broadcast_robot(robot, relay=False)
+            else:
+                self._apply_event(message.get("type"), message.get("payload"))
+                await ws_manager.broadcast(message, relay=False)
+        except Exception:
+            logger.exception("WS fanout bus: failed to apply %s", message.get("type"))
+
+    @staticmethod
+    def _apply_event(msg_type: str | None, payload: Any) -> None:
+        """Mirror another replica's change into the local services."""
+        if msg_type == "mission.updated":
+            mission_service.apply(payload)
+        elif msg_type == "ai.suggestion":
+            suggestion_service.apply(payload)
+        elif msg_type == "command.status":
+            command_service.apply_remote(payload)
+        elif msg_type == "autonomy.changed":
+            autonomy_service.apply_change(payload)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "listening": self._conn is not None,
+            "leader": self.leader,
+            "published": self.published,
+            "notifies": self.notifies,
+            "received": self.received,
+            "duplicates": self.duplicates,
+            "pending": len(self._outbox),
+            "errors": self.errors,
+        }
+
+
+fanout_bus = FanoutBus()
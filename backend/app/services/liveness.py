@@ -0,0 +1,141 @@
+"""Robot presence: marks robots offline once they go silent.
+
+Robots register an MQTT Last Will on `argus/{id}/status`, so a dropped
+connection is reported by the broker straight away. For robots that stall
+without dropping the TCP session, a hashed timing wheel sweeps `last_seen`:
+updates never touch the wheel (they only bump `last_seen`), and each sweep
+only inspects the robots whose deadline slot has come up.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Any, Generic, Hashable, TypeVar
+
+from app.config import settings
+from app.services.state_manager import RobotState, state_manager
+from app.ws.manager import ws_manager
+
+logger = logging.getLogger(__name__)
+
+K = TypeVar("K", bound=Hashable)
+
+
+class TimingWheel(Generic[K]):
+    """Hashed timing wheel with `slots` buckets of `tick` seconds each.
+
+    `schedule` and `cancel` are O(1). `advance` returns every key whose slot
+    has passed; deadlines more than one revolution out come back early, so
+    callers re-check the real deadline and re-schedule.
+    """
+
+    def __init__(self, tick: float = 1.0, slots: int = 64, now: float | None = None) -> None:
+        self.tick = tick
+        self._slots: list[set[K]] = [set() for _ in range(slots)]
+        self._where: dict[K, int] = {}
+        # Last absolute tick swept
+        self._cursor = self._tick_of(time.time() if now is None else now)
+
+    def _tick_of(self, t: float) -> int:
+        return int(t // self.tick)
+
+    def __contains__(self, key: K) -> bool:
+        return key in self._where
+
+    def __len__(self) -> int:
+        return len(self._where)
+
+    def schedule(self, key: K, deadline: float) -> None:
+        self.cancel(key)
+        # Never schedule into a tick that has already been swept
+        slot = max(self._tick_of(deadline), self._cursor + 1) % len(self._slots)
+        self._slots[slot].add(key)
+        self._where[key] = slot
+
+    def cancel(self, key: K) -> None:
+        slot = self._where.pop(key, None)
+        if slot is not None:
+            self._slots[slot].discard(key)
+
+    def advance(self, now: float) -> list[K]:
+        target = self._tick_of(now)
+        start = max(self._cursor + 1, target - len(self._slots) + 1)
+        due: list[K] = []
+        for t in range(start, target + 1):
+            slot = self._slots[t % len(self._slots)]
+            for key in slot:
+                del self._where[key]
+            due.extend(slot)
+            slot.clear()
+        self._cursor = max(self._cursor, target)
+        return due
+
+
+class LivenessTracker:
+    def __init__(self) -> None:
+        self._wheel: TimingWheel[str] = TimingWheel(settings.liveness_tick)
+        self._task: asyncio.Task[None] | None = None
+        self.transitions = 0
+
+    async def start(self) -> None:
+        self._task = asyncio.create_task(self._loop())
+        logger.info("Liveness tracker started (timeouts %s)", settings.liveness_timeouts)
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def timeout_for(self, robot: RobotState) -> float:
+        timeout = settings.liveness_timeouts.get(robot.robot_type, settings.liveness_default_timeout)
+        # Robots throttled by rate control publish less often; allow three missed samples
+        return max(timeout, 3 * robot.metadata.get("telemetryInterval", 0.0))
+
+    def watch(self, robot: RobotState) -> None:
+        """Put a live robot on the wheel if it isn't already (O(1), call on every update)."""
+        if robot.id not in self._wheel and robot.status != "offline":
+            self._wheel.schedule(robot.id, robot.last_seen + self.timeout_for(robot))
+
+    async def _loop(self) -> None:
+        while True:
+            await asyncio.sleep(settings.liveness_tick)
+            try:
+                await self.sweep(time.time())
+            except Exception:
+                logger.exception("Liveness sweep failed")
+
+    async def sweep(self, now: float) -> list[RobotState]:
+        """Mark robots past their deadline offline and broadcast them in one message."""
+        went_offline: list[RobotState] = []
+        for robot_id in self._wheel.advance(now):
+            robot = state_manager.robots.get(robot_id)
+            if robot is None or robot.status == "offline":
+                continue
+            deadline = robot.last_seen + self.timeout_for(robot)
+            if deadline > now:
+                self._wheel.schedule(robot_id, deadline)
+                continue
+            robot.status = "offline"
+            went_offline.append(robot)
+
+        if went_offline:
+            state_manager.touch(*went_offline)
+            self.transitions += len(went_offline)
+            logger.warning(
+                "Robot(s) went silent, marked offline: %s",
+                ", ".join(r.id for r in went_offline),
+            )
+            await ws_manager.broadcast_robots(went_offline)
+        return went_offline
+
+    def stats(self) -> dict[str, Any]:
+        return {"watched": len(self._wheel), "offlineTransitions": self.transitions}
+
+
+liveness_tracker = LivenessTracker()
@@ -5,8 +5,9 @@ import uuid
 from dataclasses import dataclass, field
 from typing import Any
 
+from app.services.snapshot import SnapshotCache
 
-@dataclass
+@dataclass(slots=True)
 class Waypoint:
     id: str
     sequence: int
@@ -54,10 +55,44 @@ class Mission:
             "updatedAt": self.updated_at,
         }
 
+    @classmethod
+    def from_dict(cls, m: dict[str, Any]) -> Mission:
+        return cls(
+            id=m["id"],
+            name=m["name"],
+            status=m["status"],
+            assigned_robots=list(m["assignedRobots"]),
+            waypoints={
+                rid: [
+                    Waypoint(
+                        id=wp["id"],
+                        sequence=wp["sequence"],
+                        latitude=wp["latitude"],
+                        longitude=wp["longitude"],
+                        altitude=wp["altitude"],
+                        action=wp["action"],
+                        parameters=wp["parameters"],
+                        status=wp["status"],
+                    )
+                    for wp in wps
+                ]
+                for rid, wps in m["waypoints"].items()
+            },
+            created_at=m["createdAt"],
+            updated_at=m["updatedAt"],
+        )
+
 
 class MissionService:
     def __init__(self) -> None:
         self.missions: dict[str, Mission] = {}
+        # Bumped on every mission mutation; keys the cached /api/missions snapshot
+        self.version = 0
+        self.listing = SnapshotCache(
+            "missions",
+            lambda: self.version,
+            lambda: {"missions": [m.to_dict() for m in self.missions.values()]},
+        )
 
     def create_mission(
         self,
@@ -88,6 +123,7 @@ class MissionService:
                     for i, wp in enumerate(wp_list)
                 ]
         self.missions[mission_id] = mission
+        self.version += 1
         return mission
 
     def get_mission(self, mission_id: str) -> Mission | None:
@@ -102,6 +138,7 @@ class MissionService:
             return None
         mission.status = status
         mission.updated_at = time.time()
+        self.version += 1
         return mission
 
     def update_waypoint_status(
@@ -115,11 +152,22 @@ class MissionService:
             if wp.id == waypoint_id:
                 wp.status = status
                 mission.updated_at = time.time()
+                self.version += 1
                 return wp
         return None
 
     def get_robot_missions(self, robot_id: str) -> list[Mission]:
         return [m for m in self.missions.values() if robot_id in m.assigned_robots]
 
+    def apply_snapshot(self, missions: dict[str, dict[str, Any]]) -> None:
+        """Replace every mission with the to_dict forms mirrored from another process."""
+        self.missions = {mid: Mission.from_dict(m) for mid, m in missions.items()}
+        self.version += 1
+
+    def apply(self, mission: dict[str, Any]) -> None:
+        """Add or overwrite one mission from its to_dict form (relayed by another replica)."""
+        self.missions[mission["id"]] = Mission.from_dict(mission)
+        self.version += 1
+
 
 mission_service = MissionService()
@@ -0,0 +1,47 @@
+"""Encoded snapshots cached per state version.
+
+`StateManager` and `MissionService` bump a version on every mutation. A
+`SnapshotCache` rebuilds and encodes its snapshot only when that version
+has moved, so any number of readers at the same version (REST listings,
+reconnecting WebSocket clients) share one encode. ETags combine the
+process boot id with the version, so they never collide across restarts.
+The robots version moves with every telemetry sample, so while robots are
+reporting, a conditional GET of /api/robots almost never gets a 304.
+"""
+
+from __future__ import annotations
+
+import uuid
+from typing import Any, Callable
+
+from app import codec
+
+BOOT_ID = uuid.uuid4().hex[:8]
+
+
+class SnapshotCache:
+    def __init__(self, name: str, version: Callable[[], int], build: Callable[[], Any]) -> None:
+        self.name = name
+        self._version = version
+        self._build = build
+        self._cached: tuple[int, str, bytes] | None = None
+        self.hits = 0
+        self.builds = 0
+
+    def get(self) -> tuple[str, bytes]:
+        """(ETag, encoded JSON) for the current version."""
+        version = self._version()
+        cached = self._cached
+        if cached is not None and cached[0] == version:
+            self.hits += 1
+            return cached[1], cached[2]
+        etag = f'"{self.name}-{BOOT_ID}-{version}"'
+        built = self._build()
+        # A builder may hand back the encoded body itself (see StateManager.listing)
+        body = built if isinstance(built, bytes) else codec.dumps(built)
+        self._cached = (version, etag, body)
+        self.builds += 1
+        return etag, body
+
+    def stats(self) -> dict[str, Any]:
+        return {"builds": self.builds, "hits": self.hits}
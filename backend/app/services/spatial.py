@@ -0,0 +1,144 @@
+"""Grid clustering of robot positions for zoomed-out map views.
+
+Robots are bucketed into square lat/lon cells at every map zoom level up to
+`max_zoom`; a zoom-`z` cell spans a quarter of a web-map tile, i.e.
+360 / 2^(z+2) degrees. Membership and coordinate sums are kept current by
+`GridClusters.move`, called from `StateManager.update_position`, so each
+position update costs O(levels) and reading a cell's count and centroid is
+O(1). Worst battery and status counts change outside position updates, so
+they are folded over the cell's members when a view is read.
+"""
+
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Iterator
+
+if TYPE_CHECKING:
+    from app.services.state_manager import RobotState
+
+Cell = tuple[int, int]
+
+
+def cell_size(zoom: int) -> float:
+    """Cell edge in degrees at a map zoom level."""
+    return 360.0 / (1 << (zoom + 2))
+
+
+@dataclass
+class GridCell:
+    members: set[str] = field(default_factory=set)
+    sum_lat: float = 0.0
+    sum_lon: float = 0.0
+
+    def aggregate(self, key: Cell, robots: dict[str, RobotState]) -> dict[str, Any]:
+        count = len(self.members)
+        worst_battery = 100.0
+        statuses: dict[str, int] = {}
+        for robot_id in self.members:
+            robot = robots.get(robot_id)
+            if robot is None:
+                continue
+            worst_battery = min(worst_battery, robot.battery_percent)
+            statuses[robot.status] = statuses.get(robot.status, 0) + 1
+        return {
+            "cell": list(key),
+            "count": count,
+            "latitude": self.sum_lat / count,
+            "longitude": self.sum_lon / count,
+            "worstBattery": worst_battery,
+            "statuses": statuses,
+        }
+
+
+class GridClusters:
+    def __init__(self, max_zoom: int = 12) -> None:
+        self.max_zoom = max_zoom
+        self._sizes = [cell_size(z) for z in range(max_zoom + 1)]
+        self._levels: list[dict[Cell, GridCell]] = [{} for _ in self._sizes]
+        # robot_id -> (lat, lon, cell per level)
+        self._where: dict[str, tuple[float, float, list[Cell]]] = {}
+        self.moves = 0
+
+    def __len__(self) -> int:
+        return len(self._where)
+
+    def _cell(self, level: int, lat: float, lon: float) -> Cell:
+        size = self._sizes[level]
+        return (math.floor(lon / size), math.floor(lat / size))
+
+    def move(self, robot_id: str, lat: float, lon: float) -> None:
+        """Place a robot at (lat, lon), updating only the cells it entered or left."""
+        previous = self._where.get(robot_id)
+        cells: list[Cell] = []
+        for level, grid in enumerate(self._levels):
+            key = self._cell(level, lat, lon)
+            cells.append(key)
+            if previous is not None:
+                old_lat, old_lon, old_cells = previous
+                old_key = old_cells[level]
+                if old_key == key:
+                    cell = grid[key]
+                    cell.sum_lat += lat - old_lat
+                    cell.sum_lon += lon - old_lon
+                    continue
+                old = grid[old_key]
+                old.members.discard(robot_id)
+                if old.members:
+                    old.sum_lat -= old_lat
+                    old.sum_lon -= old_lon
+                else:
+                    del grid[old_key]
+            cell = grid.get(key)
+            if cell is None:
+                cell = grid[key] = GridCell()
+            cell.members.add(robot_id)
+            cell.sum_lat += lat
+            cell.sum_lon += lon
+        self._where[robot_id] = (lat, lon, cells)
+        self.moves += 1
+
+    def remove(self, robot_id: str) -> None:
+        previous = self._where.pop(robot_id, None)
+        if previous is None:
+            return
+        lat, lon, cells = previous
+        for grid, key in zip(self._levels, cells):
+            cell = grid[key]
+            cell.members.discard(robot_id)
+            if cell.members:
+                cell.sum_lat -= lat
+                cell.sum_lon -= lon
+            else:
+                del grid[key]
+
+    def size(self, level: int) -> float:
+        return self._sizes[level]
+
+    def level_for(self, zoom: float) -> int:
+        return max(0, min(self.max_zoom, int(zoom)))
+
+    def cell_range(self, level: int, west: float, south: float, east: float, north: float) -> tuple[int, int, int, int]:
+        """Inclusive cell bounds (x0, y0, x1, y1) covering a bbox."""
+        x0, y0 = self._cell(level, south, west)
+        x1, y1 = self._cell(level, north, east)
+        return x0, y0, x1, y1
+
+    def cells_in(self, level: int, bounds: tuple[int, int, int, int]) -> Iterator[tuple[Cell, GridCell]]:
+        """Occupied cells within `cell_range` bounds (west > east wraps the antimeridian)."""
+        x0, y0, x1, y1 = bounds
+        for key, cell in self._levels[level].items():
+            x, y = key
+            if not y0 <= y <= y1:
+                continue
+            if (x0 <= x <= x1) if x0 <= x1 else (x >= x0 or x <= x1):
+                yield key, cell
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "robots": len(self._where),
+            "levels": len(self._levels),
+            "cells": sum(len(grid) for grid in self._levels),
+            "moves": self.moves,
+        }
@@ -0,0 +1,315 @@
+"""Warm restart from a local snapshot plus change journal.
+
+With `STATE_DIR` set, the in-memory services (robots, commands, missions,
+suggestions, autonomy tiers) survive a restart:
+
+- Every `state_journal_interval` the journal appends one line holding what
+  changed since the previous line: robots whose `revision` moved on,
+  commands with a newer `updatedAt`, and missions, suggestions and the
+  autonomy log in full when they changed (they are small).
+- Every `state_snapshot_interval` a full snapshot is written beside it
+  (temp file, fsync, rename), and the journal starts a new generation.
+
+Journal files are named after the seq their generation starts at, and
+every line carries its own seq. Older generations are deleted only once a
+newer snapshot is on disk, so a crash at any point leaves a snapshot and
+the journals that follow it. On startup the snapshot and the journals are
+read through mmap and applied in seq order; a torn last line (crash mid
+write) ends the replay, and the new generation opened after the restore
+overwrites any file left under its name. Restored robots are handed to the liveness
+tracker, so any that stay silent are marked offline as usual.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import mmap
+import os
+import time
+from pathlib import Path
+from typing import Any
+
+from app import codec
+from app.ai.suggestions import suggestion_service
+from app.config import settings
+from app.services.autonomy_service import autonomy_service
+from app.services.command_service import command_service
+from app.services.liveness import liveness_tracker
+from app.services.mission_service import mission_service
+from app.services.state_manager import state_manager
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT = "snapshot.json"
+
+
+def _mapped(path: Path) -> list[Any]:
+    """Decode each line of a file through a read-only memory map, stopping at a torn line."""
+    records: list[Any] = []
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return records
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            pos = 0
+            while pos < size:
+                end = mm.find(b"\n", pos)
+                if end == -1:
+                    end = size
+                try:
+                    # Slices of the map, not copies of the file
+                    records.append(codec.loads(memoryview(mm)[pos:end]))
+                except codec.DECODE_ERRORS:
+                    logger.warning("State journal %s: torn record at byte %d; replay stops there", path.name, pos)
+                    break
+                pos = end + 1
+    return records
+
+
+class StateJournal:
+    def __init__(self) -> None:
+        self.enabled = bool(settings.state_dir)
+        self.dir = Path(settings.state_dir) if self.enabled else Path()
+        self.seq = 0
+        self._journal: Any = None
+        self._generation = 0
+        self._journal_task: asyncio.Task[None] | None = None
+        self._snapshot_task: asyncio.Task[None] | None = None
+        # What the journal last recorded, to find the next tick's changes
+        self._robots: dict[str, int] = {}  # robot id -> revision last journaled
+        self._commands: dict[str, float] = {}
+        self._versions: dict[str, int] = {}
+        self._suggestions: list[tuple[str, str, bool]] = []
+        self._autonomy: tuple[str, int] = ("", 0)
+        self.restored: dict[str, Any] = {}
+        self.records = 0
+        self.snapshots = 0
+        self.errors = 0
+
+    async def start(self) -> None:
+        """Restore saved state, then keep journaling; call before ingest starts."""
+        if not self.enabled:
+            return
+        self.dir.mkdir(parents=True, exist_ok=True)
+        self.restore()
+        # A fresh snapshot makes every older file redundant and opens generation `seq`
+        self._write_snapshot(self._capture())
+        self._journal_task = asyncio.create_task(self._journal_loop())
+        self._snapshot_task = asyncio.create_task(self._snapshot_loop())
+        logger.info("State journal in %s (seq %d)", self.dir, self.seq)
+
+    async def stop(self) -> None:
+        for task in (self._journal_task, self._snapshot_task):
+            if task:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        if self._journal is not None:
+            # Clean shutdown: everything goes into one last snapshot
+            self._write_snapshot(self._capture())
+            self._journal.close()
+            self._journal = None
+
+    # ── Restore ──────────────────────────────────────────────────────
+
+    def restore(self) -> None:
+        started = time.perf_counter()
+        snapshot_path = self.dir / SNAPSHOT
+        if not snapshot_path.exists():
+            return
+        records = _mapped(snapshot_path)
+        if not records:
+            logger.error("State snapshot %s is unreadable; starting empty", snapshot_path)
+            return
+        snapshot = records[0]
+        self._apply(snapshot)
+        self.seq = snapshot["seq"]
+        replayed = 0
+        for path in sorted(self.dir.glob("journal-*.jsonl"), key=lambda p: int(p.stem.split("-")[1])):
+            for record in _mapped(path):
+                if record["seq"] <= self.seq:
+                    continue
+                self._apply(record)
+                self.seq = record["seq"]
+                replayed += 1
+        for robot in state_manager.robots.values():
+            liveness_tracker.watch(robot)
+        self.restored = {
+            "robots": len(state_manager.robots),
+            "commands": len(command_service.commands),
+            "missions": len(mission_service.missions),
+            "suggestions": len(suggestion_service.suggestions),
+            "journalRecords": replayed,
+            "seconds": round(time.perf_counter() - started, 4),
+        }
+        logger.info("Restored state from %s: %s", self.dir, self.restored)
+
+    def _apply(self, record: dict[str, Any]) -> None:
+        for robot in record.get("robots", ()):
+            state_manager.apply_snapshot(robot)
+        if "commands" in record:
+            command_service.apply_snapshot(record["commands"])
+        if "missions" in record:
+            mission_service.apply_snapshot(record["missions"])
+        if "suggestions" in record:
+            suggestion_service.apply_snapshot(record["suggestions"])
+        if "autonomy" in record:
+            autonomy_service.apply_snapshot(record["autonomy"])
+
+    # ── Journal ──────────────────────────────────────────────────────
+
+    async def _journal_loop(self) -> None:
+        while True:
+            await asyncio.sleep(settings.state_journal_interval)
+            try:
+                self.append()
+            except Exception:
+                self.errors += 1
+                logger.exception("State journal append failed")
+
+    def append(self) -> None:
+        """Write one journal line with everything that changed since the last one."""
+        record = self._changes()
+        if not record:
+            return
+        self.seq += 1
+        record["seq"] = self.seq
+        self._journal.write(codec.dumps(record) + b"\n")
+        self._journal.flush()
+        self.records += 1
+
+    def _changed(self, name: str, version: int) -> bool:
+        if self._versions.get(name) == version:
+            return False
+        self._versions[name] = version
+        return True
+
+    def _changes(self) -> dict[str, Any]:
+        record: dict[str, Any] = {}
+        if self._changed("robots", state_manager.version):
+            robots = []
+            for robot_id, robot in state_manager.robots.items():
+                if self._robots.get(robot_id) != robot.revision:
+                    self._robots[robot_id] = robot.revision
+                    robots.append(robot.to_dict())
+            if robots:
+                record["robots"] = robots
+        if self._changed("commands", command_service.version):
+            commands = [
+                cmd.to_dict() for cmd in command_service.commands.values()
+                if self._commands.get(cmd.id) != cmd.updated_at
+            ]
+            self._commands.update((c["id"], c["updatedAt"]) for c in commands)
+            if commands:
+                record["commands"] = commands
+        if self._changed("missions", mission_service.version):
+            record["missions"] = {mid: m.to_dict() for mid, m in mission_service.missions.items()}
+        # Suggestions change in place from several modules; there are few, so compare them all
+        suggestions = [
+            (s.id, s.status, s.proposed_action is None) for s in suggestion_service.suggestions.values()
+        ]
+        if suggestions != self._suggestions:
+            self._suggestions = suggestions
+            record["suggestions"] = [s.to_dict() for s in suggestion_service.suggestions.values()]
+        autonomy = (autonomy_service.fleet_default, len(autonomy_service.change_log))
+        if autonomy != self._autonomy:
+            self._autonomy = autonomy
+            record["autonomy"] = self._autonomy_state()
+        return record
+
+    # ── Snapshots ────────────────────────────────────────────────────
+
+    async def _snapshot_loop(self) -> None:
+        while True:
+            await asyncio.sleep(settings.state_snapshot_interval)
+            try:
+                # Catch the journal up first so the snapshot's seq covers everything in it
+                self.append()
+                body = self._capture()
+                await asyncio.to_thread(self._save, body)
+                self._rotate()
+            except Exception:
+                self.errors += 1
+                logger.exception("State snapshot failed")
+
+    @staticmethod
+    def _autonomy_state() -> dict[str, Any]:
+        return {
+            "fleetDefault": autonomy_service.fleet_default,
+            "changeLog": [e.to_dict() for e in autonomy_service.change_log],
+        }
+
+    def _capture(self) -> bytes:
+        """Encode the full state at the current seq and reset the change baselines to it."""
+        robots = [robot.to_dict() for robot in state_manager.robots.values()]
+        self._robots = {rid: robot.revision for rid, robot in state_manager.robots.items()}
+        self._commands = {cmd.id: cmd.updated_at for cmd in command_service.commands.values()}
+        self._versions = {
+            "robots": state_manager.version,
+            "commands": command_service.version,
+            "missions": mission_service.version,
+        }
+        self._suggestions = [
+            (s.id, s.status, s.proposed_action is None) for s in suggestion_service.suggestions.values()
+        ]
+        self._autonomy = (autonomy_service.fleet_default, len(autonomy_service.change_log))
+        body = codec.dumps({
+            "seq": self.seq,
+            "savedAt": time.time(),
+            "robots": robots,
+            "commands": [cmd.to_dict() for cmd in command_service.commands.values()],
+            "missions": {mid: m.to_dict() for mid, m in mission_service.missions.items()},
+            "suggestions": [s.to_dict() for s in suggestion_service.suggestions.values()],
+            "autonomy": self._autonomy_state(),
+        })
+        # Lines after this snapshot go to a new generation
+        self._open_journal(self.seq)
+        return body
+
+    def _open_journal(self, generation: int) -> None:
+        if self._journal is not None:
+            if generation == self._generation:
+                # Nothing journaled since this generation opened; keep appending to it
+                return
+            self._journal.close()
+        self._generation = generation
+        # "wb": a leftover file of this name holds nothing past `seq` but possibly a torn
+        # tail (restore replayed every whole line), and appending after that would hide
+        # the new lines from the next replay
+        self._journal = open(self.dir / f"journal-{generation}.jsonl", "wb")
+
+    def _save(self, body: bytes) -> None:
+        tmp = self.dir / f"{SNAPSHOT}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(body)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.dir / SNAPSHOT)
+        self.snapshots += 1
+
+    def _rotate(self) -> None:
+        """Drop journal generations the snapshot on disk already covers."""
+        for path in self.dir.glob("journal-*.jsonl"):
+            if int(path.stem.split("-")[1]) < self._generation:
+                path.unlink(missing_ok=True)
+
+    def _write_snapshot(self, body: bytes) -> None:
+        self._save(body)
+        self._rotate()
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "seq": self.seq,
+            "generation": self._generation,
+            "records": self.records,
+            "snapshots": self.snapshots,
+            "errors": self.errors,
+            "restored": self.restored,
+        }
+
+
+state_journal = StateJournal()
@@ -4,12 +4,33 @@ import time
 from dataclasses import dataclass, field
 from typing import Any
 
+from app import codec
+from app.config import settings
+from app.services.columns import FleetColumns, np
+from app.services.snapshot import SnapshotCache
+from app.services.spatial import GridClusters
 
 AUTONOMY_TIERS = ("manual", "assisted", "supervised", "autonomous")
 
 
-@dataclass
+_set = object.__setattr__
+
+
+@dataclass(slots=True)
 class RobotState:
+    """Live state of one robot.
+
+    `encoded()` is cached until the next field assignment, so unchanged
+    robots serialize for free; `to_dict()` builds a fresh dict per call and
+    is not cached, which keeps a serialized robot to its fields plus one
+    bytes object. `revision` moves on every assignment, for callers that
+    need to spot changed robots. Replace `metadata` rather than editing it
+    in place, or neither notices the change.
+    """
+
+    # First, so __init__ sets them before the fields whose assignment updates them
+    _revision: int = field(default=0, init=False, repr=False, compare=False)
+    _encoded: bytes | None = field(default=None, init=False, repr=False, compare=False)
     id: str
     name: str = ""
     robot_type: str = "drone"
@@ -27,6 +48,16 @@ class RobotState:
     last_command_source: str = ""
     last_command_at: float = 0.0
 
+    def __setattr__(self, name: str, value: Any) -> None:
+        _set(self, name, value)
+        if name[0] != "_":
+            _set(self, "_revision", self._revision + 1)
+            _set(self, "_encoded", None)
+
+    @property
+    def revision(self) -> int:
+        return self._revision
+
     def to_dict(self) -> dict[str, Any]:
         return {
             "id": self.id,
@@ -51,10 +82,41 @@ class RobotState:
             "lastCommandAt": self.last_command_at,
         }
 
+    def encoded(self) -> bytes:
+        """to_dict() as JSON bytes, encoded once per change."""
+        encoded = self._encoded
+        if encoded is None:
+            # orjson's result keeps a ~1 KB allocation; an exact-size copy is what gets held
+            encoded = bytes(memoryview(codec.dumps(self.to_dict())))
+            _set(self, "_encoded", encoded)
+        return encoded
+
 
 class StateManager:
     def __init__(self) -> None:
         self.robots: dict[str, RobotState] = {}
+        # Map clusters for zoomed-out viewports (see app.ws.viewport)
+        self.grid = GridClusters(settings.viewport_cluster_max_zoom)
+        # Bumped on every robot mutation; keys the cached /api/robots snapshot
+        self.version = 0
+        self.listing = SnapshotCache(
+            "robots",
+            lambda: self.version,
+            # Spliced from per-robot encodings, so only robots that changed are re-encoded
+            lambda: b'{"robots":[' + b",".join(r.encoded() for r in self.robots.values()) + b"]}",
+        )
+        # Vectorized fleet queries (see app.services.columns); None without NumPy
+        self.columns = FleetColumns() if settings.state_columnar and np is not None else None
+
+    def touch(self, *robots: RobotState) -> None:
+        """Record a mutation made directly on a RobotState; pass the robots if status or tier changed."""
+        for robot in robots:
+            self._sync(robot)
+        self.version += 1
+
+    def _sync(self, robot: RobotState) -> None:
+        if self.columns is not None:
+            self.columns.sync(robot)
 
     def register_robot(self, robot_id: str, data: dict[str, Any]) -> RobotState:
         robot = RobotState(
@@ -65,6 +127,8 @@ class StateManager:
             last_seen=time.time(),
         )
         self.robots[robot_id] = robot
+        self._sync(robot)
+        self.version += 1
         return robot
 
     def update_position(self, robot_id: str, data: dict[str, Any]) -> RobotState | None:
@@ -77,8 +141,11 @@ class StateManager:
         robot.heading = data.get("heading", robot.heading)
         robot.speed = data.get("speed", robot.speed)
         robot.last_seen = time.time()
-        if robot.status == "idle":
+        self.grid.move(robot_id, robot.latitude, robot.longitude)
+        if robot.status in ("idle", "offline"):
             robot.status = "active"
+        self._sync(robot)
+        self.version += 1
         return robot
 
     def update_health(self, robot_id: str, data: dict[str, Any]) -> RobotState | None:
@@ -88,17 +155,90 @@ class StateManager:
         robot.battery_percent = data.get("battery_percent", robot.battery_percent)
         robot.signal_strength = data.get("signal_strength", robot.signal_strength)
         robot.last_seen = time.time()
+        if robot.status == "offline":
+            robot.status = "active"
+        self._sync(robot)
+        self.version += 1
         return robot
 
     def update_status(self, robot_id: str, data: dict[str, Any]) -> RobotState | None:
         robot = self.robots.get(robot_id)
         if robot is None:
             # Auto-register if we get a status message for unknown robot
-            return self.register_robot(robot_id, data)
+            robot = self.register_robot(robot_id, data)
+        else:
+            robot.status = data.get("status", robot.status)
+            robot.last_seen = time.time()
+        # Wire format announced by the robot (see app.mqtt.wire)
+        telemetry_format = data.get("telemetry_format")
+        if telemetry_format:
+            robot.metadata = {**robot.metadata, "telemetryFormat": telemetry_format}
+        self._sync(robot)
+        self.version += 1
+        return robot
+
+    def apply_snapshot(self, data: dict[str, Any]) -> RobotState:
+        """Adopt a robot's full state (to_dict form) published by the replica that owns it."""
+        robot = self.robots.get(data["id"])
+        if robot is None:
+            robot = self.robots[data["id"]] = RobotState(id=data["id"])
+        position = data.get("position", {})
+        health = data.get("health", {})
+        robot.name = data.get("name", robot.name)
+        robot.robot_type = data.get("robotType", robot.robot_type)
         robot.status = data.get("status", robot.status)
-        robot.last_seen = time.time()
+        robot.latitude = position.get("latitude", robot.latitude)
+        robot.longitude = position.get("longitude", robot.longitude)
+        robot.altitude = position.get("altitude", robot.altitude)
+        robot.heading = position.get("heading", robot.heading)
+        robot.speed = data.get("speed", robot.speed)
+        robot.battery_percent = health.get("batteryPercent", robot.battery_percent)
+        robot.signal_strength = health.get("signalStrength", robot.signal_strength)
+        robot.last_seen = data.get("lastSeen", robot.last_seen)
+        robot.metadata = dict(data.get("metadata", robot.metadata))
+        robot.autonomy_tier = data.get("autonomyTier", robot.autonomy_tier)
+        robot.last_command_source = data.get("lastCommandSource", robot.last_command_source)
+        robot.last_command_at = data.get("lastCommandAt", robot.last_command_at)
+        if position:
+            self.grid.move(robot.id, robot.latitude, robot.longitude)
+        self._sync(robot)
+        self.version += 1
         return robot
 
+    # ── Fleet-wide queries ───────────────────────────────────────────
+
+    def available(self, selected: list[str] | None = None) -> dict[str, RobotState]:
+        """The selected robots, or every robot that is neither offline nor in error."""
+        if selected:
+            wanted = set(selected)
+            return {rid: r for rid, r in self.robots.items() if rid in wanted}
+        if self.columns is not None:
+            usable = ~self.columns.status_in("offline", "error")
+            return {rid: self.robots[rid] for rid in self.columns.ids_where(usable)}
+        return {rid: r for rid, r in self.robots.items() if r.status not in ("offline", "error")}
+
+    def fleet_summary(self, low_battery: float = 30.0) -> dict[str, Any]:
+        """Robot counts by status and autonomy tier, plus how many are low on battery."""
+        columns = self.columns
+        if columns is not None:
+            return {
+                "total": columns.size,
+                "byStatus": columns.status_counts(),
+                "byTier": columns.tier_counts(),
+                "lowBattery": int((columns.battery_percent < low_battery).sum()),
+            }
+        by_status: dict[str, int] = {}
+        by_tier: dict[str, int] = {}
+        for r in self.robots.values():
+            by_status[r.status] = by_status.get(r.status, 0) + 1
+            by_tier[r.autonomy_tier] = by_tier.get(r.autonomy_tier, 0) + 1
+        return {
+            "total": len(self.robots),
+            "byStatus": by_status,
+            "byTier": by_tier,
+            "lowBattery": sum(1 for r in self.robots.values() if r.battery_percent < low_battery),
+        }
+
     def get_full_state(self) -> dict[str, Any]:
         from app.services.mission_service import mission_service
 
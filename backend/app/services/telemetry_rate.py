@@ -0,0 +1,175 @@
+"""Demand-driven telemetry rates.
+
+Robots publish position at the active interval only while someone needs the
+detail: an operator has them selected, they are executing a command or an
+active mission, or they are in an alert state. Everyone else is asked to
+drop to the idle interval, which cuts broker, ingest and database load
+during quiet periods. Rates are pushed with a `set_telemetry_rate` message
+on the robot's command topic; it carries no command_id, so robots don't ack it.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Any, Hashable, NamedTuple
+
+from app.ai.suggestions import suggestion_service
+from app.config import settings
+from app.mqtt.client import mqtt_client
+from app.mqtt.outbound import OutboundQueueFull
+from app.services.command_service import command_service
+from app.services.mission_service import mission_service
+from app.services.state_manager import RobotState, state_manager
+
+logger = logging.getLogger(__name__)
+
+
+class DemandSets(NamedTuple):
+    """Robot ids with fleet-wide demand signals, collected once per evaluation pass."""
+
+    selected: set[str]
+    on_mission: set[str]
+    suggested: set[str]  # robots with a pending suggestion
+
+
+# Same thresholds as the heuristic battery/signal warnings
+ALERT_BATTERY_PERCENT = 30.0
+ALERT_SIGNAL_STRENGTH = 30.0
+
+
+class TelemetryRateController:
+    def __init__(self) -> None:
+        # WebSocket client -> robot ids it has selected
+        self._selections: dict[Hashable, set[str]] = {}
+        # robot_id -> (interval last pushed, when)
+        self._sent: dict[str, tuple[float, float]] = {}
+        self._task: asyncio.Task[None] | None = None
+        self.updates_sent = 0
+
+    async def start(self) -> None:
+        if not settings.telemetry_rate_control:
+            return
+        self._task = asyncio.create_task(self._loop())
+        logger.info(
+            "Telemetry rate control started (active %.1fs, idle %.1fs)",
+            settings.telemetry_interval_active, settings.telemetry_interval_idle,
+        )
+
+    async def stop(self) -> None:
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    # ── Demand signals ───────────────────────────────────────────────
+
+    async def select(self, client: Hashable, robot_ids: list[str]) -> None:
+        """Record a client's selection and apply the change right away."""
+        previous = self._selections.get(client, set())
+        current = set(robot_ids)
+        self._selections[client] = current
+        if self._task is not None:
+            demand_sets = self.demand_sets()
+            for robot_id in previous ^ current:
+                await self._apply(robot_id, demand_sets)
+
+    def release(self, client: Hashable) -> None:
+        """Forget a disconnected client; its robots slow down on the next pass."""
+        self._selections.pop(client, None)
+
+    def forget(self, robot_id: str) -> None:
+        """Re-push the rate on the next pass (e.g. the robot reconnected)."""
+        self._sent.pop(robot_id, None)
+
+    def demand_sets(self) -> DemandSets:
+        """Scan selections, missions and suggestions once for a whole pass."""
+        on_mission: set[str] = set()
+        for m in mission_service.missions.values():
+            if m.status == "active":
+                on_mission.update(m.assigned_robots)
+        return DemandSets(
+            selected=set().union(*self._selections.values()),
+            on_mission=on_mission,
+            suggested={s.robot_id for s in suggestion_service.get_pending()},
+        )
+
+    def demand(self, robot: RobotState, demand_sets: DemandSets | None = None) -> list[str]:
+        """Reasons this robot needs full-rate telemetry (empty when idle)."""
+        if demand_sets is None:
+            demand_sets = self.demand_sets()
+        reasons: list[str] = []
+        if robot.id in demand_sets.selected:
+            reasons.append("selected")
+        if command_service.get_active_command(robot.id) is not None:
+            reasons.append("command")
+        if robot.id in demand_sets.on_mission:
+            reasons.append("mission")
+        if (
+            robot.battery_percent < ALERT_BATTERY_PERCENT
+            or robot.signal_strength < ALERT_SIGNAL_STRENGTH
+            or robot.status == "error"
+            or robot.id in demand_sets.suggested
+        ):
+            reasons.append("alert")
+        return reasons
+
+    def desired_interval(self, robot: RobotState, demand_sets: DemandSets | None = None) -> float:
+        if self.demand(robot, demand_sets):
+            return settings.telemetry_interval_active
+        return settings.telemetry_interval_idle
+
+    # ── Push ─────────────────────────────────────────────────────────
+
+    async def _loop(self) -> None:
+        while True:
+            await asyncio.sleep(settings.telemetry_rate_eval_interval)
+            try:
+                demand_sets = self.demand_sets()
+                for robot_id in list(state_manager.robots):
+                    await self._apply(robot_id, demand_sets)
+            except Exception:
+                logger.exception("Telemetry rate evaluation failed")
+
+    async def _apply(self, robot_id: str, demand_sets: DemandSets) -> None:
+        robot = state_manager.robots.get(robot_id)
+        if robot is None or robot.status == "offline":
+            return
+        if not mqtt_client.cluster.is_local(robot_id):
+            return
+        interval = self.desired_interval(robot, demand_sets)
+        now = time.time()
+        sent = self._sent.get(robot_id)
+        # Re-send periodically in case the robot restarted without a status message
+        if sent is not None and sent[0] == interval and now - sent[1] < settings.telemetry_rate_resend:
+            return
+        try:
+            await mqtt_client.publish(
+                f"argus/{robot_id}/command/execute",
+                {"command_type": "set_telemetry_rate", "parameters": {"interval": interval}},
+            )
+        except OutboundQueueFull:
+            # Operator commands come first; retried on the next pass
+            return
+        self._sent[robot_id] = (interval, now)
+        robot.metadata = {**robot.metadata, "telemetryInterval": interval}
+        state_manager.touch()
+        self.updates_sent += 1
+        logger.debug("Telemetry interval for %s -> %.1fs", robot_id, interval)
+
+    def stats(self) -> dict[str, Any]:
+        idle = sum(1 for interval, _ in self._sent.values() if interval == settings.telemetry_interval_idle)
+        return {
+            "enabled": self._task is not None,
+            "clients": len(self._selections),
+            "robotsIdle": idle,
+            "robotsActive": len(self._sent) - idle,
+            "updatesSent": self.updates_sent,
+        }
+
+
+telemetry_rate_controller = TelemetryRateController()
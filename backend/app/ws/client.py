@@ -0,0 +1,200 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Callable
+
+from fastapi import WebSocket
+
+from app.ws.protocol import JSON, Frame, JsonProtocol, MsgpackProtocol
+from app.ws.viewport import Viewport
+
+logger = logging.getLogger(__name__)
+
+# What to do when a client's send queue is full. Frames carrying events
+# (command.status, ai.suggestion, missions, ...) are never dropped: if only
+# those are left to drop, the client is disconnected and resumes from the
+# replay buffer when it reconnects.
+OVERFLOW_DROP_OLDEST = "drop_oldest"  # drop the oldest robot state frame
+# Drop the oldest robot state frame; keyed frames replace their pending copy,
+# and a backlogged client gets robot state as one keyframe per robot once it drains
+OVERFLOW_CONFLATE = "conflate"
+OVERFLOW_DISCONNECT = "disconnect"
+OVERFLOW_POLICIES = (OVERFLOW_DROP_OLDEST, OVERFLOW_CONFLATE, OVERFLOW_DISCONNECT)
+
+# Queue placeholder: the frame lives in ClientConnection._latest until sent
+_CONFLATED = object()
+
+
+class ClientConnection:
+    """One WebSocket client with its own bounded send queue and writer task.
+
+    Enqueueing never awaits, so a stalled client only ever delays itself.
+    Frames carrying a conflation key (e.g. one robot's state) replace the
+    pending frame with the same key under the "conflate" policy, so a slow
+    client skips intermediate states instead of falling further behind.
+    Only keyed or `droppable` (robot state only) frames are ever dropped.
+    """
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        on_close: Callable[[ClientConnection, str], None],
+        max_queue: int = 256,
+        policy: str = OVERFLOW_CONFLATE,
+        send_timeout: float = 5.0,
+        protocol: JsonProtocol | MsgpackProtocol = JSON,
+    ) -> None:
+        self.websocket = websocket
+        self.protocol = protocol
+        self._on_close = on_close
+        # (conflation key, frame, droppable)
+        self._queue: deque[tuple[str | None, Any, bool]] = deque()
+        self._latest: dict[str, str | bytes] = {}
+        self._wakeup = asyncio.Event()
+        self._max_queue = max_queue
+        self._policy = policy
+        self._send_timeout = send_timeout
+        self._task: asyncio.Task[None] | None = None
+        self.closed = False
+        self.connected_at = time.time()
+        self.last_received = time.monotonic()
+        self.ping_sent_at = 0.0
+        self.rtt: float | None = None
+        # Per-robot rate cap from the client's subscription (0 = uncapped)
+        self.min_interval = 0.0
+        self.robot_sent_at: dict[str, float] = {}
+        self.held: set[str] = set()  # robots with updates held back by the cap
+        self.rate_limited = 0
+        # Map viewport (padded); when clustered, robot.clusters replaces robot frames
+        self.viewport: Viewport | None = None
+        self.clustered = False
+        self.sent = 0
+        self.sent_bytes = 0
+        self.dropped = 0
+        self.conflated = 0
+        self.high_water = 0
+
+    @property
+    def peer(self) -> str:
+        client = self.websocket.client
+        return f"{client.host}:{client.port}" if client else "?"
+
+    @property
+    def backlogged(self) -> bool:
+        """Under "conflate", robot state is held back per robot while this is true."""
+        return self._policy == OVERFLOW_CONFLATE and len(self._queue) >= self._max_queue // 2
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._writer())
+
+    def enqueue(self, frame: str | bytes, key: str | None = None, droppable: bool = False) -> bool:
+        """Queue a pre-encoded frame. Returns False if the client is gone or
+        was evicted for overflowing.
+
+        Keyed frames are always droppable; pass `droppable` for other frames
+        that only carry robot state, which a later keyframe supersedes.
+        """
+        if self.closed:
+            return False
+        droppable = droppable or key is not None
+        if key is not None and self._policy == OVERFLOW_CONFLATE:
+            if key in self._latest:
+                self._latest[key] = frame
+                self.conflated += 1
+                return True
+            self._latest[key] = frame
+            item: tuple[str | None, Any, bool] = (key, _CONFLATED, True)
+        else:
+            item = (None, frame, droppable)
+
+        if len(self._queue) >= self._max_queue:
+            if self._policy == OVERFLOW_DISCONNECT or not self._drop_oldest():
+                # Events can't be skipped; on reconnect the client resumes from the replay buffer
+                self.close("send queue overflow")
+                return False
+        self._queue.append(item)
+        if len(self._queue) > self.high_water:
+            self.high_water = len(self._queue)
+        self._wakeup.set()
+        return True
+
+    def send(self, frame: Frame, key: str | None = None, droppable: bool = False) -> bool:
+        """Queue a shared frame in this client's wire protocol."""
+        return self.enqueue(frame.encode(self.protocol), key, droppable)
+
+    def _drop_oldest(self) -> bool:
+        """Drop the oldest droppable frame; False if every queued frame carries events."""
+        for i, (key, frame, droppable) in enumerate(self._queue):
+            if droppable:
+                del self._queue[i]
+                if frame is _CONFLATED:
+                    self._latest.pop(key, None)
+                self.dropped += 1
+                return True
+        return False
+
+    def _next(self) -> str | bytes:
+        key, frame, _ = self._queue.popleft()
+        if frame is _CONFLATED:
+            frame = self._latest.pop(key)
+        return frame
+
+    async def _writer(self) -> None:
+        while not self.closed:
+            if not self._queue:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+            frame = self._next()
+            try:
+                if isinstance(frame, bytes):
+                    send = self.websocket.send_bytes(frame)
+                else:
+                    send = self.websocket.send_text(frame)
+                await asyncio.wait_for(send, self._send_timeout)
+            except asyncio.TimeoutError:
+                self.close(f"send timed out after {self._send_timeout:.0f}s")
+                return
+            except Exception:
+                self.close("send failed")
+                return
+            self.sent += 1
+            self.sent_bytes += len(frame)
+
+    def close(self, reason: str) -> None:
+        """Stop the writer and drop the connection (idempotent)."""
+        if self.closed:
+            return
+        self.closed = True
+        self._queue.clear()
+        self._latest.clear()
+        if self._task is not None and self._task is not asyncio.current_task():
+            self._task.cancel()
+        self._on_close(self, reason)
+        if reason:
+            # Best effort: unblocks the endpoint's receive loop
+            asyncio.create_task(self._close_socket())
+
+    async def _close_socket(self) -> None:
+        try:
+            await asyncio.wait_for(self.websocket.close(code=1008), self._send_timeout)
+        except Exception:
+            pass
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "peer": self.peer,
+            "protocol": self.protocol.name,
+            "connectedAt": self.connected_at,
+            "queueDepth": len(self._queue),
+            "highWater": self.high_water,
+            "sent": self.sent,
+            "sentBytes": self.sent_bytes,
+            "dropped": self.dropped,
+            "conflated": self.conflated,
+            "rateLimited": self.rate_limited,
+            "rttMs": round(self.rtt * 1000, 1) if self.rtt is not None else None,
+        }
@@ -0,0 +1,36 @@
+"""permessage-deflate tuned for small, repetitive telemetry frames.
+
+uvicorn always offers permessage-deflate with zlib defaults (15-bit
+windows, level 6 unless the client negotiates otherwise). Robot frames are
+a few hundred bytes and mostly repeat the previous frame's keys, so a
+smaller window keeps nearly all of the ratio at a fraction of the
+per-connection memory, and a lower level saves server CPU on every frame.
+`bench/ws_bench.py` measures the trade-off.
+
+Used by `python -m app.serve`; plain `uvicorn app.main:app` keeps the
+defaults.
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+from uvicorn.protocols.websockets.websockets_impl import WebSocketProtocol
+from websockets.extensions.permessage_deflate import ServerPerMessageDeflateFactory
+
+from app.config import settings
+
+
+def deflate_factory() -> ServerPerMessageDeflateFactory:
+    return ServerPerMessageDeflateFactory(
+        server_max_window_bits=settings.ws_deflate_window_bits,
+        client_max_window_bits=settings.ws_deflate_window_bits,
+        compress_settings={"level": settings.ws_deflate_level, "memLevel": settings.ws_deflate_mem_level},
+    )
+
+
+class TunedDeflateWebSocketProtocol(WebSocketProtocol):
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        if self.config.ws_per_message_deflate:
+            self.available_extensions = [deflate_factory()]
@@ -0,0 +1,123 @@
+"""Delta-encoded robot updates.
+
+Instead of the full `RobotState.to_dict()` on every telemetry sample,
+clients get `robot.delta` messages carrying only the fields that changed
+since the previous message for that robot (position and health are diffed
+per sub-field). Every message has a per-robot `seq`; a keyframe (a full
+`robot.updated`) goes out every `ws_keyframe_interval` seconds, and a
+client that sees a gap in `seq` asks for one with `robot.resync`.
+
+Keyframes sent to a single client carry the last *broadcast* state, not the
+live one, so the deltas that follow apply cleanly on top of it.
+"""
+
+from __future__ import annotations
+
+import time
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from app.services.state_manager import RobotState
+
+# Sub-objects diffed field by field; everything else is replaced whole
+_NESTED = ("position", "health")
+
+
+def diff(old: dict[str, Any], new: dict[str, Any]) -> dict[str, Any]:
+    changes: dict[str, Any] = {}
+    for key, value in new.items():
+        previous = old.get(key)
+        if value == previous:
+            continue
+        if key in _NESTED and isinstance(value, dict) and isinstance(previous, dict):
+            changes[key] = {k: v for k, v in value.items() if previous.get(k) != v}
+        else:
+            changes[key] = value
+    return changes
+
+
+class RobotDeltaEncoder:
+    def __init__(self, keyframe_interval: float = 10.0) -> None:
+        self.keyframe_interval = keyframe_interval
+        self._last: dict[str, dict[str, Any]] = {}
+        # RobotState.revision each snapshot was taken at
+        self._revisions: dict[str, int] = {}
+        self._seq: dict[str, int] = {}
+        self._keyframe_at: dict[str, float] = {}
+        self.deltas = 0
+        self.keyframes = 0
+        self.skipped = 0
+
+    def _message(
+        self, msg_type: str, seq: int, payload: dict[str, Any], timestamp: str | None = None
+    ) -> dict[str, Any]:
+        return {
+            "type": msg_type,
+            "seq": seq,
+            "payload": payload,
+            "timestamp": timestamp or datetime.now(timezone.utc).isoformat(),
+        }
+
+    def encode(
+        self, robot: RobotState, force_keyframe: bool = False, timestamp: str | None = None
+    ) -> dict[str, Any] | None:
+        """Next message for this robot, or None if nothing changed."""
+        # A fresh dict per call, so it can be kept as the diff base as is
+        full = robot.to_dict()
+        last = self._last.get(robot.id)
+        now = time.monotonic()
+        keyframe = (
+            force_keyframe
+            or last is None
+            or now - self._keyframe_at.get(robot.id, 0.0) >= self.keyframe_interval
+        )
+        if keyframe:
+            changes = full
+        else:
+            changes = diff(last, full)
+            if not changes:
+                self.skipped += 1
+                return None
+
+        seq = self._seq.get(robot.id, 0) + 1
+        self._seq[robot.id] = seq
+        self._last[robot.id] = full
+        self._revisions[robot.id] = robot.revision
+        if keyframe:
+            self._keyframe_at[robot.id] = now
+            self.keyframes += 1
+            return self._message("robot.updated", seq, full, timestamp)
+        self.deltas += 1
+        return self._message("robot.delta", seq, {"id": robot.id, **changes}, timestamp)
+
+    def keyframe(self, robot_id: str, timestamp: str | None = None) -> dict[str, Any] | None:
+        """Full state at the current seq, for one client that lost track."""
+        last = self._last.get(robot_id)
+        if last is None:
+            return None
+        return self._message("robot.updated", self._seq[robot_id], last, timestamp)
+
+    def is_current(self, robot: RobotState) -> bool:
+        """Whether the robot is unchanged since its last broadcast state."""
+        return self._revisions.get(robot.id) == robot.revision
+
+    def snapshots(self) -> dict[str, dict[str, Any]]:
+        """Last broadcast state per robot (what the current seqs refer to)."""
+        return dict(self._last)
+
+    @property
+    def version(self) -> int:
+        """Moves whenever snapshots() does (one per encoded message)."""
+        return self.deltas + self.keyframes
+
+    def seqs(self) -> dict[str, int]:
+        return dict(self._seq)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "robots": len(self._last),
+            "deltas": self.deltas,
+            "keyframes": self.keyframes,
+            "skipped": self.skipped,
+        }
@@ -0,0 +1,228 @@
+"""State-delta feed from the backend to `argus-ws-gateway` processes.
+
+With `WS_GATEWAY_SOCKET` set, the backend stops encoding for WebSocket
+clients itself: `ws_manager` forwards every broadcast event and robot
+change here, and the feed serves them on a Unix domain socket to one or
+more gateway processes (`python -m app.gateway`), which own `/ws` and do
+all per-client filtering, delta encoding, serialization and compression.
+The backend emits each change once, whatever the number of consoles.
+
+Frames are a 4-byte big-endian length followed by a JSON body. Backend to
+gateway, once per `ws_gateway_flush_interval`:
+
+    {"events": [<ws message>, ...],
+     "robots": [{"id": ..., <to_dict fields changed since last tick>}, ...],
+     "missions": {<id>: <to_dict>, ...}}        # only when missions changed
+
+A gateway's first frame also has `"sync": true` and every robot in full.
+Gateway to backend, the client messages the gateway does not handle
+itself (commands, autonomy tiers, robot selection):
+
+    {"client": <gateway-local client id>, "message": {...}}
+    {"closed": <gateway-local client id>}
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import struct
+from typing import Any, Awaitable, Callable, Hashable
+
+from app import codec
+from app.config import settings
+from app.services.mission_service import mission_service
+from app.services.state_manager import RobotState, state_manager
+from app.ws.manager import ws_manager
+
+logger = logging.getLogger(__name__)
+
+_HEADER = struct.Struct(">I")
+
+ClientHandler = Callable[[Hashable, dict[str, Any]], Awaitable[None]]
+
+
+async def read_frame(reader: asyncio.StreamReader) -> Any:
+    (size,) = _HEADER.unpack(await reader.readexactly(_HEADER.size))
+    return codec.loads(await reader.readexactly(size))
+
+
+def write_frame(writer: asyncio.StreamWriter, body: bytes) -> None:
+    writer.write(_HEADER.pack(len(body)) + body)
+
+
+def robot_patch(current: dict[str, Any], previous: dict[str, Any] | None) -> dict[str, Any]:
+    """The top-level to_dict fields that differ from the last forwarded copy."""
+    if previous is None:
+        return current
+    patch = {k: v for k, v in current.items() if previous.get(k) != v}
+    if patch:
+        patch["id"] = current["id"]
+    return patch
+
+
+class GatewayFeed:
+    def __init__(self) -> None:
+        self.path = settings.ws_gateway_socket
+        self.enabled = bool(self.path)
+        self._server: asyncio.AbstractServer | None = None
+        self._flush_task: asyncio.Task[None] | None = None
+        self._gateways: dict[asyncio.StreamWriter, set[Hashable]] = {}
+        self._next_gateway = 0
+        self._events: list[dict[str, Any]] = []
+        self._dirty: dict[str, RobotState] = {}
+        # Last to_dict forwarded per robot, the base for the next patch
+        self._sent: dict[str, dict[str, Any]] = {}
+        self._mission_version = -1
+        self._handle: ClientHandler | None = None
+        self._on_closed: Callable[[Hashable], None] | None = None
+        self.ticks = 0
+        self.bytes_sent = 0
+        self.events_forwarded = 0
+        self.patches = 0
+        self.upstream = 0
+        self.dropped = 0
+
+    async def start(self, handle: ClientHandler, on_closed: Callable[[Hashable], None]) -> None:
+        """Serve the feed; `handle` runs client messages the gateways pass up."""
+        if not self.enabled:
+            return
+        self._handle = handle
+        self._on_closed = on_closed
+        if os.path.exists(self.path):
+            os.unlink(self.path)  # left over from an unclean shutdown
+        self._server = await asyncio.start_unix_server(self._serve_gateway, path=self.path)
+        ws_manager.forward = self._events.append
+        ws_manager.forward_robot = self._mark
+        self._flush_task = asyncio.create_task(self._flush_loop())
+        logger.info("WS gateway feed listening on %s", self.path)
+
+    async def stop(self) -> None:
+        ws_manager.forward = None
+        ws_manager.forward_robot = None
+        if self._flush_task:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+        if self._server is not None:
+            self._server.close()
+            for writer in list(self._gateways):
+                writer.close()
+            await self._server.wait_closed()
+            if os.path.exists(self.path):
+                os.unlink(self.path)
+
+    def _mark(self, robot: RobotState) -> None:
+        self._dirty[robot.id] = robot
+
+    # ── Backend -> gateways ──────────────────────────────────────────
+
+    async def _flush_loop(self) -> None:
+        while True:
+            await asyncio.sleep(settings.ws_gateway_flush_interval)
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("WS gateway feed flush failed")
+
+    def flush(self) -> None:
+        """Send everything that changed since the last tick to every gateway, encoded once."""
+        events = list(self._events)
+        self._events.clear()
+        dirty, self._dirty = self._dirty, {}
+        robots = []
+        for robot_id, robot in dirty.items():
+            current = robot.to_dict()
+            patch = robot_patch(current, self._sent.get(robot_id))
+            self._sent[robot_id] = current
+            if patch:
+                robots.append(patch)
+        tick: dict[str, Any] = {"events": events, "robots": robots}
+        if mission_service.version != self._mission_version:
+            self._mission_version = mission_service.version
+            tick["missions"] = {mid: m.to_dict() for mid, m in mission_service.missions.items()}
+        if not (events or robots or "missions" in tick) or not self._gateways:
+            return
+        body = codec.dumps(tick)
+        for writer in list(self._gateways):
+            self._write(writer, body)
+        self.ticks += 1
+        self.events_forwarded += len(events)
+        self.patches += len(robots)
+
+    def _write(self, writer: asyncio.StreamWriter, body: bytes) -> None:
+        if writer.transport.get_write_buffer_size() > settings.ws_gateway_buffer_limit:
+            # The gateway stopped reading; it gets a fresh sync when it reconnects
+            self.dropped += 1
+            logger.warning("WS gateway fell %d bytes behind; disconnecting it", writer.transport.get_write_buffer_size())
+            writer.close()
+            return
+        write_frame(writer, body)
+        self.bytes_sent += len(body) + _HEADER.size
+
+    def _sync_frame(self) -> bytes:
+        robots = []
+        for robot_id, robot in state_manager.robots.items():
+            current = robot.to_dict()
+            # An older base only makes the next patch larger, never wrong
+            self._sent.setdefault(robot_id, current)
+            robots.append(current)
+        return codec.dumps({
+            "sync": True,
+            "events": [],
+            "robots": robots,
+            "missions": {mid: m.to_dict() for mid, m in mission_service.missions.items()},
+        })
+
+    # ── Gateways -> backend ──────────────────────────────────────────
+
+    async def _serve_gateway(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self._next_gateway += 1
+        gateway = self._next_gateway
+        clients: set[Hashable] = set()
+        self._gateways[writer] = clients
+        self._write(writer, self._sync_frame())
+        logger.info("WS gateway %d connected. Total: %d", gateway, len(self._gateways))
+        try:
+            while True:
+                frame = await read_frame(reader)
+                if "closed" in frame:
+                    key = (gateway, frame["closed"])
+                    clients.discard(key)
+                    self._on_closed(key)
+                    continue
+                key = (gateway, frame["client"])
+                clients.add(key)
+                self.upstream += 1
+                try:
+                    await self._handle(key, frame["message"])
+                except Exception:
+                    logger.exception("WS gateway %d: failed to handle client message", gateway)
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        except codec.DECODE_ERRORS:
+            logger.warning("WS gateway %d sent an undecodable frame; disconnecting it", gateway)
+        finally:
+            self._gateways.pop(writer, None)
+            for key in clients:
+                self._on_closed(key)
+            writer.close()
+            logger.info("WS gateway %d disconnected. Total: %d", gateway, len(self._gateways))
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "gateways": len(self._gateways),
+            "ticks": self.ticks,
+            "bytesSent": self.bytes_sent,
+            "events": self.events_forwarded,
+            "robotPatches": self.patches,
+            "upstream": self.upstream,
+            "dropped": self.dropped,
+        }
+
+
+gateway_feed = GatewayFeed()
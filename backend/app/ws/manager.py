@@ -1,42 +1,654 @@
 from __future__ import annotations
 
+import asyncio
 import logging
-from typing import Any
+import time
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Any, Callable
 
 from fastapi import WebSocket
 
+from app import codec
+from app.config import settings
+from app.services.mission_service import mission_service
+from app.services.state_manager import state_manager
+from app.ws.client import ClientConnection
+from app.ws.delta import RobotDeltaEncoder
+from app.ws.protocol import Frame, SyncBody, SyncFrame, negotiate
+from app.ws.replay import EventLog
+from app.ws.subscriptions import ALL, ROBOT_STATE_TYPES, Subscription, SubscriptionIndex, robot_id_of
+from app.ws.viewport import Viewport, cluster_payload, robot_in_view, view_cells
+
+if TYPE_CHECKING:
+    from app.services.state_manager import RobotState
+
 logger = logging.getLogger(__name__)
 
+# Message types where only the newest pending copy per id matters to a slow client
+CONFLATABLE_TYPES = {"robot.updated"}
+
+# What _admit decides for one robot state frame and one client
+_SKIP, _SEND, _KEYFRAME = range(3)
+
+# Events per batch frame when replaying to a resumed client
+_REPLAY_CHUNK = 256
+
+
+def conflation_key(message: dict[str, Any]) -> str | None:
+    msg_type = message.get("type")
+    if msg_type in CONFLATABLE_TYPES:
+        payload = message.get("payload")
+        if isinstance(payload, dict) and "id" in payload:
+            return f"{msg_type}:{payload['id']}"
+    return None
+
 
 class ConnectionManager:
     def __init__(self) -> None:
-        self.active_connections: list[WebSocket] = []
+        self.clients: dict[WebSocket, ClientConnection] = {}
+        self._heartbeat_task: asyncio.Task[None] | None = None
+        self._flush_task: asyncio.Task[None] | None = None
+        self._viewport_task: asyncio.Task[None] | None = None
+        self._batch_task: asyncio.Task[None] | None = None
+        # Tick batching: robots changed and messages queued since the last tick
+        self._batching = False
+        self._dirty: dict[str, RobotState] = {}
+        self._pending: list[dict[str, Any]] = []
+        self.batches = 0
+        self.batch_frames = 0
+        self.subscriptions: SubscriptionIndex[ClientConnection] = SubscriptionIndex()
+        self.robot_deltas = RobotDeltaEncoder(settings.ws_keyframe_interval)
+        self.events = EventLog(settings.ws_replay_buffer_size)
+        # Cross-replica fanout hooks, set by app.services.fanout_bus when enabled
+        self.relay: Callable[[dict[str, Any]], None] | None = None
+        self.relay_robot: Callable[[RobotState], None] | None = None
+        # Set by app.ws.feed when a separate gateway process owns /ws: every change
+        # goes out once on the feed instead of being encoded here
+        self.forward: Callable[[dict[str, Any]], None] | None = None
+        self.forward_robot: Callable[[RobotState], None] | None = None
+        # ((robots key, missions version), body) of the state.sync shared by new clients
+        self._sync_body: tuple[tuple[Any, int], SyncBody] | None = None
+        # (body, eventSeq, frame): a new eventSeq on the same body only costs a splice
+        self._sync_frame: tuple[SyncBody, int, SyncFrame] | None = None
+        self.sync_builds = 0
+        self.sync_hits = 0
+        # robot_id -> (seq, encoded keyframe) shared by rate-capped clients
+        self._keyframe_cache: dict[str, tuple[int, Frame]] = {}
+        self.evicted = 0
 
-    async def connect(self, websocket: WebSocket) -> None:
-        await websocket.accept()
-        self.active_connections.append(websocket)
-        logger.info("Client connected. Total: %d", len(self.active_connections))
+    @property
+    def active_connections(self) -> list[WebSocket]:
+        return list(self.clients)
+
+    async def start(self) -> None:
+        self._heartbeat_task = asyncio.create_task(self._heartbeat())
+        self._viewport_task = asyncio.create_task(self._stream_viewports())
+        if settings.ws_batch_interval > 0:
+            # Held-back updates are released by the tick itself
+            self._batching = True
+            self._batch_task = asyncio.create_task(self._batch_loop())
+        else:
+            self._flush_task = asyncio.create_task(self._flush_held())
+
+    async def stop(self) -> None:
+        self._batching = False
+        for task in (self._heartbeat_task, self._flush_task, self._viewport_task, self._batch_task):
+            if task:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        for client in list(self.clients.values()):
+            client.close("")
+
+    async def connect(self, websocket: WebSocket) -> ClientConnection:
+        protocol = negotiate(websocket.scope.get("subprotocols", []), settings.ws_msgpack)
+        await websocket.accept(subprotocol=protocol.subprotocol)
+        client = ClientConnection(
+            websocket,
+            self._on_client_closed,
+            max_queue=settings.ws_send_queue_size,
+            policy=settings.ws_overflow_policy,
+            send_timeout=settings.ws_send_timeout,
+            protocol=protocol,
+        )
+        self.clients[websocket] = client
+        self.subscriptions.set(client, Subscription())
+        client.start()
+        logger.info("Client connected (%s). Total: %d", protocol.name, len(self.clients))
+        return client
 
     def disconnect(self, websocket: WebSocket) -> None:
-        if websocket in self.active_connections:
-            self.active_connections.remove(websocket)
-        logger.info("Client disconnected. Total: %d", len(self.active_connections))
+        client = self.clients.get(websocket)
+        if client is not None:
+            client.close("")
+
+    def _on_client_closed(self, client: ClientConnection, reason: str) -> None:
+        self.clients.pop(client.websocket, None)
+        self.subscriptions.remove(client)
+        if reason:
+            self.evicted += 1
+            logger.warning("Evicted WS client %s: %s", client.peer, reason)
+        logger.info("Client disconnected. Total: %d", len(self.clients))
+
+    async def broadcast(self, message: dict[str, Any], relay: bool = True) -> None:
+        """Queue a message for every subscribed client; never waits on a slow socket.
+
+        `relay=False` is for events that arrived from another replica.
+        """
+        if relay and self.relay is not None:
+            self.relay(message)
+        if self.forward is not None:
+            self.forward(message)
+            return
+        if self._batching:
+            self._pending.append(message)
+            return
+        self.events.append(message)
+        msg_type = message.get("type", "")
+        robot_id = robot_id_of(message)
+        robot = state_manager.robots.get(robot_id) if robot_id else None
+        clients = self.subscriptions.match(msg_type, robot_id, robot)
+        if not clients:
+            return
+        # Encode once for all clients
+        frame = Frame(message)
+        key = conflation_key(message)
+        if robot_id and msg_type in ROBOT_STATE_TYPES:
+            self._fanout_robot_state(clients, robot_id, robot, msg_type, frame, key)
+            return
+        # Events are never dropped from a client's queue (see app.ws.client)
+        for client in clients:
+            client.send(frame, key)
 
-    async def broadcast(self, message: dict[str, Any]) -> None:
-        disconnected: list[WebSocket] = []
-        for conn in self.active_connections:
+    @staticmethod
+    def _in_view(client: ClientConnection, robot: RobotState | None) -> bool:
+        return not client.clustered and robot_in_view(client.viewport, robot)
+
+    def _fanout_robot_state(
+        self,
+        clients: list[ClientConnection],
+        robot_id: str,
+        robot: RobotState | None,
+        msg_type: str,
+        frame: Frame,
+        key: str | None,
+    ) -> None:
+        now = time.monotonic()
+        for client in clients:
+            admit = self._admit(client, robot_id, robot, msg_type, now)
+            if admit == _SEND:
+                client.send(frame, key, droppable=True)
+            elif admit == _KEYFRAME:
+                self._enqueue_keyframe(client, robot_id)
+
+    def _admit(
+        self, client: ClientConnection, robot_id: str, robot: RobotState | None, msg_type: str, now: float
+    ) -> int:
+        """Apply a client's viewport, backlog and rate cap to one robot state frame."""
+        if not self._in_view(client, robot):
+            return _SKIP
+        if client.backlogged:
+            # Conflate per robot while the client catches up: one keyframe once it has drained
+            client.held.add(robot_id)
+            client.conflated += 1
+            return _SKIP
+        if client.min_interval:
+            if now - client.robot_sent_at.get(robot_id, float("-inf")) < client.min_interval:
+                client.held.add(robot_id)
+                client.rate_limited += 1
+                return _SKIP
+            client.robot_sent_at[robot_id] = now
+            if robot_id in client.held:
+                client.held.discard(robot_id)
+                if msg_type == "robot.delta":
+                    # Deltas since the last frame were skipped; catch up with a keyframe
+                    return _KEYFRAME
+        return _SEND
+
+    def _due_held(self, client: ClientConnection, now: float) -> list[str]:
+        """Held-back robots whose rate-cap slot has opened (and are still in view)."""
+        due: list[str] = []
+        if client.backlogged:
+            return due
+        for robot_id in list(client.held):
+            if now - client.robot_sent_at.get(robot_id, float("-inf")) < client.min_interval:
+                continue
+            client.held.discard(robot_id)
+            client.robot_sent_at[robot_id] = now
+            if self._in_view(client, state_manager.robots.get(robot_id)):
+                due.append(robot_id)
+        return due
+
+    def _enqueue_keyframe(self, client: ClientConnection, robot_id: str) -> None:
+        message = self.robot_deltas.keyframe(robot_id)
+        if message is None:
+            return
+        cached = self._keyframe_cache.get(robot_id)
+        if cached is None or cached[0] != message["seq"]:
+            cached = (message["seq"], Frame(message))
+            self._keyframe_cache[robot_id] = cached
+        client.send(cached[1], f"robot.updated:{robot_id}")
+
+    async def _flush_held(self) -> None:
+        """Deliver the latest state of rate-capped robots once their slot opens."""
+        while True:
+            await asyncio.sleep(settings.ws_rate_flush_interval)
+            now = time.monotonic()
+            for client in list(self.clients.values()):
+                if client.held:
+                    for robot_id in self._due_held(client, now):
+                        self._enqueue_keyframe(client, robot_id)
+
+    # ── Batching ─────────────────────────────────────────────────────
+
+    async def _batch_loop(self) -> None:
+        while True:
+            await asyncio.sleep(settings.ws_batch_interval)
             try:
-                await conn.send_json(message)
+                self.flush_batch()
             except Exception:
-                disconnected.append(conn)
-        for conn in disconnected:
-            self.disconnect(conn)
+                logger.exception("WS batch flush failed")
+
+    def flush_batch(self) -> None:
+        """Send everything collected since the last tick as one `batch` frame per client.
+
+        Each robot is encoded once per tick no matter how many samples
+        arrived, and clients that select the same messages share one
+        encoded frame.
+        """
+        dirty, self._dirty = self._dirty, {}
+        pending, self._pending = self._pending, []
+        held = [c for c in self.clients.values() if c.held]
+        if not dirty and not pending and not held:
+            return
+        timestamp = datetime.now(timezone.utc).isoformat()
+        items: list[dict[str, Any]] = []
+        for robot in dirty.values():
+            if settings.ws_delta_updates:
+                message = self.robot_deltas.encode(robot, timestamp=timestamp)
+                if message is None:
+                    continue
+            else:
+                message = {"type": "robot.updated", "payload": robot.to_dict(), "timestamp": timestamp}
+            items.append(message)
+        items.extend(pending)
+        for message in items:
+            self.events.append(message)
+
+        keyframes: dict[str, int] = {}
+
+        def keyframe_index(robot_id: str) -> int | None:
+            if robot_id not in keyframes:
+                message = self.robot_deltas.keyframe(robot_id, timestamp)
+                if message is None:
+                    return None
+                keyframes[robot_id] = len(items)
+                items.append(message)
+            return keyframes[robot_id]
+
+        now = time.monotonic()
+        selected: dict[ClientConnection, list[int]] = {}
+        for i in range(len(items)):
+            message = items[i]
+            msg_type = message.get("type", "")
+            robot_id = robot_id_of(message)
+            robot = state_manager.robots.get(robot_id) if robot_id else None
+            clients = self.subscriptions.match(msg_type, robot_id, robot)
+            if not (robot_id and msg_type in ROBOT_STATE_TYPES):
+                for client in clients:
+                    selected.setdefault(client, []).append(i)
+                continue
+            for client in clients:
+                admit = self._admit(client, robot_id, robot, msg_type, now)
+                index = i if admit == _SEND else keyframe_index(robot_id) if admit == _KEYFRAME else None
+                if index is not None:
+                    selected.setdefault(client, []).append(index)
+        for client in held:
+            for robot_id in self._due_held(client, now):
+                index = keyframe_index(robot_id)
+                if index is not None:
+                    selected.setdefault(client, []).append(index)
+
+        frames: dict[tuple[int, ...], tuple[Frame, bool]] = {}
+        for client, indices in selected.items():
+            key = tuple(indices)
+            entry = frames.get(key)
+            if entry is None:
+                frame = Frame({
+                    "type": "batch",
+                    "payload": [items[i] for i in key],
+                    "eventSeq": self.events.seq,
+                    "timestamp": timestamp,
+                })
+                # Only robot-state-only batches may be dropped for a slow client
+                robot_only = all(items[i].get("type") in ROBOT_STATE_TYPES for i in key)
+                entry = frames[key] = (frame, robot_only)
+            client.send(entry[0], droppable=entry[1])
+        self.batches += 1
+        self.batch_frames += len(frames)
 
     async def send_to(self, websocket: WebSocket, message: dict[str, Any]) -> None:
-        try:
-            await websocket.send_json(message)
-        except Exception:
-            self.disconnect(websocket)
+        client = self.clients.get(websocket)
+        if client is not None:
+            client.send(Frame(message))
+
+    # ── Robot state ──────────────────────────────────────────────────
+
+    async def broadcast_robot(self, robot: RobotState, relay: bool = True) -> None:
+        """Broadcast a robot's new state as a delta (or keyframe when due).
+
+        Other replicas get the robot itself through `relay_robot`, never this
+        replica's deltas; `relay=False` is for state that came from one of them.
+        """
+        if relay and self.relay_robot is not None:
+            self.relay_robot(robot)
+        if self.forward_robot is not None:
+            self.forward_robot(robot)
+            return
+        if self._batching:
+            # Encoded at the next tick, folding every sample received until then
+            self._dirty[robot.id] = robot
+            return
+        if settings.ws_delta_updates:
+            message = self.robot_deltas.encode(robot)
+            if message is None:
+                return
+        else:
+            message = {
+                "type": "robot.updated",
+                "payload": robot.to_dict(),
+                "timestamp": datetime.now(timezone.utc).isoformat(),
+            }
+        await self.broadcast(message, relay=False)
+
+    async def broadcast_robots(self, robots: list[RobotState], relay: bool = True) -> None:
+        """Broadcast full state for several robots in one robots.updated frame."""
+        if relay and self.relay_robot is not None:
+            for robot in robots:
+                self.relay_robot(robot)
+        if self.forward_robot is not None:
+            for robot in robots:
+                self.forward_robot(robot)
+            return
+        payloads: list[dict[str, Any]] = []
+        seqs: dict[str, int] = {}
+        for robot in robots:
+            if settings.ws_delta_updates:
+                message = self.robot_deltas.encode(robot, force_keyframe=True)
+                seqs[robot.id] = message["seq"]
+                payloads.append(message["payload"])
+            else:
+                payloads.append(robot.to_dict())
+        timestamp = datetime.now(timezone.utc).isoformat()
+        event_seq = self.events.append({
+            "type": "robots.updated",
+            "payload": payloads,
+            "seqs": seqs,
+            "timestamp": timestamp,
+        })
+        # Each client only gets the robots its subscription covers; encode once per distinct set
+        frames: dict[tuple[int, ...], Frame] = {}
+        for client in self.subscriptions.match("robots.updated", None, None):
+            subscription = self.subscriptions.get(client)
+            selected = tuple(
+                i for i, robot in enumerate(robots)
+                if subscription.matches_robot(robot.id, robot) and self._in_view(client, robot)
+            )
+            if not selected:
+                continue
+            frame = frames.get(selected)
+            if frame is None:
+                frame = frames[selected] = Frame({
+                    "type": "robots.updated",
+                    "payload": [payloads[i] for i in selected],
+                    "seqs": {robots[i].id: seqs[robots[i].id] for i in selected if robots[i].id in seqs},
+                    "eventSeq": event_seq,
+                    "timestamp": timestamp,
+                })
+            client.send(frame)
+
+    async def subscribe(self, websocket: WebSocket, subscription: Subscription) -> None:
+        """Apply a client's filters and re-sync it to the robots it now sees."""
+        client = self.clients.get(websocket)
+        if client is None:
+            return
+        self.subscriptions.set(client, subscription)
+        client.min_interval = subscription.min_interval
+        client.held.clear()
+        timestamp = datetime.now(timezone.utc).isoformat()
+        await self.send_to(websocket, {"type": "subscribed", "payload": subscription.to_dict(), "timestamp": timestamp})
+        self._send_sync(client)
+
+    def _sync_robots_key(self) -> Any:
+        """Changes whenever the robots a state.sync would carry do.
+
+        With deltas, sync robots are the last *broadcast* states, which only
+        move when the encoder runs (once per tick when batching), not on
+        every telemetry sample; new robots not yet broadcast show up in the
+        count. Without deltas the live states are sent, so with batching the
+        frame is kept for a tick and otherwise follows every change.
+        """
+        if settings.ws_delta_updates:
+            return (self.robot_deltas.version, len(state_manager.robots))
+        if self._batching:
+            return (self.batches, len(state_manager.robots))
+        return state_manager.version
+
+    def full_sync(self) -> Frame:
+        """The unfiltered state.sync, sharing one encoded body until its robots or missions move on.
+
+        eventSeq and epoch are spliced in per frame, so broadcast events
+        never force the robots to be encoded again.
+        """
+        key = (self._sync_robots_key(), mission_service.version)
+        cached = self._sync_body
+        if cached is not None and cached[0] == key:
+            body = cached[1]
+            self.sync_hits += 1
+        else:
+            body = self._build_sync_body()
+            self._sync_body = (key, body)
+            self.sync_builds += 1
+        frame = self._sync_frame
+        if frame is None or frame[0] is not body or frame[1] != self.events.seq:
+            frame = self._sync_frame = (body, self.events.seq, SyncFrame(
+                {"type": "state.sync", "timestamp": datetime.now(timezone.utc).isoformat()},
+                {"eventSeq": self.events.seq, "epoch": self.events.epoch},
+                body,
+            ))
+        return frame[2]
+
+    def _build_sync_body(self) -> SyncBody:
+        """sync_state() for every robot, from each robot's cached JSON where it is still current."""
+        snapshots = self.robot_deltas.snapshots() if settings.ws_delta_updates else {}
+        robots: dict[str, bytes] = {}
+        for rid, robot in state_manager.robots.items():
+            snapshot = snapshots.get(rid)
+            if snapshot is None or self.robot_deltas.is_current(robot):
+                robots[rid] = robot.encoded()
+            else:
+                # Changed since its last broadcast; clients get the state the next delta applies to
+                robots[rid] = codec.dumps(snapshot)
+        rest: dict[str, Any] = {"missions": {mid: m.to_dict() for mid, m in mission_service.missions.items()}}
+        if settings.ws_delta_updates:
+            rest["seqs"] = self.robot_deltas.seqs()
+        return SyncBody(robots, rest)
+
+    def send_full_sync(self, client: ClientConnection) -> None:
+        client.send(self.full_sync())
+
+    def _send_sync(self, client: ClientConnection) -> None:
+        """state.sync limited to the robots a client's subscription and viewport cover."""
+        subscription = self.subscriptions.get(client)
+        if subscription == ALL and client.viewport is None:
+            client.send(self.full_sync())
+            return
+        state = self.sync_state(state_manager.get_full_state())
+        visible = {
+            rid for rid, robot in state_manager.robots.items()
+            if subscription.matches_robot(rid, robot) and self._in_view(client, robot)
+        }
+        state["robots"] = {rid: r for rid, r in state["robots"].items() if rid in visible}
+        client.send(Frame({
+            "type": "state.sync",
+            "payload": state,
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+        }))
+
+    async def resync(self, websocket: WebSocket, robot_ids: list[str]) -> None:
+        """Send keyframes to one client that detected a seq gap."""
+        for robot_id in robot_ids:
+            message = self.robot_deltas.keyframe(robot_id)
+            if message is not None:
+                await self.send_to(websocket, message)
+
+    def resume(self, client: ClientConnection, resume_from: int, epoch: str) -> bool:
+        """Replay the events a reconnecting client missed; False if a snapshot is needed."""
+        missed = self.events.since(resume_from, epoch)
+        if missed is None:
+            return False
+        subscription = self.subscriptions.get(client)
+        replay: list[dict[str, Any]] = []
+        for message in missed:
+            msg_type = message.get("type", "")
+            if msg_type == "robots.updated":
+                robots = [
+                    r for r in message["payload"]
+                    if subscription.matches_robot(r["id"], state_manager.robots.get(r["id"]))
+                ]
+                if robots:
+                    replay.append({
+                        **message,
+                        "payload": robots,
+                        "seqs": {r["id"]: message["seqs"][r["id"]] for r in robots if r["id"] in message["seqs"]},
+                    })
+                continue
+            robot_id = robot_id_of(message)
+            robot = state_manager.robots.get(robot_id) if robot_id else None
+            if subscription.matches(msg_type, robot_id, robot):
+                replay.append(message)
+        timestamp = datetime.now(timezone.utc).isoformat()
+        for start in range(0, len(replay), _REPLAY_CHUNK):
+            chunk = replay[start:start + _REPLAY_CHUNK]
+            client.send(Frame({
+                "type": "batch",
+                "payload": chunk,
+                "eventSeq": chunk[-1]["eventSeq"],
+                "timestamp": timestamp,
+            }))
+        client.send(Frame({
+            "type": "session.resumed",
+            "payload": {"from": resume_from, "to": self.events.seq, "replayed": len(replay)},
+            "eventSeq": self.events.seq,
+            "timestamp": timestamp,
+        }))
+        logger.info("Resumed WS client %s from event %d (%d replayed)", client.peer, resume_from, len(replay))
+        return True
+
+    def sync_state(self, state: dict[str, Any]) -> dict[str, Any]:
+        """Align a state.sync payload with the delta stream clients will receive next."""
+        # Where a reconnecting client can resume from
+        state["eventSeq"] = self.events.seq
+        state["epoch"] = self.events.epoch
+        if settings.ws_delta_updates:
+            state["robots"].update(
+                (rid, snap) for rid, snap in self.robot_deltas.snapshots().items() if rid in state["robots"]
+            )
+            state["seqs"] = self.robot_deltas.seqs()
+        return state
+
+    # ── Viewports ────────────────────────────────────────────────────
+
+    async def set_viewport(self, websocket: WebSocket, viewport: Viewport | None) -> None:
+        """Narrow a client to its map view (None restores the full fleet)."""
+        client = self.clients.get(websocket)
+        if client is None:
+            return
+        client.viewport = viewport.padded(settings.viewport_margin) if viewport is not None else None
+        self._refresh_view(client, {}, sync=True)
+
+    def _refresh_view(self, client: ClientConnection, frames: dict[tuple[int, ...], Frame], sync: bool = False) -> None:
+        """Switch a client between clusters and individual robots and send what it needs.
+
+        `frames` shares encoded robot.clusters frames between clients whose
+        views cover the same cells.
+        """
+        view = client.viewport
+        was_clustered = client.clustered
+        client.clustered = False
+        if view is not None and view.zoom <= settings.viewport_cluster_max_zoom:
+            key, cells = view_cells(view, state_manager.grid)
+            if sum(len(cell.members) for _, cell in cells) > settings.viewport_cluster_min_robots:
+                client.clustered = True
+                frame = frames.get(key)
+                if frame is None:
+                    frame = frames[key] = Frame({
+                        "type": "robot.clusters",
+                        "payload": cluster_payload(key[0], cells, state_manager.grid, state_manager.robots),
+                        "timestamp": datetime.now(timezone.utc).isoformat(),
+                    })
+                client.send(frame, "robot.clusters")
+                client.held.clear()
+        if not client.clustered and (sync or was_clustered):
+            self._send_sync(client)
+
+    async def _stream_viewports(self) -> None:
+        while True:
+            await asyncio.sleep(settings.viewport_cluster_interval)
+            frames: dict[tuple[int, ...], Frame] = {}
+            for client in list(self.clients.values()):
+                if client.viewport is not None:
+                    self._refresh_view(client, frames)
+
+    # ── Liveness ─────────────────────────────────────────────────────
+
+    def touch(self, websocket: WebSocket) -> None:
+        """Record inbound traffic; any message proves the client is alive."""
+        client = self.clients.get(websocket)
+        if client is not None:
+            client.last_received = time.monotonic()
+
+    def pong(self, websocket: WebSocket) -> None:
+        client = self.clients.get(websocket)
+        if client is not None and client.ping_sent_at:
+            client.rtt = time.monotonic() - client.ping_sent_at
+            client.ping_sent_at = 0.0
+
+    async def _heartbeat(self) -> None:
+        """Ping every client; evict those silent for longer than ws_ping_timeout."""
+        while True:
+            await asyncio.sleep(settings.ws_ping_interval)
+            now = time.monotonic()
+            ping = Frame({
+                "type": "ping",
+                "payload": {},
+                "timestamp": datetime.now(timezone.utc).isoformat(),
+            })
+            for client in list(self.clients.values()):
+                if now - client.last_received > settings.ws_ping_timeout:
+                    client.close(f"no pong for {now - client.last_received:.0f}s")
+                    continue
+                if not client.ping_sent_at:
+                    client.ping_sent_at = now
+                client.send(ping, droppable=True)
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "clients": len(self.clients),
+            "msgpackClients": sum(1 for c in self.clients.values() if c.protocol.name == "msgpack"),
+            "evicted": self.evicted,
+            "batches": self.batches,
+            "batchFrames": self.batch_frames,
+            "viewports": sum(1 for c in self.clients.values() if c.viewport is not None),
+            "clustered": sum(1 for c in self.clients.values() if c.clustered),
+            "grid": state_manager.grid.stats(),
+            "deltas": self.robot_deltas.stats(),
+            "replay": self.events.stats(),
+            "stateSync": {"builds": self.sync_builds, "hits": self.sync_hits},
+            "perClient": [c.stats() for c in self.clients.values()],
+        }
 
 
 ws_manager = ConnectionManager()
@@ -0,0 +1,272 @@
+"""WebSocket wire protocols.
+
+Clients that offer the `argus.msgpack.v1` subprotocol get binary
+MessagePack frames; everyone else gets JSON text frames. The MessagePack
+form shortens known field names (see `KEYS`) and replaces robot id strings
+with small integer handles:
+
+    robot.updated / robots.updated / state.sync robots:  {"h": 3, "id": "drone-001", ...}
+    robot.delta:                                         {"h": 3, ...changed fields}
+    seqs maps:                                           {3: 41, ...}
+
+A handle is assigned the first time a robot is encoded and never changes
+for the life of the process, so a client learns it from the robot's first
+keyframe. A client that sees a delta for an unknown handle asks for
+`{"type": "robot.resync", "payload": {"handles": [3]}}`. Client-to-server
+messages may be sent as either JSON text or MessagePack binary with the
+regular (long) field names.
+
+Encoding is done once per protocol per message via `Frame`, so the cost
+of a broadcast follows the number of protocols in use, not the number of
+clients. The bulk of a state.sync (robots, missions, seqs) is a `SyncBody`
+encoded once per state and spliced into each `SyncFrame`, so a new eventSeq
+costs a copy rather than a re-encode.
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+from app import codec
+
+try:
+    import msgspec
+except ImportError:  # optional: pip install argus-backend[fast]
+    msgspec = None
+
+MSGPACK_SUBPROTOCOL = "argus.msgpack.v1"
+
+# Long field name -> MessagePack field name
+KEYS = {
+    "type": "t",
+    "payload": "p",
+    "timestamp": "ts",
+    "seq": "s",
+    "seqs": "sq",
+    "name": "n",
+    "robotType": "rt",
+    "status": "st",
+    "position": "pos",
+    "latitude": "la",
+    "longitude": "lo",
+    "altitude": "al",
+    "heading": "hd",
+    "speed": "sp",
+    "health": "hl",
+    "batteryPercent": "bp",
+    "signalStrength": "sg",
+    "lastSeen": "ls",
+    "metadata": "md",
+    "autonomyTier": "at",
+    "lastCommandSource": "lcs",
+    "lastCommandAt": "lca",
+    "robotId": "rid",
+    "missions": "ms",
+    "robots": "r",
+}
+
+
+class RobotHandles:
+    def __init__(self) -> None:
+        self._handles: dict[str, int] = {}
+        self._ids: list[str] = []
+
+    def handle(self, robot_id: str) -> int:
+        handle = self._handles.get(robot_id)
+        if handle is None:
+            self._ids.append(robot_id)
+            handle = self._handles[robot_id] = len(self._ids)
+        return handle
+
+    def robot_id(self, handle: int) -> str | None:
+        return self._ids[handle - 1] if 0 < handle <= len(self._ids) else None
+
+
+robot_handles = RobotHandles()
+
+
+def _compact(value: Any) -> Any:
+    if isinstance(value, dict):
+        return {KEYS.get(k, k): _compact(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_compact(v) for v in value]
+    return value
+
+
+def _compact_robot(payload: dict[str, Any], keep_id: bool) -> dict[str, Any]:
+    robot_id = payload["id"]
+    out: dict[str, Any] = {"h": robot_handles.handle(robot_id)}
+    if keep_id:
+        out["id"] = robot_id
+    for key, value in payload.items():
+        if key != "id":
+            out[KEYS.get(key, key)] = _compact(value)
+    return out
+
+
+def _compact_seqs(seqs: dict[str, int]) -> dict[int, int]:
+    return {robot_handles.handle(rid): seq for rid, seq in seqs.items()}
+
+
+def compact_message(message: dict[str, Any]) -> dict[str, Any]:
+    """The MessagePack form of a WS message (short keys, robot handles)."""
+    msg_type = message.get("type")
+    payload = message.get("payload")
+    if msg_type == "batch":
+        payload = [compact_message(item) for item in payload]
+    elif msg_type in ("robot.updated", "robot.delta") and isinstance(payload, dict) and "id" in payload:
+        payload = _compact_robot(payload, keep_id=msg_type == "robot.updated")
+    elif msg_type == "robots.updated":
+        payload = [_compact_robot(robot, keep_id=True) for robot in payload]
+    elif msg_type == "state.sync":
+        payload = {
+            **{KEYS.get(k, k): _compact(v) for k, v in payload.items() if k not in ("robots", "seqs")},
+            "r": [_compact_robot(robot, keep_id=True) for robot in payload["robots"].values()],
+            "sq": _compact_seqs(payload.get("seqs", {})),
+        }
+    else:
+        payload = _compact(payload)
+    out = {KEYS.get(k, k): v for k, v in message.items() if k not in ("payload", "seqs")}
+    out["p"] = payload
+    if "seqs" in message:
+        out["sq"] = _compact_seqs(message["seqs"])
+    return out
+
+
+def _map_header(size: int) -> bytes:
+    if size < 16:
+        return bytes((0x80 | size,))
+    if size < 0x10000:
+        return b"\xde" + size.to_bytes(2, "big")
+    return b"\xdf" + size.to_bytes(4, "big")
+
+
+def _map_members(encoded: bytes) -> bytes:
+    """An encoded MessagePack map without its header (fixmap, map16 or map32)."""
+    return encoded[{0xDE: 3, 0xDF: 5}.get(encoded[0], 1):]
+
+
+class JsonProtocol:
+    name = "json"
+    subprotocol: str | None = None
+
+    def encode(self, message: dict[str, Any]) -> str:
+        return codec.dumps_str(message)
+
+    def encode_sync_body(self, robots: dict[str, bytes], rest: dict[str, Any]) -> tuple[int, str]:
+        # The robots are JSON already, so they are joined rather than encoded
+        members = b'"robots":{' + b",".join(codec.dumps(rid) + b":" + robot for rid, robot in robots.items()) + b"}"
+        if rest:
+            members += b"," + codec.dumps(rest)[1:-1]
+        return 1 + len(rest), members.decode()
+
+    def encode_spliced(self, message: dict[str, Any], head: dict[str, Any], body: tuple[int, Any]) -> str:
+        members = [codec.dumps_str(head)[1:-1]] if head else []
+        members.append(body[1])
+        return codec.dumps_str(message)[:-1] + ',"payload":{' + ",".join(members) + "}}"
+
+    def decode(self, data: str | bytes) -> Any:
+        return codec.loads(data)
+
+
+class MsgpackProtocol:
+    name = "msgpack"
+    subprotocol: str | None = MSGPACK_SUBPROTOCOL
+
+    def __init__(self) -> None:
+        self._encoder = msgspec.msgpack.Encoder()
+        self._decoder = msgspec.msgpack.Decoder()
+
+    def encode(self, message: dict[str, Any]) -> bytes:
+        return self._encoder.encode(compact_message(message))
+
+    def encode_sync_body(self, robots: dict[str, bytes], rest: dict[str, Any]) -> tuple[int, bytes]:
+        payload = {**rest, "robots": {rid: codec.loads(robot) for rid, robot in robots.items()}}
+        compact = compact_message({"type": "state.sync", "payload": payload})["p"]
+        return len(compact), _map_members(self._encoder.encode(compact))
+
+    def encode_spliced(self, message: dict[str, Any], head: dict[str, Any], body: tuple[int, Any]) -> bytes:
+        outer = {KEYS.get(k, k): v for k, v in message.items()}
+        head = _compact(head)
+        count, members = body
+        return (
+            _map_header(len(outer) + 1)
+            + _map_members(self._encoder.encode(outer))
+            + self._encoder.encode("p")
+            + _map_header(len(head) + count)
+            + _map_members(self._encoder.encode(head))
+            + members
+        )
+
+    def decode(self, data: str | bytes) -> Any:
+        if isinstance(data, str):
+            return codec.loads(data)
+        return self._decoder.decode(data)
+
+
+JSON = JsonProtocol()
+MSGPACK = MsgpackProtocol() if msgspec is not None else None
+
+
+def negotiate(offered: list[str], allow_msgpack: bool = True) -> JsonProtocol | MsgpackProtocol:
+    """Pick the wire protocol for a client from its Sec-WebSocket-Protocol offers."""
+    if allow_msgpack and MSGPACK is not None and MSGPACK_SUBPROTOCOL in offered:
+        return MSGPACK
+    return JSON
+
+
+class Frame:
+    """One outbound message, encoded at most once per protocol."""
+
+    __slots__ = ("message", "_encoded")
+
+    def __init__(self, message: dict[str, Any]) -> None:
+        self.message = message
+        self._encoded: dict[str, str | bytes] = {}
+
+    def encode(self, protocol: JsonProtocol | MsgpackProtocol) -> str | bytes:
+        encoded = self._encoded.get(protocol.name)
+        if encoded is None:
+            encoded = self._encoded[protocol.name] = protocol.encode(self.message)
+        return encoded
+
+
+class SyncBody:
+    """The robots, missions and seqs of a state.sync, encoded once per protocol.
+
+    Each robot is given as JSON bytes (see RobotState.encoded), which the
+    JSON form splices in as is.
+    """
+
+    __slots__ = ("robots", "rest", "_encoded")
+
+    def __init__(self, robots: dict[str, bytes], rest: dict[str, Any]) -> None:
+        self.robots = robots
+        self.rest = rest
+        self._encoded: dict[str, tuple[int, str | bytes]] = {}
+
+    def encode(self, protocol: JsonProtocol | MsgpackProtocol) -> tuple[int, str | bytes]:
+        """(member count, the payload's members without the enclosing object)."""
+        encoded = self._encoded.get(protocol.name)
+        if encoded is None:
+            encoded = self._encoded[protocol.name] = protocol.encode_sync_body(self.robots, self.rest)
+        return encoded
+
+
+class SyncFrame(Frame):
+    """A state.sync: per-frame payload fields (`head`) merged into a shared SyncBody."""
+
+    __slots__ = ("head", "body")
+
+    def __init__(self, message: dict[str, Any], head: dict[str, Any], body: SyncBody) -> None:
+        super().__init__(message)
+        self.head = head
+        self.body = body
+
+    def encode(self, protocol: JsonProtocol | MsgpackProtocol) -> str | bytes:
+        encoded = self._encoded.get(protocol.name)
+        if encoded is None:
+            encoded = self._encoded[protocol.name] = protocol.encode_spliced(
+                self.message, self.head, self.body.encode(protocol)
+            )
+        return encoded
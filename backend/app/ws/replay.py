@@ -0,0 +1,63 @@
+"""Event log for resumable WebSocket sessions.
+
+Every broadcast event gets a global `eventSeq` and is kept in a bounded
+ring. A client that reconnects to `/ws?resumeFrom=<seq>&epoch=<epoch>`
+gets just the events it missed (filtered by its subscription) followed by
+`session.resumed`, instead of a full `state.sync`. It falls back to the
+snapshot when the gap has been pushed out of the ring or the epoch
+differs (the server restarted, so seqs started over).
+
+Clients learn the current `eventSeq` and `epoch` from `state.sync` and
+track the highest `eventSeq` seen on later messages (`batch` frames carry
+the highest seq in the tick).
+"""
+
+from __future__ import annotations
+
+import uuid
+from collections import deque
+from itertools import islice
+from typing import Any
+
+
+class EventLog:
+    def __init__(self, size: int = 4096) -> None:
+        self.epoch = uuid.uuid4().hex[:12]
+        self.seq = 0
+        self._events: deque[tuple[int, dict[str, Any]]] = deque(maxlen=size)
+        self.resumed = 0
+        self.replayed = 0
+        self.expired = 0
+
+    def append(self, message: dict[str, Any]) -> int:
+        """Stamp a message with the next eventSeq and keep it for replay."""
+        self.seq += 1
+        message["eventSeq"] = self.seq
+        self._events.append((self.seq, message))
+        return self.seq
+
+    def since(self, seq: int, epoch: str) -> list[dict[str, Any]] | None:
+        """Events after `seq`, or None if they can no longer all be replayed."""
+        if epoch != self.epoch or seq > self.seq:
+            self.expired += 1
+            return None
+        oldest = self._events[0][0] if self._events else self.seq + 1
+        if seq < oldest - 1:
+            self.expired += 1
+            return None
+        # Seqs in the ring are contiguous, so the first missed event sits at a known offset
+        start = len(self._events) - (self.seq - seq)
+        missed = [message for _, message in islice(self._events, start, None)]
+        self.resumed += 1
+        self.replayed += len(missed)
+        return missed
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "epoch": self.epoch,
+            "eventSeq": self.seq,
+            "buffered": len(self._events),
+            "resumed": self.resumed,
+            "replayed": self.replayed,
+            "expired": self.expired,
+        }
@@ -0,0 +1,93 @@
+"""The `/ws` socket loop, shared by the backend and `argus-ws-gateway`.
+
+Messages that only concern the client's own session (subscriptions,
+viewports, resyncs, pongs) are handled here against the local
+`ws_manager`; everything else goes to the `handle` callback, which the
+backend runs directly and the gateway forwards to the backend.
+"""
+
+from __future__ import annotations
+
+import logging
+from typing import Any, Awaitable, Callable
+
+from fastapi import WebSocket, WebSocketDisconnect
+
+from app.ws.manager import ws_manager
+from app.ws.protocol import robot_handles
+from app.ws.subscriptions import Subscription
+from app.ws.viewport import Viewport
+
+logger = logging.getLogger(__name__)
+
+MessageHandler = Callable[[WebSocket, dict[str, Any]], Awaitable[None]]
+
+
+async def handle_session_message(websocket: WebSocket, msg_type: str, payload: Any) -> bool:
+    """Apply a session-local message; False if it is not one."""
+    if msg_type == "subscribe":
+        try:
+            subscription = Subscription.from_payload(payload)
+        except ValueError as e:
+            logger.warning("Rejected WS subscription: %s", e)
+            return True
+        await ws_manager.subscribe(websocket, subscription)
+
+    elif msg_type == "viewport":
+        try:
+            viewport = Viewport.from_payload(payload)
+        except ValueError as e:
+            logger.warning("Rejected WS viewport: %s", e)
+            return True
+        await ws_manager.set_viewport(websocket, viewport)
+
+    elif msg_type == "robot.resync":
+        robot_ids = payload.get("robotIds", [])
+        handles = payload.get("handles", [])
+        if isinstance(robot_ids, list) and isinstance(handles, list):
+            # MessagePack clients may only know a robot by its handle
+            robot_ids = [str(rid) for rid in robot_ids] + [
+                rid for h in handles if isinstance(h, int) and (rid := robot_handles.robot_id(h))
+            ]
+            await ws_manager.resync(websocket, robot_ids)
+
+    elif msg_type == "pong":
+        ws_manager.pong(websocket)
+
+    else:
+        return False
+    return True
+
+
+async def serve(
+    websocket: WebSocket,
+    handle: MessageHandler,
+    on_close: Callable[[WebSocket], None] | None = None,
+) -> None:
+    """Run one client's socket until it disconnects or is evicted."""
+    client = await ws_manager.connect(websocket)
+    # A reconnecting client only needs the events it missed, if they're still buffered
+    resume_from = websocket.query_params.get("resumeFrom", "")
+    epoch = websocket.query_params.get("epoch", "")
+    if not (resume_from.isdigit() and ws_manager.resume(client, int(resume_from), epoch)):
+        # Send full state snapshot on connect (shared while nothing has changed)
+        ws_manager.send_full_sync(client)
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(message.get("code", 1000))
+            # Text or binary, whichever the client's protocol uses
+            raw = message.get("bytes")
+            data = client.protocol.decode(raw if raw is not None else message["text"])
+            ws_manager.touch(websocket)
+            logger.debug("WS message from client: %s", data.get("type"))
+            if not await handle_session_message(websocket, data.get("type", ""), data.get("payload", {})):
+                await handle(websocket, data)
+    except (WebSocketDisconnect, RuntimeError):
+        # RuntimeError: the socket was already closed by an eviction
+        pass
+    finally:
+        ws_manager.disconnect(websocket)
+        if on_close is not None:
+            on_close(websocket)
@@ -0,0 +1,194 @@
+"""Per-client WebSocket subscriptions.
+
+A client narrows what it receives with a `subscribe` message:
+
+    {"type": "subscribe", "payload": {
+        "robotIds": ["drone-001"], "robotTypes": ["drone"],
+        "statuses": ["active"], "messageTypes": ["robot.delta", "command.status"],
+        "maxRate": 1.0}}
+
+Omitted or null fields don't filter. `maxRate` caps robot state updates per
+robot per second; held-back updates are folded into one keyframe when the
+client's next slot comes up. Control messages (state.sync, ping, ...) are
+always delivered.
+
+`SubscriptionIndex` keeps inverted maps per filter dimension (message type,
+robot id, robot type, status -> clients that name it, plus the clients that
+don't filter on it), updated on subscribe and disconnect. `match`
+intersects the sets for one message, so fanout cost follows the number of
+interested clients rather than the number of connected ones.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Generic, Hashable, TypeVar
+
+if TYPE_CHECKING:
+    from app.services.state_manager import RobotState
+
+C = TypeVar("C", bound=Hashable)
+
+# Per-robot state frames, subject to maxRate
+ROBOT_STATE_TYPES = frozenset({"robot.updated", "robot.delta"})
+# Always delivered regardless of filters
+CONTROL_TYPES = frozenset({"state.sync", "ping", "subscribed", "session.resumed"})
+
+def robot_id_of(message: dict[str, Any]) -> str | None:
+    """The robot a message is about, if any."""
+    payload = message.get("payload")
+    if not isinstance(payload, dict):
+        return None
+    if message.get("type") in ROBOT_STATE_TYPES:
+        return payload.get("id")
+    return payload.get("robotId")
+
+
+def _string_set(value: Any, field: str) -> frozenset[str] | None:
+    if value is None:
+        return None
+    if not isinstance(value, list) or not all(isinstance(v, str) for v in value):
+        raise ValueError(f"{field} must be a list of strings")
+    return frozenset(value)
+
+
+@dataclass(frozen=True)
+class Subscription:
+    robot_ids: frozenset[str] | None = None
+    robot_types: frozenset[str] | None = None
+    statuses: frozenset[str] | None = None
+    message_types: frozenset[str] | None = None
+    max_rate: float | None = None  # robot state frames per robot per second
+
+    @classmethod
+    def from_payload(cls, payload: dict[str, Any]) -> Subscription:
+        max_rate = payload.get("maxRate")
+        if max_rate is not None:
+            if not isinstance(max_rate, (int, float)) or max_rate <= 0:
+                raise ValueError("maxRate must be a positive number")
+            max_rate = float(max_rate)
+        return cls(
+            robot_ids=_string_set(payload.get("robotIds"), "robotIds"),
+            robot_types=_string_set(payload.get("robotTypes"), "robotTypes"),
+            statuses=_string_set(payload.get("statuses"), "statuses"),
+            message_types=_string_set(payload.get("messageTypes"), "messageTypes"),
+            max_rate=max_rate,
+        )
+
+    @property
+    def min_interval(self) -> float:
+        return 1.0 / self.max_rate if self.max_rate else 0.0
+
+    def matches_robot(self, robot_id: str, robot: RobotState | None) -> bool:
+        if self.robot_ids is not None and robot_id not in self.robot_ids:
+            return False
+        if self.robot_types is not None and (robot is None or robot.robot_type not in self.robot_types):
+            return False
+        if self.statuses is not None and (robot is None or robot.status not in self.statuses):
+            return False
+        return True
+
+    def matches(self, msg_type: str, robot_id: str | None, robot: RobotState | None) -> bool:
+        if msg_type in CONTROL_TYPES:
+            return True
+        if self.message_types is not None and msg_type not in self.message_types:
+            return False
+        return robot_id is None or self.matches_robot(robot_id, robot)
+
+    def to_dict(self) -> dict[str, Any]:
+        def listed(values: frozenset[str] | None) -> list[str] | None:
+            return sorted(values) if values is not None else None
+
+        return {
+            "robotIds": listed(self.robot_ids),
+            "robotTypes": listed(self.robot_types),
+            "statuses": listed(self.statuses),
+            "messageTypes": listed(self.message_types),
+            "maxRate": self.max_rate,
+        }
+
+
+ALL = Subscription()
+
+
+class _Dimension(Generic[C]):
+    """Inverted map for one filter field: value -> clients naming it, plus the unfiltered."""
+
+    __slots__ = ("by_value", "unfiltered")
+
+    def __init__(self) -> None:
+        self.by_value: dict[str, set[C]] = {}
+        self.unfiltered: set[C] = set()
+
+    def add(self, client: C, values: frozenset[str] | None) -> None:
+        if values is None:
+            self.unfiltered.add(client)
+            return
+        for value in values:
+            self.by_value.setdefault(value, set()).add(client)
+
+    def discard(self, client: C, values: frozenset[str] | None) -> None:
+        if values is None:
+            self.unfiltered.discard(client)
+            return
+        for value in values:
+            clients = self.by_value.get(value)
+            if clients is not None:
+                clients.discard(client)
+                if not clients:
+                    del self.by_value[value]
+
+    def allowed(self, value: str | None) -> set[C]:
+        named = self.by_value.get(value) if value is not None else None
+        return self.unfiltered | named if named else self.unfiltered
+
+
+class SubscriptionIndex(Generic[C]):
+    def __init__(self) -> None:
+        self._subs: dict[C, Subscription] = {}
+        self._types: _Dimension[C] = _Dimension()
+        self._robots: _Dimension[C] = _Dimension()
+        self._robot_types: _Dimension[C] = _Dimension()
+        self._statuses: _Dimension[C] = _Dimension()
+
+    def __len__(self) -> int:
+        return len(self._subs)
+
+    def get(self, client: C) -> Subscription:
+        return self._subs.get(client, ALL)
+
+    def set(self, client: C, subscription: Subscription) -> None:
+        self.remove(client)
+        self._subs[client] = subscription
+        self._types.add(client, subscription.message_types)
+        self._robots.add(client, subscription.robot_ids)
+        self._robot_types.add(client, subscription.robot_types)
+        self._statuses.add(client, subscription.statuses)
+
+    def remove(self, client: C) -> None:
+        subscription = self._subs.pop(client, None)
+        if subscription is None:
+            return
+        self._types.discard(client, subscription.message_types)
+        self._robots.discard(client, subscription.robot_ids)
+        self._robot_types.discard(client, subscription.robot_types)
+        self._statuses.discard(client, subscription.statuses)
+
+    def match(self, msg_type: str, robot_id: str | None, robot: RobotState | None) -> list[C]:
+        if msg_type in CONTROL_TYPES:
+            return list(self._subs)
+        clients = self._types.allowed(msg_type)
+        if robot_id is not None:
+            total = len(self._subs)
+            for dimension, value in (
+                (self._robots, robot_id),
+                (self._robot_types, robot.robot_type if robot is not None else None),
+                (self._statuses, robot.status if robot is not None else None),
+            ):
+                # Skip the intersection when nobody filters on this field
+                if len(dimension.unfiltered) == total:
+                    continue
+                clients = clients & dimension.allowed(value)
+                if not clients:
+                    break
+        return list(clients)
@@ -0,0 +1,109 @@
+"""Viewport-aware robot streaming.
+
+A map client reports what it is looking at:
+
+    {"type": "viewport", "payload": {"bbox": [west, south, east, north], "zoom": 9.5}}
+
+From then on it only gets robot state frames for robots inside the bbox
+(padded by `viewport_margin`). When the view is at or below
+`viewport_cluster_max_zoom` and holds more than `viewport_cluster_min_robots`
+robots, individual frames stop and the client instead gets a
+`robot.clusters` frame every `viewport_cluster_interval` seconds:
+
+    {"type": "robot.clusters", "payload": {"zoom": 9, "cellSize": 0.17578125,
+        "total": 1240, "clusters": [{"cell": [x, y], "count": 31,
+        "latitude": ..., "longitude": ..., "worstBattery": 12.0,
+        "statuses": {"active": 30, "error": 1}}]}}
+
+Zooming back in (or the view thinning out) sends a `state.sync` limited to
+the viewport, after which robot frames resume. `{"bbox": null}` clears the
+viewport. Clusters cover the whole fleet; subscription filters only apply
+to individual robot frames.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from app.services.spatial import Cell, GridCell, GridClusters
+    from app.services.state_manager import RobotState
+
+
+@dataclass(frozen=True)
+class Viewport:
+    west: float
+    south: float
+    east: float
+    north: float
+    zoom: float
+
+    @classmethod
+    def from_payload(cls, payload: dict[str, Any]) -> Viewport | None:
+        bbox = payload.get("bbox")
+        if bbox is None:
+            return None
+        if (
+            not isinstance(bbox, list)
+            or len(bbox) != 4
+            or not all(isinstance(v, (int, float)) for v in bbox)
+        ):
+            raise ValueError("bbox must be [west, south, east, north]")
+        zoom = payload.get("zoom")
+        if not isinstance(zoom, (int, float)) or zoom < 0:
+            raise ValueError("zoom must be a non-negative number")
+        west, south, east, north = (float(v) for v in bbox)
+        if south > north:
+            raise ValueError("bbox south must not exceed north")
+        return cls(west, south, east, north, float(zoom))
+
+    def padded(self, margin: float) -> Viewport:
+        width = (self.east - self.west) % 360 or 360.0
+        pad_x = min(width * margin, (360.0 - width) / 2)
+        pad_y = (self.north - self.south) * margin
+        return Viewport(
+            self.west - pad_x,
+            max(-90.0, self.south - pad_y),
+            self.east + pad_x,
+            min(90.0, self.north + pad_y),
+            self.zoom,
+        )
+
+    def contains(self, latitude: float, longitude: float) -> bool:
+        if not self.south <= latitude <= self.north:
+            return False
+        # Measure eastward from the west edge so views across the antimeridian work
+        width = (self.east - self.west) % 360 or 360.0
+        return (longitude - self.west) % 360 <= width
+
+    def to_dict(self) -> dict[str, Any]:
+        return {"bbox": [self.west, self.south, self.east, self.north], "zoom": self.zoom}
+
+
+def robot_in_view(view: Viewport | None, robot: RobotState | None) -> bool:
+    return view is None or (robot is not None and view.contains(robot.latitude, robot.longitude))
+
+
+def view_cells(view: Viewport, grid: GridClusters) -> tuple[tuple[int, ...], list[tuple[Cell, GridCell]]]:
+    """Occupied grid cells under a view, plus a key shared by views covering the same cells."""
+    level = grid.level_for(view.zoom)
+    # Normalise longitudes so the cell bounds wrap the same way contains() does
+    west = (view.west + 180.0) % 360.0 - 180.0
+    east = west + ((view.east - view.west) % 360 or 360.0)
+    if east > 180.0:
+        east -= 360.0
+    bounds = grid.cell_range(level, west, view.south, east, view.north)
+    return (level, *bounds), list(grid.cells_in(level, bounds))
+
+
+def cluster_payload(
+    level: int, cells: list[tuple[Cell, GridCell]], grid: GridClusters, robots: dict[str, RobotState]
+) -> dict[str, Any]:
+    clusters = [cell.aggregate(key, robots) for key, cell in cells]
+    return {
+        "zoom": level,
+        "cellSize": grid.size(level),
+        "total": sum(c["count"] for c in clusters),
+        "clusters": clusters,
+    }
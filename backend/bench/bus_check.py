@@ -0,0 +1,61 @@
+"""Check that WS events cross replicas over the Postgres fanout bus.
+
+Creates a mission through replica A's REST API and waits for its
+`mission.updated` on a WebSocket connected to replica B. Both replicas
+must share one database and run with WS_BUS_ENABLED=true.
+
+Run from backend/:  python -m bench.bus_check http://localhost:8001 http://localhost:8002
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import time
+import uuid
+from typing import Any
+
+import httpx
+import websockets
+
+
+def _messages(frame: dict[str, Any]) -> list[dict[str, Any]]:
+    return frame["payload"] if frame.get("type") == "batch" else [frame]
+
+
+async def check(publisher: str, subscriber: str, timeout: float) -> None:
+    name = f"bus-check-{uuid.uuid4().hex[:8]}"
+    ws_url = subscriber.replace("http", "ws", 1).rstrip("/") + "/ws"
+    async with websockets.connect(ws_url) as ws:
+        # Wait for the initial state.sync so the mission can't race our subscription
+        while json.loads(await ws.recv()).get("type") != "state.sync":
+            pass
+        started = time.perf_counter()
+        async with httpx.AsyncClient() as http:
+            response = await http.post(f"{publisher.rstrip('/')}/api/missions", json={"name": name})
+            response.raise_for_status()
+        deadline = started + timeout
+        while (remaining := deadline - time.perf_counter()) > 0:
+            frame = json.loads(await asyncio.wait_for(ws.recv(), remaining))
+            for message in _messages(frame):
+                if message.get("type") == "mission.updated" and message["payload"].get("name") == name:
+                    print(f"ok: mission.updated reached {subscriber} in {(time.perf_counter() - started) * 1000:.1f} ms")
+                    return
+    raise SystemExit(f"FAIL: no mission.updated for {name} on {subscriber} within {timeout}s")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("publisher", help="base URL of the replica that creates the mission")
+    parser.add_argument("subscriber", help="base URL of the replica whose WebSocket should see it")
+    parser.add_argument("--timeout", type=float, default=5.0)
+    args = parser.parse_args()
+    try:
+        asyncio.run(check(args.publisher, args.subscriber, args.timeout))
+    except TimeoutError:
+        raise SystemExit(f"FAIL: no mission.updated on {args.subscriber} within {args.timeout}s") from None
+
+
+if __name__ == "__main__":
+    main()
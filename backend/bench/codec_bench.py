@@ -0,0 +1,94 @@
+"""Per-message decode/encode cost: stdlib json (before) vs app.codec (after).
+
+Run from backend/:  python -m bench.codec_bench [--clients N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import timeit
+from datetime import datetime, timezone
+
+from app import codec
+from app.services.state_manager import RobotState
+
+POSITION = json.dumps({
+    "latitude": 37.5485123,
+    "longitude": -121.9886456,
+    "altitude": 52.3,
+    "heading": 187.4,
+    "speed": 8.0,
+}).encode()
+
+HEALTH = json.dumps({
+    "battery_percent": 87.3,
+    "signal_strength": 91.2,
+    "wheel_speed": 4.1,
+}).encode()
+
+
+def _robot_message() -> dict:
+    robot = RobotState(
+        id="drone-001",
+        name="Scout Alpha",
+        status="active",
+        latitude=37.5485123,
+        longitude=-121.9886456,
+        altitude=52.3,
+        heading=187.4,
+        speed=8.0,
+        battery_percent=87.3,
+        signal_strength=91.2,
+        last_seen=1760000000.0,
+    )
+    return {
+        "type": "robot.updated",
+        "payload": robot.to_dict(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+    }
+
+
+def _bench(label: str, fn, number: int) -> float:
+    best = min(timeit.repeat(fn, number=number, repeat=5))
+    per_msg_us = best / number * 1e6
+    print(f"  {label:<44} {per_msg_us:8.2f} us/msg")
+    return per_msg_us
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--number", type=int, default=20_000)
+    parser.add_argument("--clients", type=int, default=10, help="WebSocket clients per broadcast")
+    args = parser.parse_args()
+    n = args.number
+
+    print(f"codec backend: orjson{' + msgspec' if codec.msgspec else ''}")
+
+    print("MQTT decode (position)")
+    pos_decoder = codec.typed_decoder(codec.PositionTelemetry)
+    before = _bench("json.loads", lambda: json.loads(POSITION), n)
+    after = _bench("codec.typed_decoder(PositionTelemetry)", lambda: pos_decoder(POSITION), n)
+    print(f"  speedup x{before / after:.1f}")
+
+    print("MQTT decode (health)")
+    health_decoder = codec.typed_decoder(codec.HealthTelemetry)
+    before = _bench("json.loads", lambda: json.loads(HEALTH), n)
+    after = _bench("codec.typed_decoder(HealthTelemetry)", lambda: health_decoder(HEALTH), n)
+    print(f"  speedup x{before / after:.1f}")
+
+    message = _robot_message()
+    print(f"WS broadcast encode ({args.clients} clients)")
+
+    def per_client_json() -> None:
+        # Starlette send_json: json.dumps(separators=(",", ":")) per connection
+        for _ in range(args.clients):
+            json.dumps(message, separators=(",", ":"), ensure_ascii=False)
+
+    before = _bench("json.dumps per client", per_client_json, n // 10)
+    after = _bench("codec.dumps_str once", lambda: codec.dumps_str(message), n // 10)
+    print(f"  speedup x{before / after:.1f}")
+
+
+if __name__ == "__main__":
+    main()
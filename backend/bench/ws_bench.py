@@ -0,0 +1,119 @@
+"""Bytes and server CPU per robot update for each WebSocket wire mode.
+
+Replays the same delta-encoded, tick-batched robot stream through JSON
+text, MessagePack (argus.msgpack.v1) and each of those with
+permessage-deflate (one compression context per connection, as the
+server keeps it).
+
+Run from backend/:  python -m bench.ws_bench [--robots N] [--ticks N]
+"""
+
+from __future__ import annotations
+
+import argparse
+import math
+import random
+import time
+import zlib
+from datetime import datetime, timezone
+from typing import Any, Callable
+
+from app.config import settings
+from app.services.state_manager import RobotState
+from app.ws.delta import RobotDeltaEncoder
+from app.ws.protocol import JSON, MSGPACK
+
+TICK = 0.05
+
+
+def _stream(robots: int, ticks: int, hz: float) -> tuple[list[dict[str, Any]], int]:
+    """Batch frames for `ticks` ticks of `robots` robots reporting at `hz`."""
+    rng = random.Random(7)
+    fleet = [
+        RobotState(
+            id=f"drone-{i:03d}",
+            name=f"Scout {i}",
+            status="active",
+            latitude=37.54 + rng.random() / 100,
+            longitude=-121.98 + rng.random() / 100,
+            altitude=50.0,
+            battery_percent=100.0,
+            signal_strength=95.0,
+        )
+        for i in range(robots)
+    ]
+    encoder = RobotDeltaEncoder(settings.ws_keyframe_interval)
+    every = max(1, round(1 / (hz * TICK)))
+    frames: list[dict[str, Any]] = []
+    updates = 0
+    for tick in range(ticks):
+        items = []
+        for i, robot in enumerate(fleet):
+            if (tick + i) % every:
+                continue
+            robot.heading = (robot.heading + rng.uniform(-10, 10)) % 360
+            robot.latitude += math.cos(math.radians(robot.heading)) * 2e-5
+            robot.longitude += math.sin(math.radians(robot.heading)) * 2e-5
+            robot.altitude = round(50 + rng.uniform(-1, 1), 1)
+            robot.speed = round(rng.uniform(6, 9), 1)
+            robot.battery_percent = round(robot.battery_percent - 0.01, 2)
+            robot.last_seen = 1760000000.0 + tick * TICK
+            message = encoder.encode(robot, timestamp=datetime.now(timezone.utc).isoformat())
+            if message is not None:
+                items.append(message)
+                updates += 1
+        if items:
+            frames.append({"type": "batch", "payload": items, "timestamp": datetime.now(timezone.utc).isoformat()})
+    return frames, updates
+
+
+def _deflater(window_bits: int, level: int, mem_level: int) -> Callable[[bytes], bytes]:
+    compressor = zlib.compressobj(level, zlib.DEFLATED, -window_bits, mem_level)
+
+    def deflate(data: bytes) -> bytes:
+        out = compressor.compress(data) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        return out[:-4]  # RFC 7692: drop the 00 00 ff ff tail
+
+    return deflate
+
+
+def _run(label: str, frames: list[dict[str, Any]], updates: int, encode, deflate=None) -> None:
+    total = 0
+    start = time.process_time()
+    for frame in frames:
+        data = encode(frame)
+        if isinstance(data, str):
+            data = data.encode()
+        if deflate is not None:
+            data = deflate(data)
+        total += len(data)
+    cpu = time.process_time() - start
+    print(f"  {label:<28} {total / updates:8.1f} B/update {cpu / updates * 1e6:8.2f} us/update")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--robots", type=int, default=50)
+    parser.add_argument("--ticks", type=int, default=2000, help=f"{TICK * 1000:.0f} ms batch ticks")
+    parser.add_argument("--hz", type=float, default=2.0, help="updates per robot per second")
+    parser.add_argument("--window-bits", type=int, default=settings.ws_deflate_window_bits)
+    parser.add_argument("--level", type=int, default=settings.ws_deflate_level)
+    parser.add_argument("--mem-level", type=int, default=settings.ws_deflate_mem_level)
+    args = parser.parse_args()
+
+    frames, updates = _stream(args.robots, args.ticks, args.hz)
+    print(f"{updates} robot updates in {len(frames)} batch frames")
+    tuned = (args.window_bits, args.level, args.mem_level)
+
+    _run("json", frames, updates, JSON.encode)
+    _run("json + deflate (default)", frames, updates, JSON.encode, _deflater(15, 6, 8))
+    _run("json + deflate (tuned)", frames, updates, JSON.encode, _deflater(*tuned))
+    if MSGPACK is None:
+        print("  msgpack: msgspec not installed")
+        return
+    _run("msgpack", frames, updates, MSGPACK.encode)
+    _run("msgpack + deflate (tuned)", frames, updates, MSGPACK.encode, _deflater(*tuned))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+from app.services.state_manager import RobotState
+from app.ws.delta import RobotDeltaEncoder, diff
+
+
+def test_diff_nested_fields_by_sub_field():
+    old = {"id": "a", "status": "idle", "position": {"latitude": 1.0, "longitude": 2.0}}
+    new = {"id": "a", "status": "active", "position": {"latitude": 1.0, "longitude": 3.0}}
+    assert diff(old, new) == {"status": "active", "position": {"longitude": 3.0}}
+    assert diff(new, new) == {}
+
+
+def test_keyframe_then_deltas_with_increasing_seq():
+    encoder = RobotDeltaEncoder(keyframe_interval=60.0)
+    robot = RobotState(id="drone-001", status="active")
+
+    first = encoder.encode(robot, timestamp="t")
+    assert first["type"] == "robot.updated"
+    assert first["seq"] == 1
+    assert first["payload"] == robot.to_dict()
+
+    assert encoder.encode(robot) is None
+    assert encoder.skipped == 1
+
+    robot.battery_percent = 80.0
+    second = encoder.encode(robot)
+    assert second["type"] == "robot.delta"
+    assert second["seq"] == 2
+    assert second["payload"] == {"id": "drone-001", "health": {"batteryPercent": 80.0}}
+
+    forced = encoder.encode(robot, force_keyframe=True)
+    assert forced["type"] == "robot.updated"
+    assert forced["seq"] == 3
+    assert encoder.stats() == {"robots": 1, "deltas": 1, "keyframes": 2, "skipped": 1}
+
+
+def test_keyframe_interval_zero_sends_full_state_every_time():
+    encoder = RobotDeltaEncoder(keyframe_interval=0.0)
+    robot = RobotState(id="drone-001")
+    encoder.encode(robot)
+    robot.speed = 4.0
+    assert encoder.encode(robot)["type"] == "robot.updated"
+
+
+def test_keyframe_for_one_client_carries_the_last_broadcast_state():
+    encoder = RobotDeltaEncoder()
+    assert encoder.keyframe("drone-001") is None
+    robot = RobotState(id="drone-001", speed=1.0)
+    encoder.encode(robot)
+    robot.speed = 2.0  # not broadcast yet
+    resync = encoder.keyframe("drone-001", timestamp="t")
+    assert resync == {"type": "robot.updated", "seq": 1, "payload": encoder.snapshots()["drone-001"], "timestamp": "t"}
+    assert resync["payload"]["speed"] == 1.0
+
+
+def test_is_current_follows_the_robot_revision():
+    encoder = RobotDeltaEncoder()
+    robot = RobotState(id="drone-001")
+    assert not encoder.is_current(robot)
+    encoder.encode(robot)
+    assert encoder.is_current(robot)
+    robot.heading = 90.0
+    assert not encoder.is_current(robot)
@@ -0,0 +1,54 @@
+import asyncio
+from typing import Any
+
+from app import codec
+from app.services.fanout_bus import FanoutBus, pack
+
+
+def _events(sizes: list[int]) -> list[tuple[str, str]]:
+    return [(f"o:{i}", codec.dumps_str({"type": "x", "payload": "a" * size})) for i, size in enumerate(sizes)]
+
+
+def _receive(payloads: list[str], origin: str = "other") -> list[tuple[str, Any]]:
+    """Feed NOTIFY payloads to a fresh bus and return what it would apply."""
+
+    async def run() -> list[tuple[str, Any]]:
+        bus = FanoutBus()
+        bus.origin = origin
+        applied: list[tuple[str, Any]] = []
+
+        async def apply(message: dict[str, Any]) -> None:
+            applied.append(message)
+
+        bus._apply = apply
+        for payload in payloads:
+            bus._on_notify(None, 0, bus.channel, payload)
+        await asyncio.sleep(0)
+        return applied
+
+    return asyncio.run(run())
+
+
+def test_pack_respects_the_limit_and_keeps_order():
+    events = _events([100, 900, 50, 400, 700, 10])
+    payloads = pack("o", events, limit=1000)
+    assert len(payloads) > 1
+    assert all(len(p.encode()) <= 1000 for p in payloads)
+    unpacked = [item for p in payloads for item in codec.loads(p)["e"]]
+    assert [event_id for event_id, _ in unpacked] == [event_id for event_id, _ in events]
+    assert [codec.dumps_str(m) for _, m in unpacked] == [encoded for _, encoded in events]
+
+
+def test_oversized_event_is_fragmented_and_reassembled():
+    events = _events([50, 5000, 50])
+    payloads = pack("o", events, limit=1000)
+    assert all(len(p.encode()) <= 1000 for p in payloads)
+    assert sum("f" in codec.loads(p) for p in payloads) > 1
+    applied = _receive(payloads)
+    assert [codec.dumps_str(m) for m in applied] == [encoded for _, encoded in events]
+
+
+def test_receiver_skips_duplicates_and_its_own_origin():
+    payloads = pack("o", _events([10, 10]))
+    assert len(_receive(payloads + payloads)) == 2
+    assert _receive(payloads, origin="o") == []
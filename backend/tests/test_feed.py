@@ -0,0 +1,22 @@
+from app.services.state_manager import RobotState
+from app.ws.feed import robot_patch
+
+
+def test_first_patch_is_the_full_state():
+    current = RobotState(id="drone-001").to_dict()
+    assert robot_patch(current, None) is current
+
+
+def test_patch_carries_changed_top_level_fields_and_the_id():
+    robot = RobotState(id="drone-001", status="active")
+    previous = robot.to_dict()
+    robot.latitude = 1.5
+    robot.status = "idle"
+    patch = robot_patch(robot.to_dict(), previous)
+    # Nested objects are sent whole, not diffed per sub-field
+    assert patch == {"id": "drone-001", "status": "idle", "position": robot.to_dict()["position"]}
+
+
+def test_unchanged_robot_gives_an_empty_patch():
+    current = RobotState(id="drone-001").to_dict()
+    assert robot_patch(current, dict(current)) == {}
@@ -0,0 +1,94 @@
+import asyncio
+
+from app.mqtt.ingest import IngestPipeline, robot_id_from_topic
+
+
+def test_robot_id_from_topic():
+    assert robot_id_from_topic("argus/drone-001/telemetry/position") == "drone-001"
+    assert robot_id_from_topic("argus") == ""
+
+
+def test_messages_for_one_robot_keep_their_order():
+    async def run() -> list[tuple[str, int]]:
+        seen: list[tuple[str, int]] = []
+
+        async def dispatch(topic: str, payload: int) -> None:
+            await asyncio.sleep(0)
+            seen.append((topic, payload))
+
+        pipeline = IngestPipeline(dispatch, workers=4, queue_size=100)
+        pipeline.start()
+        for i in range(20):
+            for robot in ("a", "b", "c"):
+                pipeline.submit(f"argus/{robot}/status", i)
+        while pipeline.stats()["queueDepth"]:
+            await asyncio.sleep(0.001)
+        await pipeline.stop()
+        return seen
+
+    seen = asyncio.run(run())
+    assert len(seen) == 60
+    for robot in ("a", "b", "c"):
+        assert [p for t, p in seen if t == f"argus/{robot}/status"] == list(range(20))
+
+
+def test_full_shard_holds_the_reader_back_instead_of_dropping():
+    async def run() -> tuple[list[bool], list[int], int]:
+        release = asyncio.Event()
+        seen: list[int] = []
+
+        async def dispatch(topic: str, payload: int) -> None:
+            await release.wait()
+            seen.append(payload)
+
+        pipeline = IngestPipeline(dispatch, workers=1, queue_size=3)
+        pipeline.start()
+        # One message is taken by the (blocked) worker, three stay queued
+        accepted = [pipeline.submit("argus/a/command/ack", i) for i in range(4)]
+        waiter = asyncio.create_task(pipeline.wait_for_room("argus/a/command/ack"))
+        await asyncio.sleep(0.02)
+        assert not waiter.done()
+        release.set()
+        await asyncio.wait_for(waiter, 1.0)
+        while pipeline.stats()["queueDepth"]:
+            await asyncio.sleep(0.001)
+        await pipeline.stop()
+        return accepted, seen, pipeline.backpressure_waits
+
+    accepted, seen, waits = asyncio.run(run())
+    assert accepted == [True, True, False, False]
+    assert seen == [0, 1, 2, 3]
+    assert waits == 1
+
+
+def test_conflated_samples_keep_only_the_newest():
+    async def run() -> tuple[list[tuple[str, int]], dict]:
+        release = asyncio.Event()
+        seen: list[tuple[str, int]] = []
+
+        async def dispatch(topic: str, payload: int) -> None:
+            await release.wait()
+            seen.append((topic, payload))
+
+        pipeline = IngestPipeline(dispatch, workers=1, queue_size=2)
+        pipeline.start()
+        pipeline.submit("argus/a/status", -1)
+        await asyncio.sleep(0)  # the worker takes it and blocks
+        for i in range(10):
+            assert pipeline.submit("argus/a/telemetry/position", i, conflate=True)
+            assert pipeline.submit("argus/a/telemetry/health", 100 + i, conflate=True)
+        stats = pipeline.stats()
+        release.set()
+        while pipeline.stats()["queueDepth"]:
+            await asyncio.sleep(0.001)
+        await pipeline.stop()
+        return seen, stats
+
+    seen, stats = asyncio.run(run())
+    assert seen == [
+        ("argus/a/status", -1),
+        ("argus/a/telemetry/position", 9),
+        ("argus/a/telemetry/health", 109),
+    ]
+    assert stats["queueDepth"] == 2
+    assert stats["conflated"] == 18
@@ -0,0 +1,66 @@
+import asyncio
+from pathlib import Path
+
+import pytest
+
+from app.mqtt.replay import Recorder, Replayer, clone_topic, read_records
+
+
+def _capture(path: Path, records: list[tuple[float, str, bytes]]) -> None:
+    recorder = Recorder(path)
+    with recorder._open() as f:
+        for ts, topic, payload in records:
+            recorder.write(f, ts, topic, payload)
+
+
+RECORDS = [
+    (1.0, "argus/drone-001/telemetry/position", b'{"latitude": 1.0}'),
+    (1.5, "argus/drone-001/status", b'{"status": "active"}'),
+    (2.0, "argus/ugv-001/telemetry/health", b""),
+]
+
+
+def test_read_records_round_trip(tmp_path: Path):
+    path = tmp_path / "fleet.argusrec"
+    _capture(path, RECORDS)
+    assert list(read_records(path)) == RECORDS
+
+
+def test_read_records_stops_at_a_torn_record(tmp_path: Path):
+    path = tmp_path / "fleet.argusrec"
+    _capture(path, RECORDS)
+    path.write_bytes(path.read_bytes()[:-3])
+    assert list(read_records(path)) == RECORDS[:2]
+
+
+def test_read_records_rejects_other_files(tmp_path: Path):
+    path = tmp_path / "other.bin"
+    path.write_bytes(b"not a capture")
+    with pytest.raises(ValueError):
+        list(read_records(path))
+
+
+def test_clone_topic():
+    topic = "argus/drone-001/telemetry/position"
+    assert clone_topic(topic, 0) == topic
+    assert clone_topic(topic, 3) == "argus/drone-001-x3/telemetry/position"
+    assert clone_topic("other/drone-001/status", 1) == "other/drone-001/status"
+    assert clone_topic("argus/drone-001", 1) == "argus/drone-001"
+
+
+def test_replayer_multiplies_robots(tmp_path: Path):
+    path = tmp_path / "fleet.argusrec"
+    _capture(path, RECORDS[:1])
+    sent: list[str] = []
+
+    async def sink(topic: str, payload: bytes) -> None:
+        sent.append(topic)
+
+    replayer = Replayer(path, speed=0, multiply=3)
+    asyncio.run(replayer.run(sink))
+    assert sent == [
+        "argus/drone-001/telemetry/position",
+        "argus/drone-001-x1/telemetry/position",
+        "argus/drone-001-x2/telemetry/position",
+    ]
+    assert replayer.count == 3
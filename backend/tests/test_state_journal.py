@@ -0,0 +1,33 @@
+from pathlib import Path
+
+from app.services.state_journal import _mapped
+
+
+def test_mapped_reads_every_line(tmp_path: Path):
+    path = tmp_path / "journal-1.jsonl"
+    path.write_bytes(b'{"seq": 1}\n{"seq": 2}\n')
+    assert _mapped(path) == [{"seq": 1}, {"seq": 2}]
+
+
+def test_mapped_accepts_a_last_line_without_newline(tmp_path: Path):
+    path = tmp_path / "journal-1.jsonl"
+    path.write_bytes(b'{"seq": 1}\n{"seq": 2}')
+    assert _mapped(path) == [{"seq": 1}, {"seq": 2}]
+
+
+def test_mapped_stops_at_a_torn_line(tmp_path: Path):
+    path = tmp_path / "journal-1.jsonl"
+    path.write_bytes(b'{"seq": 1}\n{"seq": 2}\n{"seq": 3, "robo')
+    assert _mapped(path) == [{"seq": 1}, {"seq": 2}]
+
+
+def test_mapped_keeps_nothing_after_a_torn_line(tmp_path: Path):
+    path = tmp_path / "journal-1.jsonl"
+    path.write_bytes(b'{"seq": 1}\n{"seq": 2, "ro\n{"seq": 3}\n')
+    assert _mapped(path) == [{"seq": 1}]
+
+
+def test_mapped_empty_file(tmp_path: Path):
+    path = tmp_path / "journal-1.jsonl"
+    path.write_bytes(b"")
+    assert _mapped(path) == []
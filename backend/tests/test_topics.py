@@ -0,0 +1,50 @@
+import pytest
+
+from app.mqtt.topics import TopicTrie, filter_covers, validate_filter
+
+
+def test_validate_filter_rejects_misplaced_wildcards():
+    assert validate_filter("argus/+/telemetry/#") == ["argus", "+", "telemetry", "#"]
+    for bad in ("argus/#/status", "argus/drone+/status", "argus/status#"):
+        with pytest.raises(ValueError):
+            validate_filter(bad)
+
+
+def test_match_exact_plus_and_hash():
+    trie: TopicTrie[str] = TopicTrie()
+    trie.add("argus/+/status", "status")
+    trie.add("argus/+/telemetry/#", "telemetry")
+    trie.add("argus/drone-001/telemetry/position", "exact")
+    trie.add("#", "all")
+
+    assert sorted(trie.match("argus/drone-001/telemetry/position")) == ["all", "exact", "telemetry"]
+    assert sorted(trie.match("argus/drone-002/telemetry/health")) == ["all", "telemetry"]
+    assert sorted(trie.match("argus/drone-002/status")) == ["all", "status"]
+    assert trie.match("argus/drone-002/status/extra") == ["all"]
+    # '#' also matches the parent level itself
+    assert sorted(trie.match("argus/drone-002/telemetry")) == ["all", "telemetry"]
+
+
+def test_wildcards_do_not_match_system_topics_at_the_first_level():
+    trie: TopicTrie[str] = TopicTrie()
+    trie.add("#", "all")
+    trie.add("+/broker/uptime", "plus")
+    trie.add("$SYS/broker/uptime", "exact")
+    assert trie.match("$SYS/broker/uptime") == ["exact"]
+
+
+def test_match_cache_is_invalidated_by_add():
+    trie: TopicTrie[str] = TopicTrie()
+    trie.add("argus/+/status", "a")
+    assert trie.match("argus/x/status") == ["a"]
+    trie.add("argus/x/status", "b")
+    assert sorted(trie.match("argus/x/status")) == ["a", "b"]
+
+
+def test_subscriptions_drop_covered_filters():
+    trie: TopicTrie[str] = TopicTrie()
+    for f in ("argus/+/status", "argus/drone-001/status", "argus/+/telemetry/#", "argus/+/telemetry/position"):
+        trie.add(f, f)
+    assert trie.subscriptions() == ["argus/+/status", "argus/+/telemetry/#"]
+    assert filter_covers("argus/#", "argus/+/status")
+    assert not filter_covers("argus/+/status", "argus/#")
@@ -15,7 +15,7 @@ import {
   useAIStore,
   useAutonomyStore,
 } from "./lib";
-import type { RobotState, RobotStatus, RobotType, AutonomyTier, Suggestion, MissionIntent, Waypoint } from "./lib";
+import type { RobotState, RobotStatus, RobotType, AutonomyTier, Suggestion, MissionIntent, Waypoint, RobotCluster, RobotClustersPayload } from "./lib";
 
 /* ════════════════════════════════════════════════════════════════════════════
    CONSTANTS
@@ -896,6 +896,8 @@ function SettingsPanel() {
   const toggleSettings = useUIStore((s) => s.toggleSettingsPanel);
   const trailsEnabled = useUIStore((s) => s.trailsEnabled);
   const toggleTrails = useUIStore((s) => s.toggleTrails);
+  const viewportStreaming = useUIStore((s) => s.viewportStreaming);
+  const toggleViewportStreaming = useUIStore((s) => s.toggleViewportStreaming);
   const fleetDefaultTier = useAutonomyStore((s) => s.fleetDefaultTier);
   const setFleetDefault = useAutonomyStore((s) => s.setFleetDefault);
 
@@ -919,6 +921,15 @@ function SettingsPanel() {
               <div className={`w-3.5 h-3.5 bg-white rounded-full shadow transition-transform duration-200 mx-0.5 ${trailsEnabled ? "translate-x-4" : "translate-x-0"}`} />
             </button>
           </label>
+          <label className="flex items-center justify-between cursor-pointer group mt-3">
+            <span className="text-[13px] text-slate-300">Stream Map View Only</span>
+            <button
+              onClick={toggleViewportStreaming}
+              className={`w-9 h-5 rounded-full transition-colors duration-200 ${viewportStreaming ? "bg-sky-600" : "bg-slate-700"}`}
+            >
+              <div className={`w-3.5 h-3.5 bg-white rounded-full shadow transition-transform duration-200 mx-0.5 ${viewportStreaming ? "translate-x-4" : "translate-x-0"}`} />
+            </button>
+          </label>
         </div>
         <div>
           <div className="text-[11px] font-semibold text-slate-400 uppercase tracking-wider mb-3">Autonomy</div>
@@ -1115,6 +1126,40 @@ function RobotMarker({ robot }: { robot: RobotState }) {
   );
 }
 
+/* ════════════════════════════════════════════════════════════════════════════
+   ROBOT CLUSTERS
+   ════════════════════════════════════════════════════════════════════════════ */
+
+function clusterColor(cluster: RobotCluster): string {
+  if (cluster.statuses.error) return MARKER_STATUS_COLORS.error;
+  if (cluster.worstBattery < 30) return MARKER_STATUS_COLORS.returning;
+  return MARKER_STATUS_COLORS.idle;
+}
+
+function RobotClusterMarkers({ clusters, onZoomIn }: { clusters: RobotClustersPayload; onZoomIn: (cluster: RobotCluster) => void }) {
+  return (
+    <>
+      {clusters.clusters.map((cluster) => {
+        const size = Math.min(56, 22 + Math.log2(cluster.count) * 5);
+        const color = clusterColor(cluster);
+        const summary = Object.entries(cluster.statuses).map(([status, n]) => `${n} ${status}`).join(", ");
+        return (
+          <Marker key={cluster.cell.join(":")} longitude={cluster.longitude} latitude={cluster.latitude} anchor="center">
+            <div
+              onClick={(e) => { e.stopPropagation(); onZoomIn(cluster); }}
+              title={`${summary} · lowest battery ${cluster.worstBattery.toFixed(0)}%`}
+              className="flex items-center justify-center rounded-full text-[11px] font-semibold text-white select-none"
+              style={{ width: size, height: size, cursor: "pointer", background: `${color}cc`, boxShadow: `0 0 0 4px ${color}33` }}
+            >
+              {cluster.count}
+            </div>
+          </Marker>
+        );
+      })}
+    </>
+  );
+}
+
 /* ════════════════════════════════════════════════════════════════════════════
    ROBOT TRAIL LAYER
    ════════════════════════════════════════════════════════════════════════════ */
@@ -1434,6 +1479,8 @@ function MapView() {
   const sendCommand = useCommandStore((s) => s.sendCommand);
   const addWaypoint = useUIStore((s) => s.addWaypoint);
   const setCircleCenter = useUIStore((s) => s.setCircleCenter);
+  const setViewport = useUIStore((s) => s.setViewport);
+  const clusters = useRobotStore((s) => s.clusters);
   const missions = useMissionStore((s) => s.missions);
   const activeMission = Object.values(missions).find((m) => m.status === "active");
   const hasFitted = useRef(false);
@@ -1481,6 +1528,24 @@ function MapView() {
     [sendCommand, setCommandMode, addWaypoint, setCircleCenter],
   );
 
+  // Report the visible area so the backend streams only the robots inside it.
+  // Not before the first fit: the default view may hold none of the fleet.
+  const reportViewport = useCallback(() => {
+    const map = mapRef.current;
+    if (!map || !hasFitted.current) return;
+    const bounds = map.getBounds();
+    setViewport({
+      bbox: [bounds.getWest(), bounds.getSouth(), bounds.getEast(), bounds.getNorth()],
+      zoom: map.getZoom(),
+    });
+  }, [setViewport]);
+
+  const zoomIntoCluster = useCallback((cluster: RobotCluster) => {
+    const map = mapRef.current;
+    if (!map) return;
+    map.flyTo({ center: [cluster.longitude, cluster.latitude], zoom: map.getZoom() + 2, duration: 600 });
+  }, []);
+
   const cursorMode = commandMode !== "none" ? "cursor-crosshair" : undefined;
 
   return (
@@ -1491,6 +1556,7 @@ function MapView() {
         style={{ width: "100%", height: "100%" }}
         mapStyle={DARK_STYLE}
         onClick={handleClick}
+        onMoveEnd={reportViewport}
         attributionControl={true}
       >
         <NavigationControl position="bottom-right" />
@@ -1502,10 +1568,17 @@ function MapView() {
             const robot = robots[robotId];
             return <TrajectoryLayer key={robotId} waypoints={waypoints} color={robot ? ROBOT_COLORS[robot.robotType] || "#94a3b8" : "#94a3b8"} />;
           })}
-        {robotList.map((robot) => (
-          <RobotMarker key={robot.id} robot={robot} />
-        ))}
+        {clusters ? (
+          <RobotClusterMarkers clusters={clusters} onZoomIn={zoomIntoCluster} />
+        ) : (
+          robotList.map((robot) => <RobotMarker key={robot.id} robot={robot} />)
+        )}
       </Map>
+      {clusters && commandMode === "none" && (
+        <div className="absolute top-4 left-1/2 -translate-x-1/2 z-20 px-4 py-2 bg-slate-900/95 border border-slate-700 rounded-xl shadow-2xl text-xs text-slate-300">
+          {clusters.total} robots in view · zoom in for individual units
+        </div>
+      )}
       <WaypointToolbar />
       <CircleToolbar />
       <SetHomeHint />
@@ -159,15 +159,51 @@ export interface WSMessage {
   type: string;
   payload: unknown;
   timestamp: string;
+  seq?: number;
+  seqs?: Record<string, number>;
+  eventSeq?: number;
 }
 
 export interface StateSyncPayload {
   robots: Record<string, RobotState>;
   missions?: Record<string, Mission>;
+  seqs?: Record<string, number>;
+  eventSeq?: number;
+  epoch?: string;
 }
 
 export interface RobotUpdatedPayload extends RobotState {}
 
+// What the map shows; the backend streams only robots inside it
+export interface MapViewport {
+  bbox: [number, number, number, number]; // west, south, east, north
+  zoom: number;
+}
+
+export interface RobotCluster {
+  cell: [number, number];
+  count: number;
+  latitude: number;
+  longitude: number;
+  worstBattery: number;
+  statuses: Partial<Record<RobotStatus, number>>;
+}
+
+// Sent instead of individual robots while a zoomed-out view holds many of them
+export interface RobotClustersPayload {
+  zoom: number;
+  cellSize: number;
+  total: number;
+  clusters: RobotCluster[];
+}
+
+// Only the fields that changed since the previous message for this robot
+export type RobotDeltaPayload = Partial<Omit<RobotState, "position" | "health">> & {
+  id: string;
+  position?: Partial<RobotState["position"]>;
+  health?: Partial<RobotState["health"]>;
+};
+
 // ---------------------------------------------------------------------------
 // Types — autonomy
 // ---------------------------------------------------------------------------
@@ -221,16 +257,22 @@ const MAX_TRAIL_POINTS = 200;
 interface RobotStore {
   robots: Record<string, RobotState>;
   trails: Record<string, [number, number][]>;
+  // Set while the map view is clustered; individual robot updates pause until the next state.sync
+  clusters: RobotClustersPayload | null;
   setRobots: (robots: Record<string, RobotState>) => void;
   updateRobot: (id: string, robot: RobotState) => void;
+  setClusters: (clusters: RobotClustersPayload | null) => void;
 }
 
 export const useRobotStore = create<RobotStore>()((set) => ({
   robots: {},
   trails: {},
+  clusters: null,
 
   setRobots: (robots) => set({ robots }),
 
+  setClusters: (clusters) => set({ clusters }),
+
   updateRobot: (id, robot) =>
     set((state) => {
       const prev = state.trails[id] ?? [];
@@ -360,6 +402,12 @@ interface UIStore {
   settingsPanelOpen: boolean;
   trailsEnabled: boolean;
 
+  // Map viewport streaming
+  viewport: MapViewport | null;
+  setViewport: (viewport: MapViewport) => void;
+  viewportStreaming: boolean;
+  toggleViewportStreaming: () => void;
+
   // Waypoint builder
   pendingWaypoints: { lat: number; lng: number }[];
   addWaypoint: (lat: number, lng: number) => void;
@@ -412,6 +460,13 @@ export const useUIStore = create<UIStore>()((set) => ({
   settingsPanelOpen: false,
   trailsEnabled: true,
 
+  // Map viewport streaming
+  viewport: null,
+  setViewport: (viewport) => set({ viewport }),
+  viewportStreaming: true,
+  toggleViewportStreaming: () =>
+    set((s) => ({ viewportStreaming: !s.viewportStreaming })),
+
   // Waypoint builder
   pendingWaypoints: [],
   addWaypoint: (lat, lng) =>
@@ -707,13 +762,24 @@ const WS_URL = getWsUrl();
 export function useWebSocket() {
   const wsRef = useRef<WebSocket | null>(null);
   const reconnectTimer = useRef<number | undefined>(undefined);
+  const unsubscribeSelection = useRef<(() => void) | undefined>(undefined);
+  const unsubscribeViewport = useRef<(() => void) | undefined>(undefined);
+  // Last robot.delta / keyframe seq applied per robot
+  const robotSeqs = useRef<Record<string, number>>({});
+  // Highest broadcast eventSeq seen, so a reconnect can resume instead of re-syncing
+  const eventSeq = useRef<number | undefined>(undefined);
+  const epoch = useRef<string | undefined>(undefined);
   const { setConnected, setReconnecting } = useConnectionStore();
-  const { setRobots, updateRobot } = useRobotStore();
+  const { setRobots, updateRobot, setClusters } = useRobotStore();
 
   const connect = useCallback(() => {
     if (wsRef.current?.readyState === WebSocket.OPEN) return;
 
-    const ws = new WebSocket(WS_URL);
+    const url =
+      eventSeq.current !== undefined && epoch.current
+        ? `${WS_URL}?resumeFrom=${eventSeq.current}&epoch=${epoch.current}`
+        : WS_URL;
+    const ws = new WebSocket(url);
     wsRef.current = ws;
 
     ws.onopen = () => {
@@ -726,25 +792,120 @@ export function useWebSocket() {
           );
         }
       });
+      // Tell the backend which robots are on screen so it can raise their telemetry rate
+      const sendSelection = () => {
+        if (ws.readyState !== WebSocket.OPEN) return;
+        const ui = useUIStore.getState();
+        const robotIds = new Set(ui.selectedRobotIds);
+        if (ui.selectedRobotId) robotIds.add(ui.selectedRobotId);
+        ws.send(
+          JSON.stringify({
+            type: "robot.select",
+            payload: { robotIds: [...robotIds] },
+            timestamp: new Date().toISOString(),
+          })
+        );
+      };
+      sendSelection();
+      unsubscribeSelection.current?.();
+      unsubscribeSelection.current = useUIStore.subscribe((state, prev) => {
+        if (state.selectedRobotId !== prev.selectedRobotId || state.selectedRobotIds !== prev.selectedRobotIds) {
+          sendSelection();
+        }
+      });
+      // Stream only what the map shows (a null bbox asks for the whole fleet again)
+      const sendViewport = () => {
+        if (ws.readyState !== WebSocket.OPEN) return;
+        const ui = useUIStore.getState();
+        const payload = ui.viewportStreaming && ui.viewport ? ui.viewport : { bbox: null };
+        ws.send(JSON.stringify({ type: "viewport", payload, timestamp: new Date().toISOString() }));
+      };
+      if (useUIStore.getState().viewportStreaming && useUIStore.getState().viewport) sendViewport();
+      unsubscribeViewport.current?.();
+      unsubscribeViewport.current = useUIStore.subscribe((state, prev) => {
+        if (state.viewportStreaming !== prev.viewportStreaming || (state.viewportStreaming && state.viewport !== prev.viewport)) {
+          sendViewport();
+        }
+      });
       console.log("[WS] Connected");
     };
 
-    ws.onmessage = (event) => {
-      const msg: WSMessage = JSON.parse(event.data);
+    const noteEventSeq = (seq: number | undefined) => {
+      if (seq !== undefined && seq > (eventSeq.current ?? 0)) eventSeq.current = seq;
+    };
+
+    const handleMessage = (msg: WSMessage) => {
+      noteEventSeq(msg.eventSeq);
       switch (msg.type) {
+        case "ping": {
+          // Server liveness check; unanswered clients are disconnected
+          ws.send(JSON.stringify({ type: "pong", payload: {}, timestamp: new Date().toISOString() }));
+          break;
+        }
         case "state.sync": {
           const payload = msg.payload as StateSyncPayload;
+          robotSeqs.current = { ...(payload.seqs ?? {}) };
+          eventSeq.current = payload.eventSeq;
+          epoch.current = payload.epoch;
           setRobots(payload.robots);
+          // The backend re-syncs when a view stops being clustered
+          setClusters(null);
           if (payload.missions) {
             useMissionStore.getState().setMissions(payload.missions);
           }
           break;
         }
         case "robot.updated": {
+          // Full state (keyframe); older than what we have means it was overtaken
           const robot = msg.payload as RobotUpdatedPayload;
+          if (msg.seq !== undefined) {
+            if (msg.seq < (robotSeqs.current[robot.id] ?? 0)) break;
+            robotSeqs.current[robot.id] = msg.seq;
+          }
           updateRobot(robot.id, robot);
           break;
         }
+        case "robot.clusters": {
+          setClusters(msg.payload as RobotClustersPayload);
+          break;
+        }
+        case "session.resumed": {
+          console.log(`[WS] Resumed, ${(msg.payload as { replayed: number }).replayed} missed events replayed`);
+          break;
+        }
+        case "robots.updated": {
+          const robots = msg.payload as RobotUpdatedPayload[];
+          Object.assign(robotSeqs.current, msg.seqs ?? {});
+          for (const robot of robots) updateRobot(robot.id, robot);
+          break;
+        }
+        case "robot.delta": {
+          const delta = msg.payload as RobotDeltaPayload;
+          const seq = msg.seq ?? 0;
+          const last = robotSeqs.current[delta.id];
+          if (last !== undefined && seq <= last) break;
+          const existing = useRobotStore.getState().robots[delta.id];
+          if (existing) {
+            updateRobot(delta.id, {
+              ...existing,
+              ...delta,
+              position: { ...existing.position, ...delta.position },
+              health: { ...existing.health, ...delta.health },
+            });
+          }
+          robotSeqs.current[delta.id] = seq;
+          if (!existing || last === undefined || seq !== last + 1) {
+            // Missed a message (or never had a base state): ask for a keyframe
+            ws.send(
+              JSON.stringify({
+                type: "robot.resync",
+                payload: { robotIds: [delta.id] },
+                timestamp: new Date().toISOString(),
+              })
+            );
+          }
+          break;
+        }
         case "command.status": {
           const cmd = msg.payload as Command;
           const store = useCommandStore.getState();
@@ -792,8 +953,23 @@ export function useWebSocket() {
       }
     };
 
+    ws.onmessage = (event) => {
+      const msg: WSMessage = JSON.parse(event.data);
+      if (msg.type === "batch") {
+        // One frame per server tick, carrying that tick's messages in order
+        for (const item of msg.payload as WSMessage[]) handleMessage(item);
+        noteEventSeq(msg.eventSeq);
+      } else {
+        handleMessage(msg);
+      }
+    };
+
     ws.onclose = () => {
       setConnected(false);
+      unsubscribeSelection.current?.();
+      unsubscribeSelection.current = undefined;
+      unsubscribeViewport.current?.();
+      unsubscribeViewport.current = undefined;
       useCommandStore.getState().setSendFn(null as unknown as (type: string, payload: unknown) => void);
       console.log("[WS] Disconnected. Reconnecting in 3s...");
       setReconnecting(true);
@@ -803,7 +979,7 @@ export function useWebSocket() {
     ws.onerror = () => {
       ws.close();
     };
-  }, [setConnected, setReconnecting, setRobots, updateRobot]);
+  }, [setConnected, setReconnecting, setRobots, updateRobot, setClusters]);
 
   const send = useCallback((type: string, payload: unknown) => {
     if (wsRef.current?.readyState === WebSocket.OPEN) {
@@ -817,6 +993,8 @@ export function useWebSocket() {
     connect();
     return () => {
       clearTimeout(reconnectTimer.current);
+      unsubscribeSelection.current?.();
+      unsubscribeViewport.current?.();
       wsRef.current?.close();
     };
   }, [connect]);
@@ -26,6 +26,8 @@ class SimConfig:
     mqtt_password: str = os.environ.get("MQTT_PASSWORD", "")
     backend_url: str = os.environ.get("BACKEND_URL", "http://localhost:8000")
     publish_interval: float = 0.5
+    # "json" or "bin1" (compact packed structs, see simulator/wire.py)
+    telemetry_format: str = os.environ.get("TELEMETRY_FORMAT", "json")
     robots: list[RobotConfig] = field(default_factory=list)
 
     @classmethod
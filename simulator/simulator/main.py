@@ -11,12 +11,16 @@ from typing import Any
 import aiomqtt
 import httpx
 
+from simulator import wire
 from simulator.config import RobotConfig, SimConfig
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s: %(message)s")
 logger = logging.getLogger(__name__)
 
 EARTH_RADIUS = 6_371_000
+# Bounds for backend-requested telemetry intervals (seconds)
+MIN_TELEMETRY_INTERVAL = 0.1
+MAX_TELEMETRY_INTERVAL = 60.0
 
 
 def offset_coords(lat: float, lon: float, dx_m: float, dy_m: float) -> tuple[float, float]:
@@ -528,6 +532,13 @@ async def handle_command(robot: Any, payload: dict[str, Any]) -> str | None:
         robot.speed = max(0, min(robot.config.max_speed * 2, new_speed))
         return command_id
 
+    elif command_type == "set_telemetry_rate":
+        # Backend control message; it has no command_id, so nothing is acked
+        interval = parameters.get("interval")
+        if isinstance(interval, (int, float)) and interval > 0:
+            robot.telemetry_interval = max(MIN_TELEMETRY_INTERVAL, min(MAX_TELEMETRY_INTERVAL, float(interval)))
+            return command_id
+
     return None
 
 
@@ -552,9 +563,19 @@ async def run_robot(config: RobotConfig, sim_config: SimConfig) -> None:
         """Publish telemetry at regular intervals and process commands."""
         await client.publish(
             f"argus/{config.id}/status",
-            json.dumps({"status": "active", "robot_type": config.robot_type}),
+            json.dumps({
+                "status": "active",
+                "robot_type": config.robot_type,
+                "telemetry_format": sim_config.telemetry_format,
+            }),
         )
-        tick_count = 0
+        # Position publish interval. Start at the default; the backend re-sends its
+        # desired rate after our status message and lowers it while nobody is watching
+        robot.telemetry_interval = sim_config.publish_interval
+        publish_count = 0
+        loop = asyncio.get_running_loop()
+        next_publish = loop.time()
+        current_interval = robot.telemetry_interval
         while True:
             # Process any pending commands
             while not command_queue.empty():
@@ -583,18 +604,27 @@ async def run_robot(config: RobotConfig, sim_config: SimConfig) -> None:
                             json.dumps({"command_id": cmd_id, "status": "completed"}),
                         )
 
-            robot.tick(sim_config.publish_interval)
-            await client.publish(
-                f"argus/{config.id}/telemetry/position",
-                json.dumps(robot.position_payload()),
-            )
-            tick_count += 1
-            if tick_count % 5 == 0:
+            # Simulate at the base interval (or faster), publish at the requested rate
+            step = min(sim_config.publish_interval, robot.telemetry_interval)
+            robot.tick(step)
+            now = loop.time()
+            if robot.telemetry_interval != current_interval:
+                # Rate changed: publish right away rather than after the old interval
+                current_interval = robot.telemetry_interval
+                next_publish = now
+            if now >= next_publish:
+                next_publish = now + current_interval - step / 2
                 await client.publish(
-                    f"argus/{config.id}/telemetry/health",
-                    json.dumps(robot.health_payload()),
+                    f"argus/{config.id}/telemetry/position",
+                    wire.encode_position(robot.position_payload(), sim_config.telemetry_format),
                 )
-            await asyncio.sleep(sim_config.publish_interval)
+                publish_count += 1
+                if publish_count % 5 == 0:
+                    await client.publish(
+                        f"argus/{config.id}/telemetry/health",
+                        wire.encode_health(robot.health_payload(), sim_config.telemetry_format),
+                    )
+            await asyncio.sleep(step)
 
     while True:
         try:
@@ -603,6 +633,12 @@ async def run_robot(config: RobotConfig, sim_config: SimConfig) -> None:
             mqtt_kwargs: dict[str, object] = {
                 "hostname": sim_config.mqtt_broker,
                 "port": sim_config.mqtt_port,
+                # Broker publishes this if we drop off without a clean disconnect
+                "will": aiomqtt.Will(
+                    f"argus/{config.id}/status",
+                    json.dumps({"status": "offline", "robot_type": config.robot_type}),
+                    qos=1,
+                ),
             }
             if sim_config.mqtt_user:
                 mqtt_kwargs["username"] = sim_config.mqtt_user
@@ -0,0 +1,51 @@
+"""Compact binary telemetry wire format ("bin1").
+
+Mirrors backend/app/mqtt/wire.py; keep the two in sync.
+
+    position: magic u8, kind u8, lat i32 (1e-6 deg), lon i32 (1e-6 deg),
+              alt i32 (cm), heading u16 (0.01 deg), speed u16 (cm/s)  = 18 B
+    health:   magic u8, kind u8, battery u16 (0.1 %), signal u16 (0.1 %) = 6 B
+"""
+
+from __future__ import annotations
+
+import json
+import struct
+from typing import Any
+
+FORMAT_JSON = "json"
+FORMAT_BIN1 = "bin1"
+
+MAGIC = 0xA7
+KIND_POSITION = 0x01
+KIND_HEALTH = 0x02
+
+_POSITION = struct.Struct("<BBiiiHH")
+_HEALTH = struct.Struct("<BBHH")
+
+
+def encode_position(data: dict[str, Any], fmt: str = FORMAT_JSON) -> bytes | str:
+    if fmt != FORMAT_BIN1:
+        return json.dumps(data)
+    return _POSITION.pack(
+        MAGIC,
+        KIND_POSITION,
+        round(data.get("latitude", 0.0) * 1e6),
+        round(data.get("longitude", 0.0) * 1e6),
+        round(data.get("altitude", 0.0) * 100),
+        round(data.get("heading", 0.0) % 360 * 100) % 36000,
+        min(0xFFFF, max(0, round(data.get("speed", 0.0) * 100))),
+    )
+
+
+def encode_health(data: dict[str, Any], fmt: str = FORMAT_JSON) -> bytes | str:
+    # bin1 only carries the fields the backend tracks; type-specific extras
+    # (wheel_speed, depth, pressure_atm) are JSON-only.
+    if fmt != FORMAT_BIN1:
+        return json.dumps(data)
+    return _HEALTH.pack(
+        MAGIC,
+        KIND_HEALTH,
+        min(1000, max(0, round(data.get("battery_percent", 0.0) * 10))),
+        min(1000, max(0, round(data.get("signal_strength", 0.0) * 10))),
+    )